@@ -11,14 +11,18 @@ from phorest_pipeline.shared.config import (
     RETRY_DELAY,
     settings,  # Import settings to check if config loaded ok
 )
+from phorest_pipeline.shared.image_sources import ImageSourceType
 from phorest_pipeline.shared.logger_config import configure_logger
 from phorest_pipeline.shared.states import CollectorState
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename="continuous_capture.log")
 
 if ENABLE_CAMERA:
+    from phorest_pipeline.collector.sources.camera_session import (
+        close_sessions,
+        use_background_grab,
+    )
     from phorest_pipeline.shared.config import CAMERA_TYPE
-    from phorest_pipeline.shared.image_sources import ImageSourceType
 
     if CAMERA_TYPE == ImageSourceType.LOGITECH:
         from phorest_pipeline.collector.sources.logi_camera_controller import camera_controller
@@ -37,6 +41,10 @@ SCRIPT_NAME = "phorest-continuous-capture"
 SAVENAME = "continuous_capture_frame.jpg"
 # RESOLUTION = (640, 480)
 
+# Cameras read through a CameraSession. Their frame grabber paces the capture
+# loop to the camera's frame rate, so the loop does not need to sleep.
+GRABBER_CAMERA_TYPES = (ImageSourceType.LOGITECH, ImageSourceType.ARGUS, ImageSourceType.TIS)
+
 
 def perform_continuous_capture(
     current_state: CollectorState, failure_count: int, filename: Path = None
@@ -113,6 +121,9 @@ def run_continuous_capture():
     logger.info("--- Starting Continuous Capture ---")
     current_state = CollectorState.IDLE
     failure_count = 0
+    streaming = ENABLE_CAMERA and CAMERA_TYPE in GRABBER_CAMERA_TYPES
+    if streaming:
+        use_background_grab(True)
 
     try:
         while True:
@@ -126,7 +137,7 @@ def run_continuous_capture():
                 break  # Exit the while loop
 
             # Small sleep even in fast transitions to prevent busy-looping if logic is instant
-            if current_state == CollectorState.WAITING_TO_RUN:
+            if current_state == CollectorState.WAITING_TO_RUN and not streaming:
                 time.sleep(0.1)
     except KeyboardInterrupt:
         logger.info("Shutdown requested via KeyboardInterrupt.")
@@ -134,6 +145,8 @@ def run_continuous_capture():
         logger.error(f"UNEXPECTED ERROR in main loop: {e}")
     finally:
         # Cleanup on exit
+        if ENABLE_CAMERA:
+            close_sessions()
         logger.info("--- Collector Stopped ---")
         if current_state == CollectorState.FATAL_ERROR:
             sys.exit(1)
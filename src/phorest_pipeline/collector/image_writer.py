@@ -0,0 +1,119 @@
+# phorest_pipeline/collector/image_writer.py
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from phorest_pipeline.shared import metrics
+from phorest_pipeline.shared.image_io import save_image
+from phorest_pipeline.shared.logger_config import configure_logger
+
+logger = configure_logger(name=__name__, rotate_daily=True, log_filename="collector.log")
+
+WRITER_QUEUE_DEPTH = metrics.gauge(
+    "phorest_image_writer_queue_depth", "Frames waiting to be written or being written"
+)
+WRITER_FULL = metrics.counter(
+    "phorest_image_writer_full_total", "Captures that had to wait for room in the writer queue"
+)
+WRITER_WAIT_SECONDS = metrics.histogram(
+    "phorest_image_writer_wait_seconds", "Time a capture waited for room in the writer queue"
+)
+WRITE_SECONDS = metrics.histogram(
+    "phorest_image_write_seconds", "Time to encode, write and flush one frame"
+)
+
+
+def _write_durably(filepath: Path, frame: np.ndarray) -> bool:
+    if not save_image(filepath, frame):
+        logger.error(f"[WRITER] Failed to save image to {filepath}.")
+        return False
+    try:
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.warning(f"[WRITER] Could not flush {filepath.name} to disk: {e}")
+    return True
+
+
+class ImageWriter:
+    """
+    Encodes and writes captured frames on a pool of threads, so slow storage
+    does not delay the next capture.
+
+    At most 'threads' + 'queue_size' frames are held at once. When that many
+    are waiting, 'submit' blocks until one is written (back-pressure), and
+    the wait is recorded in the metrics. Frames are written and flushed to
+    disk (fsync) before their future completes.
+
+    The writer can be passed to Service.wait() as a trigger: its descriptor
+    becomes readable whenever a write completes.
+    """
+
+    def __init__(self, threads: int, queue_size: int):
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="image-writer")
+        self._slots = threading.BoundedSemaphore(threads + queue_size)
+        self._pending = {}  # Filename -> Future, until taken by the collector
+        self._in_flight = 0
+        self._lock = threading.Lock()  # Guards '_in_flight' and the writer metrics
+        self._wake_read, self._wake_write = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+
+    def submit(self, filepath: Path, frame: np.ndarray) -> bool:
+        """Queues a frame to be written to 'filepath'. The frame must not be modified afterwards."""
+        if not self._slots.acquire(blocking=False):
+            WRITER_FULL.inc()
+            logger.warning("[WRITER] Writer queue full. Waiting for a write to finish...")
+            wait_start = time.monotonic()
+            self._slots.acquire()
+            WRITER_WAIT_SECONDS.observe(time.monotonic() - wait_start)
+        with self._lock:
+            self._in_flight += 1
+            WRITER_QUEUE_DEPTH.set(self._in_flight)
+        future = self._executor.submit(self._write, filepath, frame)
+        self._pending[filepath.name] = future
+        return True
+
+    def _write(self, filepath: Path, frame: np.ndarray) -> bool:
+        start = time.monotonic()
+        try:
+            return _write_durably(filepath, frame)
+        finally:
+            with self._lock:
+                WRITE_SECONDS.observe(time.monotonic() - start)
+                self._in_flight -= 1
+                WRITER_QUEUE_DEPTH.set(self._in_flight)
+            self._slots.release()
+            self._wake()
+
+    def _wake(self):
+        try:
+            os.write(self._wake_write, b"\0")
+        except BlockingIOError:
+            pass  # The pipe is full, so the reader is awake already
+
+    def take(self, filename: str) -> Future | None:
+        """Returns the future of the write of 'filename' (once), or None if it was not queued."""
+        return self._pending.pop(filename, None)
+
+    def fileno(self) -> int:
+        return self._wake_read
+
+    def drain(self):
+        try:
+            while os.read(self._wake_read, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        """Waits for all queued frames to be written and stops the threads."""
+        self._executor.shutdown(wait=True)
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+
@@ -1,81 +1,248 @@
 # process_pipeline/collector/logic.py
 import datetime
-import signal
-import sys
 import time
+from collections import deque
 from pathlib import Path
 
-from phorest_pipeline.collector.sources.thermocouple_controller import thermocouple_controller
+from phorest_pipeline.collector.image_writer import ImageWriter
+from phorest_pipeline.collector.sources.thermocouple_controller import (
+    thermocouple_controller,
+)
+from phorest_pipeline.collector.temperature_sampler import TemperatureSampler
+from phorest_pipeline.shared import latency, metrics
 from phorest_pipeline.shared.config import (
     COLLECTOR_INTERVAL,
     DATA_DIR,
     DATA_READY_FLAG,
     ENABLE_CAMERA,
+    ENABLE_SYNCER,
     ENABLE_THERMOCOUPLE,
     FAILURE_LIMIT,
     IMAGE_BUFFER_SIZE,
+    IMAGE_WRITER_QUEUE_SIZE,
+    IMAGE_WRITER_THREADS,
+    IMPORT_RESUME,
     METADATA_FILENAME,
     RETRY_DELAY,
+    STORAGE_MODE,
+    SYNCED_LOG_FILENAME,
+    TEMPERATURE_SAMPLE_INTERVAL,
+    THERMOCOUPLE_IDS,
     settings,  # Import settings to check if config loaded ok
 )
+from phorest_pipeline.shared.event_types import EventType
+from phorest_pipeline.shared.frame_ring import get_frame_ring
 from phorest_pipeline.shared.helper_utils import (
+    ImageRingBuffer,
     move_existing_files_to_backup,
-    ring_buffer_cleanup,
     snapshot_configs,
 )
+from phorest_pipeline.shared.image_io import set_image_writer
 from phorest_pipeline.shared.logger_config import configure_logger
-from phorest_pipeline.shared.metadata_manager import add_entry, update_service_status
+from phorest_pipeline.shared.message_bus import publish, subscribe
+from phorest_pipeline.shared.metadata_manager import (
+    add_entry,
+    append_metadata,
+    load_metadata_with_lock,
+)
+from phorest_pipeline.shared.service import Service
 from phorest_pipeline.shared.states import CollectorState
+from phorest_pipeline.shared.storage_modes import StorageMode
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename="collector.log")
 
 if ENABLE_CAMERA:
+    from phorest_pipeline.collector.sources.camera_session import close_sessions
     from phorest_pipeline.shared.config import CAMERA_TYPE
     from phorest_pipeline.shared.image_sources import ImageSourceType
 
     if CAMERA_TYPE == ImageSourceType.LOGITECH:
-        from phorest_pipeline.collector.sources.logi_camera_controller import camera_controller
+        from phorest_pipeline.collector.sources.logi_camera_controller import (
+            camera_controller,
+        )
     elif CAMERA_TYPE == ImageSourceType.ARGUS:
-        from phorest_pipeline.collector.sources.argus_camera_controller import camera_controller
+        from phorest_pipeline.collector.sources.argus_camera_controller import (
+            camera_controller,
+        )
     elif CAMERA_TYPE == ImageSourceType.TIS:
-        from phorest_pipeline.collector.sources.tis_camera_controller import camera_controller
+        from phorest_pipeline.collector.sources.tis_camera_controller import (
+            camera_controller,
+        )
     elif CAMERA_TYPE == ImageSourceType.HAWKEYE:
         from phorest_pipeline.collector.sources.hawkeye_camera_controller import (
             camera_controller,
         )
     elif CAMERA_TYPE == ImageSourceType.DUMMY:
-        from phorest_pipeline.collector.sources.dummy_camera_controller import camera_controller
+        from phorest_pipeline.collector.sources.dummy_camera_controller import (
+            camera_controller,
+        )
     elif CAMERA_TYPE == ImageSourceType.FILE_IMPORTER:
         from phorest_pipeline.collector.sources.image_file_importer import (
-            image_file_importer as camera_controller,
+            ImageFileImport,
         )
     logger.info(f"Camera type: {CAMERA_TYPE}")
 
 SCRIPT_NAME = "phorest-collector"
 
+ENTRIES_COLLECTED = metrics.counter(
+    "phorest_entries_collected_total", "Manifest entries added without a collection error"
+)
+COLLECTION_FAILURES = metrics.counter(
+    "phorest_collection_failures_total", "Collection cycles that failed and were retried"
+)
+
 POLL_INTERVAL = COLLECTOR_INTERVAL / 5
 
 
-class Collector:
+class Collector(Service):
     """Encapsulates the state and logic for the data collector."""
 
+    SCRIPT_NAME = SCRIPT_NAME
+    DISPLAY_NAME = "Collector"
+    FATAL_STATE = CollectorState.FATAL_ERROR
+
     def __init__(self):
-        self.shutdown_requested = False
-        self.current_state = CollectorState.IDLE
+        super().__init__(logger, CollectorState.IDLE)
         self.next_run_time = 0
         self.failure_count = 0
+        self.image_buffer = None
+        self.bus = None
+
+        # Frames are written in the background when enabled (see collector/image_writer.py)
+        self.image_writer = None
+        self.unwritten = deque()  # (write future, camera data, temperature data, capture stamp)
+        self.write_failed = False  # A background write failed since the last check in perform()
+        # Temperature is sampled in the background when enabled (see collector/temperature_sampler.py)
+        self.temperature_sampler = None
+
+        # FILE_IMPORTER: batches of existing images still to add to the manifest
+        self.image_import = None
+        self.import_batches = None
+        self.import_batch = None  # Batch being added (kept for a retry if adding it failed)
+        self.imported_count = 0
+
+    def _add_to_manifest(
+        self,
+        cam_metadata: dict | list[dict] | None,
+        temps_metadata: dict | None,
+        captured_at: float | None,
+    ) -> bool:
+        """Adds a collection to the processing manifest. Returns False if the manifest could not be written."""
+        try:
+            added_entries = add_entry(
+                manifest_path=Path(DATA_DIR, METADATA_FILENAME),
+                camera_meta=cam_metadata,
+                temps_meta=temps_metadata,
+                latency_stamps={"captured": captured_at} if captured_at is not None else None,
+            )
+            logger.debug("Entry added to processing manifest.")
+            added_indices = [
+                index for index, entry in added_entries if not entry["collection_error"]
+            ]
+            ENTRIES_COLLECTED.inc(len(added_indices))
+            publish(EventType.ENTRY_ADDED, indices=added_indices)
+            if len(added_indices) == len(added_entries):
+                self.failure_count = 0  # Reset failure count on a successful collection
+            return True
+        except Exception as e:
+            logger.critical(
+                f"Failed to add entry to processing manifest: {e}. This indicates a serious issue with file locking/writing.",
+                exc_info=True,
+            )
+            self.failure_count += 1  # Increment failure count for manifest write failure
+            return False
+
+    def _add_to_image_buffer(self, cam_metadata: dict | None):
+        if self.image_buffer is None:
+            return
+        if self.bus is not None:
+            for _, payload in self.bus.receive():
+                self.image_buffer.mark_synced(payload.get("filenames", []))
+        if cam_metadata and cam_metadata.get("filename"):
+            self.image_buffer.add(cam_metadata["filename"])
+        self.image_buffer.cleanup()
+
+    def _raise_data_ready_flag(self) -> bool:
+        logger.debug(f"Creating flag: {DATA_READY_FLAG}")
+        try:
+            DATA_READY_FLAG.touch()
+            return True
+        except OSError as e:
+            logger.critical(
+                f"Could not create flag {DATA_READY_FLAG}: {e}. This will prevent processor from starting. Transitioning to FATAL_ERROR.",
+                exc_info=True,
+            )
+            return False
+
+    def _register_written(self) -> bool:
+        """
+        Adds the captures whose image has been written to the manifest, in
+        capture order. Returns False if the data ready flag could not be created.
+        A failed write is added as an error entry and counts as a failed
+        collection (see perform).
+        """
+        added = False
+        while self.unwritten and self.unwritten[0][0].done():
+            image_write, cam_metadata, temps_metadata, captured_at = self.unwritten.popleft()
+            try:
+                written = image_write.result()
+            except Exception:
+                logger.exception(f"Writing image {cam_metadata.get('filename')} failed.")
+                written = False
+            if self.temperature_sampler is not None:
+                # Later samples may exist by now, so the reading can be interpolated
+                temps_metadata = self.temperature_sampler.reading_at(captured_at)
+            if not written:
+                COLLECTION_FAILURES.inc()
+                self.failure_count += 1
+                self.write_failed = True
+                cam_metadata = {
+                    **cam_metadata,
+                    "error_flag": True,
+                    "error_message": f"Failed to save image {cam_metadata.get('filename')}.",
+                }
+            if self._add_to_manifest(cam_metadata, temps_metadata, captured_at) and written:
+                self._add_to_image_buffer(cam_metadata)
+                added = True
+        return not added or self._raise_data_ready_flag()
+
+    async def _import_next_batch(self):
+        """
+        Adds the next batch of existing images to the manifest and raises the
+        data ready flag, so the processor starts on it while the rest are
+        imported. Halts the collector once every image has been added.
+        """
+        if self.import_batch is None:
+            try:
+                self.import_batch = next(self.import_batches, None)
+            except Exception:
+                logger.exception("Image file import failed.")
+                self.current_state = CollectorState.FATAL_ERROR
+                return
+            if self.import_batch is None:
+                logger.info(
+                    f"Image file import complete ({self.imported_count} images). Collector will now halt."
+                )
+                self.shutdown_requested = True  # Signal for a clean stop
+                return
+
+        if not self._add_to_manifest(self.import_batch, None, None):
+            COLLECTION_FAILURES.inc()
+            if self.failure_count >= FAILURE_LIMIT:
+                logger.error(f"Failure limit ({FAILURE_LIMIT}) reached while importing. Stopping.")
+                self.current_state = CollectorState.FATAL_ERROR
+            else:
+                await self.sleep(RETRY_DELAY)
+            return
+        # Recorded straight away, so the batch is not added again if the import is interrupted
+        self.image_import.mark_imported()
+        self.imported_count += len(self.import_batch)
+        logger.info(f"Imported {self.imported_count} images so far.")
+        self.import_batch = None
+        if not self._raise_data_ready_flag():
+            self.current_state = CollectorState.FATAL_ERROR
 
-        # Register the signal handler
-        signal.signal(signal.SIGINT, self._graceful_shutdown)
-        signal.signal(signal.SIGTERM, self._graceful_shutdown)
-
-    def _graceful_shutdown(self, _signum, _frame):
-        """Signal handler to initiate a graceful shutdown"""
-        if not self.shutdown_requested:
-            logger.info("Shutdown signal received. Finishing current cycle before stopping...")
-            self.shutdown_requested = True
-
-    def _perform_collection(self):
+    async def perform(self):
         """State machine logic for the collector."""
 
         if settings is None:
@@ -83,7 +250,28 @@ class Collector:
             self.current_state = CollectorState.FATAL_ERROR  # Exit on config error
             return
 
+        if not self._register_written():
+            self.current_state = CollectorState.FATAL_ERROR
+            return
+        if self.write_failed:
+            # Treated like a collection that failed to save its image: retried until the limit
+            self.write_failed = False
+            logger.debug(f"Failure count: {self.failure_count}/{FAILURE_LIMIT}")
+            if self.failure_count >= FAILURE_LIMIT:
+                logger.critical(f"[FATAL ERROR] Reached failure limit ({FAILURE_LIMIT}).")
+                self.current_state = CollectorState.FATAL_ERROR
+                return
+            if self.current_state in (CollectorState.IDLE, CollectorState.WAITING_TO_RUN):
+                logger.warning("Writing an image failed. Retrying collection...")
+                self.current_state = CollectorState.COLLECTING
+                await self.sleep(RETRY_DELAY)
+                return
+
         match self.current_state:
+            case CollectorState.IDLE if self.import_batches is not None:
+                logger.debug("IDLE -> IMPORTING")
+                self.current_state = CollectorState.IMPORTING
+
             case CollectorState.IDLE:
                 logger.debug("IDLE -> WAITING_TO_RUN")
                 self.next_run_time = time.monotonic() + COLLECTOR_INTERVAL
@@ -96,10 +284,10 @@ class Collector:
                     self.failure_count = 0  # Reset failure count when *entering* COLLECTING state
                     self.current_state = CollectorState.COLLECTING
                 else:
-                    for _ in range(int(POLL_INTERVAL)):
-                        if self.shutdown_requested:
-                            return
-                        time.sleep(1)
+                    # Also wakes up when an image has been written, to add it to the manifest
+                    await self.wait(
+                        min(POLL_INTERVAL, self.next_run_time - now), self.image_writer
+                    )
 
             case CollectorState.COLLECTING:
                 logger.info("--- Running Collection ---")
@@ -107,6 +295,7 @@ class Collector:
 
                 cam_metadata_for_entry = None
                 temps_metadata_for_entry = None
+                captured_at = latency.stamp()  # Start of the capture, for the end-to-end latency
 
                 if ENABLE_CAMERA:
                     logger.debug("Camera is enabled.")
@@ -114,10 +303,9 @@ class Collector:
                         cam_status, cam_msg, cam_data_from_controller = camera_controller(DATA_DIR)
                         if cam_status == 0:
                             cam_metadata_for_entry = cam_data_from_controller
-                            if CAMERA_TYPE != ImageSourceType.FILE_IMPORTER:
-                                logger.info(
-                                    f"Camera data collected: {cam_metadata_for_entry.get('filename')}"
-                                )
+                            logger.info(
+                                f"Camera data collected: {cam_metadata_for_entry.get('filename')}"
+                            )
                         else:
                             # Explicitly create error metadata
                             cam_metadata_for_entry = {
@@ -143,7 +331,13 @@ class Collector:
                 else:
                     logger.info("Camera not enabled. Skipping image capture.")
 
-                if ENABLE_THERMOCOUPLE:
+                if ENABLE_THERMOCOUPLE and self.temperature_sampler is not None:
+                    temps_metadata_for_entry = self.temperature_sampler.reading_at(captured_at)
+                    if temps_metadata_for_entry["error_flag"]:
+                        logger.error(
+                            f"No temperature for this capture: {temps_metadata_for_entry['error_message']}"
+                        )
+                elif ENABLE_THERMOCOUPLE:
                     logger.debug("Thermocouple is enabled.")
                     try:
                         tc_status, tc_msg, tc_data_from_controller = thermocouple_controller()
@@ -185,61 +379,46 @@ class Collector:
                 # --- Add entry to the metadata manifest ---
                 current_collection_successful = True
 
-                if CAMERA_TYPE != ImageSourceType.FILE_IMPORTER:
-                    if ENABLE_CAMERA and (
-                        cam_metadata_for_entry is None
-                        or cam_metadata_for_entry.get("error_flag", True)
-                    ):
-                        current_collection_successful = False
+                if ENABLE_CAMERA and (
+                    cam_metadata_for_entry is None
+                    or cam_metadata_for_entry.get("error_flag", True)
+                ):
+                    current_collection_successful = False
                 if ENABLE_THERMOCOUPLE and (
                     temps_metadata_for_entry is None
                     or temps_metadata_for_entry.get("error_flag", True)
                 ):
                     current_collection_successful = False
 
-                try:
-                    add_entry(
-                        manifest_path=Path(DATA_DIR, METADATA_FILENAME),
-                        camera_meta=cam_metadata_for_entry,
-                        temps_meta=temps_metadata_for_entry,
-                    )
-                    logger.debug("Entry added to processing manifest.")
-                    self.failure_count = 0  # Reset failure count on successful manifest write
-                except Exception as e:
-                    logger.critical(
-                        f"Failed to add entry to processing manifest: {e}. This indicates a serious issue with file locking/writing.",
-                        exc_info=True,
+                image_write = None
+                if self.image_writer is not None and cam_metadata_for_entry:
+                    image_write = self.image_writer.take(cam_metadata_for_entry.get("filename"))
+                if image_write is not None:
+                    # The entry is added once the image is on disk, see _register_written
+                    self.unwritten.append(
+                        (image_write, cam_metadata_for_entry, temps_metadata_for_entry, captured_at)
                     )
+                elif not self._add_to_manifest(
+                    cam_metadata_for_entry, temps_metadata_for_entry, captured_at
+                ):
                     current_collection_successful = False
-                    self.failure_count += 1  # Increment failure count for manifest write failure
 
                 if current_collection_successful:
-                    if CAMERA_TYPE == ImageSourceType.FILE_IMPORTER:
-                        logger.info("Image File import conplete. Collector will now halt.")
-                        self.shutdown_requested = True  # Signal for a clean stop
-                        return
-
-                    if IMAGE_BUFFER_SIZE > 0:
-                        ring_buffer_cleanup(logger=logger)
-
-                    logger.debug(f"Creating flag: {DATA_READY_FLAG}")
-                    try:
-                        DATA_READY_FLAG.touch()
-                        logger.info("--- Collection Cycle Done ---")
-                        logger.debug("COLLECTING -> IDLE")
-                        self.current_state = CollectorState.IDLE
-                    except OSError as e:
-                        logger.critical(
-                            f"Could not create flag {DATA_READY_FLAG}: {e}. This will prevent processor from starting. Transitioning to FATAL_ERROR.",
-                            exc_info=True,
-                        )
-                        time.sleep(POLL_INTERVAL)
-                        self.current_state = CollectorState.FATAL_ERROR
+                    if image_write is None:
+                        self._add_to_image_buffer(cam_metadata_for_entry)
+                        if not self._raise_data_ready_flag():
+                            await self.sleep(POLL_INTERVAL)
+                            self.current_state = CollectorState.FATAL_ERROR
+                            return
+                    logger.info("--- Collection Cycle Done ---")
+                    logger.debug("COLLECTING -> IDLE")
+                    self.current_state = CollectorState.IDLE
                 else:
                     logger.warning(
                         "Data collection cycle finished with errors or manifest write failed."
                     )
                     self.failure_count += 1  # Increment failure count
+                    COLLECTION_FAILURES.inc()
                     logger.debug(f"Failure count: {self.failure_count}/{FAILURE_LIMIT}")
 
                     if self.failure_count >= FAILURE_LIMIT:
@@ -250,63 +429,111 @@ class Collector:
                         logger.debug("Retrying collection...")
                         self.current_state = CollectorState.COLLECTING
                         logger.debug(f"Waiting {RETRY_DELAY}s before retrying...")
-                        time.sleep(RETRY_DELAY)
+                        await self.sleep(RETRY_DELAY)
+
+            case CollectorState.IMPORTING:
+                await self._import_next_batch()
 
             case CollectorState.FATAL_ERROR:
                 # Should not technically be called again once in this state if loop breaks
                 logger.error("[FATAL ERROR] Shutting down collector.")
-                time.sleep(10)  # Sleep long if it somehow gets called
-
-    def run(self):
-        """Main loop for the collector process."""
-        logger.info("--- Starting Collector ---")
-        print("--- Starting Collector ---")
+                await self.sleep(10)  # Sleep long if it somehow gets called
 
+    def on_start(self) -> bool:
         # Initial cleanup: remove data ready flag if it exists on startup
         if settings:
             snapshot_configs(logger=logger)
 
-            files_to_move = [Path(DATA_DIR, METADATA_FILENAME)]
-            move_existing_files_to_backup(files_to_move, logger=logger)
-            logger.info("Moved existing files to backup directory.")
+            if ENABLE_CAMERA and CAMERA_TYPE == ImageSourceType.FILE_IMPORTER:
+                self.image_import = ImageFileImport(DATA_DIR)
+                if not IMPORT_RESUME:
+                    self.image_import.checkpoint.reset()
+            resume_import = self.image_import is not None and self.image_import.checkpoint.exists()
+
+            carried_entries = []
+            if STORAGE_MODE == StorageMode.RING:
+                # Frames left in the ring from a previous run are kept as files if they were
+                # never synced (all of them without the syncer), with their manifest entries
+                # pointed at those files, then a fresh ring is started.
+                frame_ring = get_frame_ring(DATA_DIR)
+                manifest_path = Path(DATA_DIR, METADATA_FILENAME)
+                spilled = frame_ring.spill_unsynced(DATA_DIR, manifest_path=manifest_path)
+                if spilled:
+                    logger.info(f"Saved {len(spilled)} unsynced frames from the frame ring.")
+                    if not resume_import:
+                        spilled_names = {path.name for path in spilled}
+                        carried_entries = [
+                            entry
+                            for entry in load_metadata_with_lock(manifest_path)
+                            if (entry.get("camera_data") or {}).get("filename") in spilled_names
+                        ]
+                frame_ring.discard()
+
+            if resume_import:
+                # Entries added before the interruption may not have been processed yet
+                logger.info("Resuming an interrupted image import. Keeping the existing manifest.")
+            else:
+                files_to_move = [
+                    Path(DATA_DIR, METADATA_FILENAME),
+                    Path(DATA_DIR, SYNCED_LOG_FILENAME),
+                ]
+                move_existing_files_to_backup(files_to_move, logger=logger)
+                logger.info("Moved existing files to backup directory.")
+                if carried_entries:
+                    # The new manifest takes over the saved frames, so they are still processed and synced
+                    for entry in carried_entries:
+                        if entry.get("processing_status") == "processing":
+                            entry["processing_status"] = "pending"  # Interrupted by the restart
+                    append_metadata(Path(DATA_DIR, METADATA_FILENAME), carried_entries)
+                    logger.info(f"Carried {len(carried_entries)} entries of saved frames into the new manifest.")
+            # The frame ring recycles its own slots, so there is nothing to clean up
+            if IMAGE_BUFFER_SIZE > 0 and STORAGE_MODE == StorageMode.FILES:
+                self.image_buffer = ImageRingBuffer(logger=logger)
+                # Synced images announced on the message bus (if enabled) save manifest reloads
+                if ENABLE_SYNCER:
+                    self.bus = subscribe("collector", {EventType.IMAGE_SYNCED})
+
+            if self.image_import is not None:
+                self.import_batches = self.image_import.batches()
+            elif ENABLE_CAMERA and IMAGE_WRITER_THREADS > 0:
+                self.image_writer = ImageWriter(IMAGE_WRITER_THREADS, IMAGE_WRITER_QUEUE_SIZE)
+                set_image_writer(self.image_writer)
+
+            if ENABLE_THERMOCOUPLE and TEMPERATURE_SAMPLE_INTERVAL > 0:
+                self.temperature_sampler = TemperatureSampler(
+                    TEMPERATURE_SAMPLE_INTERVAL, list(THERMOCOUPLE_IDS.values())
+                )
+                self.temperature_sampler.start()
+                # So the first capture has a reading to attach
+                if not self.temperature_sampler.wait_ready(self.temperature_sampler.max_age):
+                    logger.warning("No temperature sample yet. Continuing without waiting.")
+
             try:
                 DATA_READY_FLAG.unlink(missing_ok=True)
                 logger.debug(f"Ensured flag {DATA_READY_FLAG} is initially removed.")
             except OSError as e:
                 logger.warning(f"Could not remove initial flag {DATA_READY_FLAG}: {e}")
-
-        try:
-            while not self.shutdown_requested:
-                self._perform_collection()
-
-                # After a cycle is complete, send a heartbeat.
-                update_service_status(SCRIPT_NAME, heartbeat=True)
-
-                # --- Check for FATAL_ERROR state to exit ---
-                if self.current_state == CollectorState.FATAL_ERROR:
-                    logger.error("Exiting due to FATAL_ERROR state.")
-                    break  # Exit the while loop
-
-                # Small sleep even in fast transitions to prevent busy-looping if logic is instant
-                if self.current_state != CollectorState.WAITING_TO_RUN:
-                    time.sleep(0.1)
-        except Exception as e:
-            logger.critical(f"UNEXPECTED ERROR in main loop: {e}", exc_info=True)
-            self.current_state = CollectorState.FATAL_ERROR
-        finally:
-            # Cleanup on exit
-            if settings:
-                logger.info("Cleaning up flags...")
-                try:
-                    DATA_READY_FLAG.unlink(missing_ok=True)
-                except OSError as e:
-                    logger.error(f"Could not clean up flag {DATA_READY_FLAG} on exit: {e}")
-            logger.info("--- Collector Stopped ---")
-            print("--- Collector Stopped ---")
-            if self.current_state == CollectorState.FATAL_ERROR and not self.shutdown_requested:
-                sys.exit(1)
-            else:
-                sys.exit(0)
+        return True
+
+    def on_stop(self):
+        # Cleanup on exit
+        if self.image_writer is not None:
+            logger.info(f"Waiting for {len(self.unwritten)} images to be written...")
+            self.image_writer.close()
+            set_image_writer(None)
+            self._register_written()
+        if self.temperature_sampler is not None:
+            self.temperature_sampler.stop()
+        if self.bus is not None:
+            self.bus.close()
+        if ENABLE_CAMERA:
+            close_sessions()  # Release the camera kept open between captures
+        if settings:
+            logger.info("Cleaning up flags...")
+            try:
+                DATA_READY_FLAG.unlink(missing_ok=True)
+            except OSError as e:
+                logger.error(f"Could not clean up flag {DATA_READY_FLAG} on exit: {e}")
 
 
 def run_collector():
@@ -1,23 +1,61 @@
 import datetime
-import time
 from pathlib import Path
 
 import cv2
 import numpy as np
 
+from phorest_pipeline.collector.sources.camera_session import get_session, to_grayscale
 from phorest_pipeline.shared.config import (
     CAMERA_BRIGHTNESS,
+    CAMERA_BURST_FRAMES,
     CAMERA_INDEX,
     CAMERA_TRANFORM,
 )
+from phorest_pipeline.shared.image_io import CAPTURE_SUFFIX, store_image
 from phorest_pipeline.shared.logger_config import configure_logger
 
-BUFFER_CLEAR_UP_FRAMES = 5
 RESOLUTION = (640, 480)
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename='data_source.log')
 
 
+def _configure_camera(cap: cv2.VideoCapture) -> str | None:
+    """Applies the camera settings to a newly opened camera. Returns an error message, or None."""
+    # --- Camera Settings ---
+    # 0. Set resolution and image format
+    logger.info('[CAMERA] Attempting to set resolution')
+    success = cap.set(cv2.CAP_PROP_FRAME_WIDTH, RESOLUTION[0])
+    success = success and cap.set(cv2.CAP_PROP_FRAME_HEIGHT, RESOLUTION[1])
+    if not success:
+        logger.error(f'[CAMERA] Failed to set the RESOLUTION to: {RESOLUTION[0]}x{RESOLUTION[1]}')
+    else:
+        width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
+        height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        if width != RESOLUTION[0] or height != RESOLUTION[1]:
+            logger.error(f'[CAMERA] Camera resolution not set correctly: {width}x{height}')
+    logger.info('[CAMERA] Camera resolution set')
+
+    # 1. Set Brightness: brightness
+    success = cap.set(cv2.CAP_PROP_BRIGHTNESS, CAMERA_BRIGHTNESS)
+    if not success:
+        logger.info(f'[CAMERA] [ERROR] Could not set CAP_PROP_BRIGHTNESS to {CAMERA_BRIGHTNESS}.')
+    else:
+        current = cap.get(cv2.CAP_PROP_BRIGHTNESS)
+        if current != CAMERA_BRIGHTNESS:
+            logger.error('[CAMERA] CAP_PROP_BRIGHTNESS not set')
+
+    # cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
+    # cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+    # time.sleep(0.2) # Allow time for settings to apply
+    return None
+
+
+def _prepare_frame(frame: np.ndarray) -> np.ndarray:
+    """Keeps the 12 significant bits of a frame and converts it to grayscale, before averaging."""
+    frame = np.bitwise_and(frame.astype(np.uint16), 0x0FFF)
+    return to_grayscale(frame)
+
+
 def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple = None) -> tuple[int, str, dict | None]:
     """
     Controls camera, captures image, saves, returns status and metadata dict.
@@ -29,7 +67,6 @@ def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple =
         metadata_dict: Dictionary with capture details on success, None on failure.
     """
     logger.info('[CAMERA] --- Starting Argus Camera Controller ---')
-    cap = None
     filepath = None
     metadata_dict = None
 
@@ -38,62 +75,19 @@ def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple =
         RESOLUTION = resolution
 
     try:
-        logger.info(f'[CAMERA] Opening camera {CAMERA_INDEX}...')
-        cap = cv2.VideoCapture(CAMERA_INDEX)
-
-        if not cap.isOpened():
-            return (1, f'[CAMERA] [ERROR] Could not open camera at index {CAMERA_INDEX}.', None)
-        logger.info(f'[CAMERA] Camera {CAMERA_INDEX} opened.')
-        time.sleep(0.1)
-
-        # --- Camera Settings ---
-        # 0. Set resolution and image format
-        logger.info('[CAMERA] Attempting to set resolution')
-        success = cap.set(cv2.CAP_PROP_FRAME_WIDTH, RESOLUTION[0])
-        success = success and cap.set(cv2.CAP_PROP_FRAME_HEIGHT, RESOLUTION[1])
-        if not success:
-            logger.error(f'[CAMERA] Failed to set the RESOLUTION to: {RESOLUTION[0]}x{RESOLUTION[1]}')
-        else:
-            width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-            height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
-            if width != RESOLUTION[0] or height != RESOLUTION[1]:
-                logger.error(f'[CAMERA] Camera resolution not set correctly: {width}x{height}')
-        logger.info('[CAMERA] Camera resolution set')
-
-        # 1. Set Brightness: brightness
-        success = cap.set(cv2.CAP_PROP_BRIGHTNESS, CAMERA_BRIGHTNESS)
-        if not success:
-            logger.info(f'[CAMERA] [ERROR] Could not set CAP_PROP_BRIGHTNESS to {CAMERA_BRIGHTNESS}.')
-        else:
-            current = cap.get(cv2.CAP_PROP_BRIGHTNESS)
-            if current != CAMERA_BRIGHTNESS:
-                logger.error('[CAMERA] CAP_PROP_BRIGHTNESS not set')
-
-        # cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        # cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        # time.sleep(0.2) # Allow time for settings to apply
-        logger.info('[CAMERA] Camera configuration complete.')
-
-        # --- Clear camera buffer ---
-        logger.info(f'[CAMERA] Clearing camera buffer with {BUFFER_CLEAR_UP_FRAMES} captures...')
-        for i in range(BUFFER_CLEAR_UP_FRAMES):
-            ret, _ = cap.read()  # Read and discard the frame
-            if not ret:
-                logger.info(f'[CAMERA] [WARN] Warm-up frame {i + 1} capture failed. Continuing...')
-                time.sleep(0.5)
-            else:
-                time.sleep(0.1)
-        logger.info('[CAMERA] Warm-up complete.')
+        session = get_session(CAMERA_INDEX, RESOLUTION, _configure_camera)
 
-        logger.info('[CAMERA] Taking image ...')
-        ret, frame_raw = cap.read()  # Read the frame
-        frame_raw = frame_raw.astype(np.uint16)
-        frame_raw = np.bitwise_and(frame_raw, 0x0FFF)
+        if CAMERA_BURST_FRAMES > 1:
+            logger.info(f'[CAMERA] Taking burst of {CAMERA_BURST_FRAMES} frames ...')
+        else:
+            logger.info('[CAMERA] Taking image ...')
+        frame_raw, read_error_msg = session.read_mean(CAMERA_BURST_FRAMES, _prepare_frame)
         capture_timestamp = datetime.datetime.now()
 
-        if not ret or frame_raw is None:
-            return (1, '[CAMERA] [ERROR] Failed to capture frame.', None)
+        if frame_raw is None:
+            return (1, read_error_msg, None)
         else:
+
             original_dtype = str(frame_raw.dtype)
             logger.info(f'[CAMERA] Raw frame captured. Shape: {frame_raw.shape}, dtype: {original_dtype}')
 
@@ -155,7 +149,7 @@ def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple =
             # --- Save the 8-bit Grayscale Frame ---
             if not savename:
                 filename = (
-                    f'image_{capture_timestamp.strftime("%Y%m%d_%H%M%S_%f")}_cam{CAMERA_INDEX}.png'
+                    f'image_{capture_timestamp.strftime("%Y%m%d_%H%M%S_%f")}_cam{CAMERA_INDEX}{CAPTURE_SUFFIX}'
                 )
             else:
                 filename = savename
@@ -163,7 +157,7 @@ def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple =
             filepath.parent.mkdir(parents=True, exist_ok=True)  # Ensure data_dir exists
 
             logger.info(f'[CAMERA] Saving image to {filepath} ...')
-            saved = cv2.imwrite(str(filepath), frame_gray_8bit)  # Use original BGR frame
+            saved = store_image(filepath, frame_gray_8bit)
 
             if saved:
                 logger.info('[CAMERA] Image saved.')
@@ -187,7 +181,4 @@ def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple =
     except Exception as e:
         return (1, f'[CAMERA] [ERROR] Unexpected error: {e}', None)
     finally:
-        if cap is not None and cap.isOpened():
-            cap.release()
-            logger.info(f'[CAMERA] Camera {CAMERA_INDEX} released.')
         logger.info('[CAMERA] --- Camera Controller Done ---')
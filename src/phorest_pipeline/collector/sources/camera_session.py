@@ -0,0 +1,376 @@
+import threading
+import time
+from collections.abc import Callable
+
+import cv2
+import numpy as np
+
+from phorest_pipeline.shared.config import CAMERA_BACKGROUND_GRAB
+from phorest_pipeline.shared.logger_config import configure_logger
+
+logger = configure_logger(name=__name__, rotate_daily=True, log_filename='data_source.log')
+
+BUFFER_CLEAR_UP_FRAMES = 5  # Frames discarded after opening, while the camera settles
+OPEN_ATTEMPTS = 5
+OPEN_RETRY_DELAY = 0.5
+GRAB_TIMEOUT = 5.0  # Seconds to wait for a new frame from the grabber thread
+
+# Open camera sessions, by camera index
+_sessions = {}
+# Functions that release cameras not read through a CameraSession
+_cleanups = []
+_background_grab = CAMERA_BACKGROUND_GRAB
+
+
+def to_grayscale(frame: np.ndarray) -> np.ndarray:
+    """Converts a 3-channel (BGR) frame to single channel. Other frames are returned as they are."""
+    if frame.ndim == 3 and frame.shape[2] == 3:
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return frame
+
+
+class FrameAverager:
+    """
+    Averages a burst of frames. Frames are added in place to a float32 sum
+    (cv2.accumulate), which is allocated once and reused for every burst of
+    the same frame shape, so no per-frame copies are made. The mean is
+    returned rounded to the dtype of the frames, so the rest of the capture
+    path sees an ordinary frame with less noise.
+    """
+
+    def __init__(self):
+        self._sum = None
+        self._dtype = None
+        self.count = 0
+
+    def add(self, frame: np.ndarray):
+        if self.count == 0:
+            if self._sum is None or self._sum.shape != frame.shape:
+                self._sum = np.empty(frame.shape, np.float32)
+            self._sum[...] = frame
+            self._dtype = frame.dtype
+        else:
+            cv2.accumulate(frame, self._sum)
+        self.count += 1
+
+    def mean(self) -> np.ndarray:
+        """Returns the mean of the frames added since the last call, and starts a new burst."""
+        self._sum *= 1.0 / self.count
+        if np.issubdtype(self._dtype, np.integer):
+            np.rint(self._sum, out=self._sum)
+        self.count = 0
+        return self._sum.astype(self._dtype)
+
+
+class FrameGrabber(threading.Thread):
+    """
+    Reads frames from a camera session continuously, so the driver never
+    queues stale frames and the latest frame is always at hand.
+
+    Frames are read into a double buffer: the thread fills the back buffer
+    (reusing its memory) while readers copy the front one, and the two are
+    swapped under a lock after every read. If a read fails the thread reopens
+    the camera itself.
+    """
+
+    def __init__(self, session: 'CameraSession'):
+        super().__init__(name=f'frame-grabber-cam{session.camera_index}', daemon=True)
+        self.session = session
+        self.error_msg = None
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._front = None
+        self._back = None
+        self._sequence = 0
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if not self.session.is_open:
+                self.error_msg = self.session.open(self._stop_event)
+                if self.error_msg:
+                    self._stop_event.wait(OPEN_RETRY_DELAY)
+                    continue
+            cap = self.session.cap
+            ret, frame = cap.read(self._back) if self._back is not None else cap.read()
+            if not ret or frame is None:
+                logger.warning(
+                    f'[CAMERA] Failed to read from camera {self.session.camera_index}. Reconnecting...'
+                )
+                self.session.release()
+                continue
+            with self._condition:
+                self._back, self._front = self._front, frame
+                self._sequence += 1
+                self.error_msg = None
+                self._condition.notify_all()
+
+    def latest(self, after: int, timeout: float = GRAB_TIMEOUT) -> tuple[np.ndarray | None, int]:
+        """
+        Returns a copy of the latest frame and its sequence number, waiting up
+        to 'timeout' seconds for a frame newer than sequence number 'after'.
+        Returns (None, 'after') if no new frame arrived in time.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._sequence > after, timeout):
+                return None, after
+            return self._front.copy(), self._sequence
+
+    def add_latest(
+        self,
+        after: int,
+        averager: FrameAverager,
+        prepare: Callable[[np.ndarray], np.ndarray] | None = None,
+        timeout: float = GRAB_TIMEOUT,
+    ) -> int:
+        """
+        Like latest(), but adds the frame (passed through 'prepare', if given)
+        to 'averager' instead of copying it. Returns the frame's sequence
+        number, or 'after' if no new frame arrived in time.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._sequence > after, timeout):
+                return after
+            averager.add(prepare(self._front) if prepare else self._front)
+            return self._sequence
+
+    def stop(self):
+        """
+        Stops the thread and waits until it has exited, so the camera can be
+        released safely. A reopen in progress gives up at its next attempt.
+        """
+        self._stop_event.set()
+        while self.is_alive():
+            self.join(timeout=GRAB_TIMEOUT)
+            if self.is_alive():
+                logger.warning(
+                    f'[CAMERA] Still waiting for the frame grabber of camera {self.session.camera_index} to stop...'
+                )
+
+
+def use_background_grab(enabled: bool):
+    """Sets whether sessions created from now on read frames in a FrameGrabber thread."""
+    global _background_grab
+    _background_grab = enabled
+
+
+class CameraSession:
+    """
+    An OpenCV camera kept open across captures.
+
+    The camera is opened, configured and warmed up once, on the first read,
+    so each later capture costs about one frame period instead of the
+    seconds it takes to open and set up the device. If a read fails the
+    camera is closed and opened again (reconnect), and the read is retried
+    once before the failure is reported.
+
+    With 'background' set, frames are read continuously by a FrameGrabber
+    thread and a read returns the latest frame that arrived after the
+    previous read, so captures are not delayed by stale buffered frames and
+    consecutive reads follow the camera's frame rate.
+
+    read_mean() averages a burst of consecutive frames (see FrameAverager).
+
+    'configure' applies the camera settings to a newly opened capture and
+    returns an error message, or None on success.
+    """
+
+    def __init__(
+        self,
+        camera_index: int,
+        resolution: tuple,
+        configure: Callable[[cv2.VideoCapture], str | None],
+        warmup_frames: int = BUFFER_CLEAR_UP_FRAMES,
+        background: bool = False,
+    ):
+        self.camera_index = camera_index
+        self.resolution = resolution
+        self.configure = configure
+        self.warmup_frames = warmup_frames
+        self.background = background
+        self.cap = None
+        self._grabber = None
+        self._last_sequence = 0
+        self._averager = FrameAverager()
+        self._burst_buffer = None  # Reused by cap.read() for the frames of a burst
+
+    @property
+    def is_open(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def open(self, stop_event: threading.Event | None = None) -> str | None:
+        """
+        Opens, configures and warms up the camera. Returns an error message, or
+        None. If 'stop_event' is set, the attempts to open the camera stop.
+        """
+        self.release()
+        logger.info(f'[CAMERA] Opening camera {self.camera_index}...')
+        for attempt in range(OPEN_ATTEMPTS):
+            if stop_event is not None and stop_event.is_set():
+                return f'[CAMERA] Opening camera {self.camera_index} cancelled.'
+            self.cap = cv2.VideoCapture(self.camera_index)
+            if self.cap.isOpened():
+                break
+            logger.warning(
+                f'[CAMERA] Camera {self.camera_index} not opened (attempt {attempt + 1}/{OPEN_ATTEMPTS}).'
+            )
+            self.release()
+            if stop_event is not None:
+                stop_event.wait(OPEN_RETRY_DELAY)
+            else:
+                time.sleep(OPEN_RETRY_DELAY)
+        else:
+            self.release()
+            return f'[CAMERA] [ERROR] Could not open camera at index {self.camera_index}.'
+        logger.info(f'[CAMERA] Camera {self.camera_index} opened.')
+        time.sleep(0.1)
+
+        # Keep as few frames queued in the driver as possible, so reads are not stale.
+        # Not every backend supports this.
+        if not self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+            logger.debug('[CAMERA] Could not set CAP_PROP_BUFFERSIZE.')
+
+        logger.info('[CAMERA] Configuring camera settings...')
+        error_msg = self.configure(self.cap)
+        if error_msg:
+            self.release()
+            return error_msg
+        logger.info('[CAMERA] Camera configuration complete.')
+
+        logger.info(f'[CAMERA] Clearing camera buffer with {self.warmup_frames} captures...')
+        for i in range(self.warmup_frames):
+            ret, _ = self.cap.read()  # Read and discard the frame
+            if not ret:
+                logger.warning(f'[CAMERA] Warm-up frame {i + 1} capture failed. Continuing...')
+                time.sleep(0.5)
+            else:
+                time.sleep(0.1)
+        logger.info('[CAMERA] Warm-up complete.')
+        return None
+
+    def _read_frame(self) -> np.ndarray | None:
+        # One read costs one frame period. The frame may have waited in the driver's
+        # buffer since before this capture was requested; background_grab avoids that.
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def read(self) -> tuple[np.ndarray | None, str | None]:
+        """
+        Returns a fresh frame, opening the camera if needed, as (frame, None),
+        or (None, error message) if no frame could be read, even after reconnecting.
+        """
+        if self.background:
+            return self._read_latest()
+        if not self.is_open:
+            error_msg = self.open()
+            if error_msg:
+                return None, error_msg
+        frame = self._read_frame()
+        if frame is not None:
+            return frame, None
+
+        logger.warning(f'[CAMERA] Failed to read from camera {self.camera_index}. Reconnecting...')
+        error_msg = self.open()
+        if error_msg:
+            return None, error_msg
+        frame = self._read_frame()
+        if frame is None:
+            self.release()
+            return None, '[CAMERA] [ERROR] Failed to capture frame.'
+        return frame, None
+
+    def _read_latest(self) -> tuple[np.ndarray | None, str | None]:
+        if self._grabber is None:
+            # Open here rather than in the thread, so a camera that cannot be opened is reported
+            error_msg = self.open()
+            if error_msg:
+                return None, error_msg
+            self._grabber = FrameGrabber(self)
+            self._grabber.start()
+            logger.info(f'[CAMERA] Started frame grabber for camera {self.camera_index}.')
+        frame, self._last_sequence = self._grabber.latest(self._last_sequence)
+        if frame is None:
+            return None, self._grabber.error_msg or '[CAMERA] [ERROR] No new frame from the camera.'
+        return frame, None
+
+    def read_mean(
+        self, count: int, prepare: Callable[[np.ndarray], np.ndarray] | None = None
+    ) -> tuple[np.ndarray | None, str | None]:
+        """
+        Returns the mean of 'count' consecutive frames, as (frame, None), or
+        (None, error message) if not even the first frame could be read. If a
+        later frame of the burst fails, the frames read so far are averaged.
+
+        'prepare' is applied to every frame before it is averaged, e.g. to mask
+        unused bits or convert to grayscale (which also keeps the sum small).
+        """
+        frame, error_msg = self.read()
+        if frame is not None and prepare is not None:
+            frame = prepare(frame)
+        if frame is None or count <= 1:
+            return frame, error_msg
+        self._averager.add(frame)
+        for _ in range(count - 1):
+            if self.background:
+                sequence = self._grabber.add_latest(self._last_sequence, self._averager, prepare)
+                if sequence == self._last_sequence:
+                    break
+                self._last_sequence = sequence
+            else:
+                ret, frame = self.cap.read(self._burst_buffer)
+                if not ret or frame is None:
+                    break
+                self._burst_buffer = frame
+                self._averager.add(prepare(frame) if prepare else frame)
+        if self._averager.count < count:
+            logger.warning(
+                f'[CAMERA] Burst read failed after {self._averager.count} of {count} frames. '
+                'Averaging the frames read.'
+            )
+        return self._averager.mean(), None
+
+    def close(self):
+        """Stops the frame grabber (if any), waiting for its thread to exit, and releases the camera."""
+        if self._grabber is not None:
+            self._grabber.stop()
+            self._grabber = None
+        self.release()
+
+    def release(self):
+        if self.cap is not None:
+            if self.cap.isOpened():
+                self.cap.release()
+                logger.info(f'[CAMERA] Camera {self.camera_index} released.')
+            self.cap = None
+
+
+def get_session(
+    camera_index: int, resolution: tuple, configure: Callable[[cv2.VideoCapture], str | None]
+) -> CameraSession:
+    """
+    Returns the open session of a camera, creating it on first use. A session
+    opened with a different resolution is closed and replaced.
+    """
+    session = _sessions.get(camera_index)
+    if session is not None and tuple(session.resolution) != tuple(resolution):
+        logger.info(f'[CAMERA] Resolution of camera {camera_index} changed. Reopening.')
+        session.close()
+        session = None
+    if session is None:
+        session = CameraSession(camera_index, resolution, configure, background=_background_grab)
+        _sessions[camera_index] = session
+    return session
+
+
+def register_cleanup(cleanup: Callable[[], None]):
+    """Registers a function that close_sessions() calls, for cameras not read through a CameraSession."""
+    if cleanup not in _cleanups:
+        _cleanups.append(cleanup)
+
+
+def close_sessions():
+    """Releases every open camera, e.g. when the collector stops."""
+    for session in _sessions.values():
+        session.close()
+    _sessions.clear()
+    for cleanup in _cleanups:
+        cleanup()
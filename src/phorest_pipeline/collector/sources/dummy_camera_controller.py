@@ -5,6 +5,7 @@ import cv2
 import numpy as np
 
 from phorest_pipeline.shared.config import CAMERA_TRANFORM
+from phorest_pipeline.shared.image_io import CAPTURE_SUFFIX, store_image
 from phorest_pipeline.shared.logger_config import configure_logger
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename='data_source.log')
@@ -96,7 +97,7 @@ def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple =
             # --- Save the 8-bit Grayscale Frame ---
             if not savename:
                 filename = (
-                    f'image_{capture_timestamp.strftime("%Y%m%d_%H%M%S_%f")}_cam{CAMERA_INDEX}.png'
+                    f'image_{capture_timestamp.strftime("%Y%m%d_%H%M%S_%f")}_cam{CAMERA_INDEX}{CAPTURE_SUFFIX}'
                 )
             else:
                 filename = savename
@@ -104,7 +105,7 @@ def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple =
             filepath.parent.mkdir(parents=True, exist_ok=True)  # Ensure data_dir exists
 
             logger.info(f'[DUMMY CAMERA] Saving image to {filepath} ...')
-            saved = cv2.imwrite(str(filepath), frame_gray_8bit)  # Use original BGR frame
+            saved = store_image(filepath, frame_gray_8bit)
 
             if saved:
                 logger.info('[DUMMY CAMERA] Image saved.')
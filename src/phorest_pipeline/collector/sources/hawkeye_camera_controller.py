@@ -1,18 +1,30 @@
 import datetime
+import shlex
 import subprocess
 from pathlib import Path
 
 import cv2
 import numpy as np
 
+from phorest_pipeline.collector.sources.camera_session import (
+    FrameAverager,
+    register_cleanup,
+    to_grayscale,
+)
+from phorest_pipeline.collector.sources.mjpeg_stream import MjpegStream
 from phorest_pipeline.shared.config import (
     CAMERA_BRIGHTNESS,
+    CAMERA_BURST_FRAMES,
     CAMERA_CONTRAST,
     CAMERA_EXPOSURE,
     CAMERA_GAIN,
     CAMERA_INDEX,
     CAMERA_TRANFORM,
+    HAWKEYE_STREAM_COMMAND,
+    HAWKEYE_STREAM_FRAMERATE,
+    HAWKEYE_STREAMING,
 )
+from phorest_pipeline.shared.image_io import CAPTURE_SUFFIX, store_image
 from phorest_pipeline.shared.logger_config import configure_logger
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename="data_source.log")
@@ -20,13 +32,168 @@ logger = configure_logger(name=__name__, rotate_daily=True, log_filename="data_s
 RESOLTION = (9152, 6944)
 # CAMERA_BRIGHTNESS = 0 # Range: -1.0 (dark) to 1.0 (bright)
 
+STREAM_TIMEOUT = 10.0  # Seconds to wait for a frame from the stream (includes camera start-up)
+
+# Streaming mode: one rpicam-vid process kept running, see MjpegStream
+_stream = None
+_stream_resolution = None
+_last_sequence = 0
+_averager = FrameAverager()
+
+
+def _camera_options() -> list[str]:
+    """Options shared by rpicam-jpeg and rpicam-vid."""
+    return [
+        "-c",
+        str(CAMERA_INDEX),  # Camera 0-based ID (should be 0 for single camera)
+        "--nopreview",  # Don't show preview on capture
+        "--width",
+        str(RESOLTION[0]),  # Set image width
+        "--height",
+        str(RESOLTION[1]),  # Set image height
+        "--gain",
+        str(CAMERA_GAIN),  # Set analog gain
+        "--brightness",
+        str(CAMERA_BRIGHTNESS),  # Set brightness
+        "--contrast",
+        str(CAMERA_CONTRAST),  # Set contrast
+        "--shutter",
+        str(CAMERA_EXPOSURE * 1_000_000),  # Set exposure time (microseconds)
+        "--vflip",  # In camera vertical flip
+        "--quality",
+        "93",  # JPEG compression quality (0-100)
+    ]
+
+
+def _capture_still() -> tuple[np.ndarray | None, str | None]:
+    """Captures one frame with a new rpicam-jpeg process. Returns (frame, None) or (None, error message)."""
+    # --- Build rpicam-jpeg command ---
+    rpicam_cmd = [
+        "rpicam-jpeg",
+        *_camera_options(),
+        "--output",
+        "-",  # Output to STDOUT
+        "--timeout",
+        "100",  # Time to wait before capture (e.g., for auto-exposure to settle)
+        "--info-text",
+        "%md",  # Include metadata in stderr for diagnostics
+    ]
+
+    logger.info(f"[CAMERA] Executing libcamera capture command: {' '.join(rpicam_cmd)}")
+
+    # --- Execute the command using subprocess ---
+    result = subprocess.run(rpicam_cmd, capture_output=True, check=False)
+
+    if result.stderr:
+        logger.info("[CAMERA] --- rpicam-jpeg STDERR Output (Diagnostics) ---")
+        for line in result.stderr.splitlines():
+            logger.info(line)
+        logger.info("[CAMERA] -------------------------------------------------")
+
+    # Check if the rpicam-jpeg command was successful
+    if result.returncode != 0:
+        error_msg = (
+            f"[CAMERA] [ERROR] rpicam-jpeg command failed with exit code {result.returncode}. "
+            f"Stderr: {result.stderr.strip()}"
+        )
+        return None, error_msg
+
+    logger.info("[CAMERA] Image capture command executed successfully by rpicam-jpeg.")
+
+    # --- Decode the image from the in-memory buffer ---
+    image_bytes = result.stdout
+    if not image_bytes:
+        return None, "[CAMERA] [ERROR] rpicam-jpeg produced no image data."
+    return _decode(image_bytes)
+
+
+def _decode(image_bytes: bytes) -> tuple[np.ndarray | None, str | None]:
+    # Use cv2.imdecode to convert the byte buffer into a NumPy array
+    frame_captured = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_UNCHANGED)
+    if frame_captured is None:
+        return None, "[CAMERA] [ERROR] OpenCV failed to decode the image from memory buffer."
+    return frame_captured, None
+
+
+def _stream_command() -> list[str]:
+    if HAWKEYE_STREAM_COMMAND:
+        return shlex.split(HAWKEYE_STREAM_COMMAND)
+    return [
+        "rpicam-vid",
+        *_camera_options(),
+        "--codec",
+        "mjpeg",  # A complete JPEG per frame
+        "--framerate",
+        str(HAWKEYE_STREAM_FRAMERATE),  # Only the latest frame is used, so no need for the full sensor rate
+        "--timeout",
+        "0",  # Stream until stopped
+        "--output",
+        "-",  # Output to STDOUT
+    ]
+
+
+def _capture_from_stream() -> tuple[np.ndarray | None, str | None]:
+    """
+    Returns the next frame from the camera stream, starting (or restarting)
+    the streaming process if needed. Returns (frame, None) or (None, error message).
+    """
+    global _stream, _stream_resolution, _last_sequence
+    for _ in range(2):  # A stream that has ended is restarted once
+        if _stream is None or not _stream.is_running or _stream_resolution != RESOLTION:
+            close_stream()
+            _stream = MjpegStream(_stream_command())
+            _stream.start()
+            _stream_resolution = RESOLTION
+            _last_sequence = 0
+            register_cleanup(close_stream)
+        image_bytes, _last_sequence = _stream.latest(_last_sequence, STREAM_TIMEOUT)
+        if image_bytes is not None:
+            return _decode(image_bytes)
+    return None, "[CAMERA] [ERROR] No frame received from the camera stream."
+
+
+def _capture_burst(count: int) -> tuple[np.ndarray | None, str | None]:
+    """
+    Returns the mean of 'count' frames (see FrameAverager), in grayscale.
+    Frames are converted before they are averaged, which keeps the sum a
+    third of the size. Each frame costs a full rpicam-jpeg run unless
+    streaming is enabled.
+    """
+    capture = _capture_from_stream if HAWKEYE_STREAMING else _capture_still
+    frame, error_msg = capture()
+    if frame is None:
+        return frame, error_msg
+    frame = to_grayscale(frame)
+    if count <= 1:
+        return frame, None
+    _averager.add(frame)
+    for _ in range(count - 1):
+        frame, error_msg = capture()
+        if frame is None:
+            logger.warning(
+                f"[CAMERA] Burst capture failed after {_averager.count} of {count} frames: "
+                f"{error_msg} Averaging the frames captured."
+            )
+            break
+        _averager.add(to_grayscale(frame))
+    return _averager.mean(), None
+
+
+def close_stream():
+    """Stops the streaming process, if one is running."""
+    global _stream
+    if _stream is not None:
+        _stream.stop()
+        _stream = None
+
 
 def camera_controller(
     data_dir: Path, savename: Path = None, resolution: tuple = None
 ) -> tuple[int, str, dict | None]:
     """
     Controls camera using libcamera tools (rpicam-jpeg), captures image,
-    saves, returns status and metadata dict.
+    saves, returns status and metadata dict. With 'hawkeye_streaming' set,
+    frames are taken from a single rpicam-vid process kept running instead.
 
     Args:
         data_dir (Path): Directory to save the captured image.
@@ -50,69 +217,8 @@ def camera_controller(
     try:
         capture_timestamp = datetime.datetime.now()
 
-        # --- Build rpicam-jpeg command ---
-        rpicam_cmd = [
-            "rpicam-jpeg",
-            "-c",
-            str(CAMERA_INDEX),  # Camera 0-based ID (should be 0 for single camera)
-            "--output",
-            "-",  # Output to STDOUT
-            "--nopreview",  # Don't show preview on capture
-            "--width",
-            str(RESOLTION[0]),  # Set image width
-            "--height",
-            str(RESOLTION[1]),  # Set image height
-            "--gain",
-            str(CAMERA_GAIN),  # Set analog gain
-            "--brightness",
-            str(CAMERA_BRIGHTNESS),  # Set brightness
-            "--contrast",
-            str(CAMERA_CONTRAST),  # Set contrast
-            "--shutter",
-            str(CAMERA_EXPOSURE * 1_000_000),  # Set exposure time (microseconds)
-            "--vflip",  # In camera vertical flip
-            "--timeout",
-            "100",  # Time to wait before capture (e.g., for auto-exposure to settle)
-            "--quality",
-            "93",  # JPEG compression quality (0-100)
-            "--info-text",
-            "%md",  # Include metadata in stderr for diagnostics
-        ]
-
-        logger.info(f"[CAMERA] Executing libcamera capture command: {' '.join(rpicam_cmd)}")
-
-        # --- Execute the command using subprocess ---
-        result = subprocess.run(rpicam_cmd, capture_output=True, check=False)
-
-        if result.stderr:
-            logger.info("[CAMERA] --- rpicam-jpeg STDERR Output (Diagnostics) ---")
-            for line in result.stderr.splitlines():
-                logger.info(line)
-            logger.info("[CAMERA] -------------------------------------------------")
-
-        # Check if the rpicam-jpeg command was successful
-        if result.returncode != 0:
-            error_msg = (
-                f"[CAMERA] [ERROR] rpicam-jpeg command failed with exit code {result.returncode}. "
-                f"Stderr: {result.stderr.strip()}"
-            )
-            logger.error(error_msg)
-            return (1, error_msg, None)
-
-        logger.info("[CAMERA] Image capture command executed successfully by rpicam-jpeg.")
-
-        # --- Decode the image from the in-memory buffer ---
-        image_bytes = result.stdout
-        if not image_bytes:
-            error_msg = "[CAMERA] [ERROR] rpicam-jpeg produced no image data."
-            logger.error(error_msg)
-            return (1, error_msg, None)
-
-        # Use cv2.imdecode to convert the byte buffer into a NumPy array
-        frame_captured = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_UNCHANGED)
-
+        frame_captured, error_msg = _capture_burst(CAMERA_BURST_FRAMES)
         if frame_captured is None:
-            error_msg = "[CAMERA] [ERROR] OpenCV failed to decode the image from memory buffer."
             logger.error(error_msg)
             return (1, error_msg, None)
 
@@ -179,7 +285,7 @@ def camera_controller(
         # --- Save the final 8-bit Grayscale Frame ---
         if not savename:
             filename = (
-                f"image_{capture_timestamp.strftime('%Y%m%d_%H%M%S_%f')}_cam{CAMERA_INDEX}.png"
+                f"image_{capture_timestamp.strftime('%Y%m%d_%H%M%S_%f')}_cam{CAMERA_INDEX}{CAPTURE_SUFFIX}"
             )
         else:
             filename = savename
@@ -187,7 +293,7 @@ def camera_controller(
         filepath = Path(data_dir, filename)
         filepath.parent.mkdir(parents=True, exist_ok=True)  # Ensure output directory exists
         logger.info(f"[CAMERA] Saving image to {filepath} ...")
-        saved = cv2.imwrite(str(filepath), frame_gray_8bit)
+        saved = store_image(filepath, frame_gray_8bit)
 
         if saved:
             logger.info("[CAMERA] Image saved successfully.")
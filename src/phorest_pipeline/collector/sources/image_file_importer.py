@@ -1,54 +1,229 @@
 import datetime
-from pathlib import Path
+import os
+import re
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path, PurePosixPath
 
+from phorest_pipeline.shared.config import (
+    IMPORT_CHECKPOINT_FILENAME,
+    IMPORT_CHUNK_SIZE,
+    IMPORT_PATTERNS,
+    IMPORT_RECURSIVE,
+    METADATA_FILENAME,
+)
 from phorest_pipeline.shared.logger_config import configure_logger
+from phorest_pipeline.shared.metadata_manager import load_metadata_with_lock
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename='data_source.log')
 
-SUPPORTED_EXT = ['.png', '.jpg', '.jpeg', '.tif', '.tiff']
+SUPPORTED_EXT = ['.png', '.jpg', '.jpeg', '.webp', '.tif', '.tiff', '.npy']
+STAT_THREADS = 8  # Files without a timestamp in their name are stat'ed in parallel (slow on network drives)
 
+# Timestamp in the names the camera controllers give, e.g. image_20250716_142501_123456_cam0.png
+FILENAME_TIMESTAMP = re.compile(r'(\d{8})_(\d{6})(?:_(\d{6}))?')
 
-def image_file_importer(data_dir: Path) -> tuple[int, str, list[dict] | None]:
+
+def timestamp_from_filename(filename: str) -> datetime.datetime | None:
+    """Returns the capture time in an image's filename, or None if it has none."""
+    match = FILENAME_TIMESTAMP.search(filename)
+    if match is None:
+        return None
+    date, time_of_day, microseconds = match.groups()
+    try:
+        timestamp = datetime.datetime.strptime(date + time_of_day, '%Y%m%d%H%M%S')
+    except ValueError:
+        return None
+    return timestamp.replace(microsecond=int(microseconds or 0))
+
+
+def _modified_time(entry: os.DirEntry) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(entry.stat().st_mtime)
+
+
+def _sorted_entries(directory: Path) -> Iterator[os.DirEntry]:
+    """Lists a directory with os.scandir, in the order its paths sort in (see find_images)."""
+    with os.scandir(directory) as entries:
+        # A directory sorts as 'name/', so its contents come where their full paths sort
+        return iter(sorted(entries, key=lambda entry: f'{entry.name}/' if entry.is_dir() else entry.name))
+
+
+def find_images(data_dir: Path, recursive: bool, patterns: list[str]) -> Iterator[tuple[str, os.DirEntry]]:
     """
-    Scans a directory for existing images and generates a list of metadata entries.
-    This controller runs only once and returns all data as a single batch.
+    Yields the images under 'data_dir' found with os.scandir (no stat() per
+    file), as (path relative to 'data_dir', entry), sorted by that path. Each
+    directory is only listed when the scan reaches it, so the first images
+    are yielded before the rest of the tree has been scanned. If 'patterns'
+    is not empty, only paths matching one of these glob patterns are yielded
+    (matched from the right, like PurePath.match: '*.png' matches at any depth).
     """
-    logger.info('[IMAGE IMPORTER] --- Starting Image File Importer ---')
+    directories = [('', _sorted_entries(data_dir))]
+    while directories:
+        relative_dir, entries = directories[-1]
+        entry = next(entries, None)
+        if entry is None:
+            directories.pop()
+            continue
+        relative_path = f'{relative_dir}/{entry.name}' if relative_dir else entry.name
+        if entry.is_dir():
+            if recursive:
+                directories.append((relative_path, _sorted_entries(Path(data_dir, relative_path))))
+        elif (
+            PurePosixPath(entry.name).suffix.lower() in SUPPORTED_EXT
+            and entry.is_file()
+            and (not patterns or any(PurePosixPath(relative_path).match(p) for p in patterns))
+        ):
+            yield relative_path, entry
 
-    all_metadata_entries = []
 
-    try:
-        if not data_dir.is_dir():
-            return (1, f"Data directory '{data_dir} not found.", None)
-        
-        logger.info(f"[IMAGE IMPORTER] Scanning '{data_dir}' for image files...")
-        image_files = [p for p in data_dir.iterdir() if p.is_file() and p.suffix.lower() in SUPPORTED_EXT]
-
-        if not image_files:
-            return(1, "No image files found in the data directory.", None)
-        
-        image_files.sort(key=lambda p: p.name)
-        logger.info(f"Found {len(image_files)} images. Generating manifest entries...")
-
-        for idx, image_path in enumerate(image_files):
-            capture_timestamp = datetime.datetime.fromtimestamp(image_path.stat().st_mtime)
-            metadata_dict = {
-                'type': 'image',
-                'filename': image_path.name,
-                'filepath': image_path.parent.resolve().as_posix(),
-                'timestamp_iso': capture_timestamp.isoformat(),
-                'camera_index': 'IMAGE_IMPORTER',
-                'error_flag': False,
-                'error_message': None,
-            }
-            all_metadata_entries.append(metadata_dict)
-            if idx % 50 == 0:
-                logger.info(f"Processed {idx} of {len(image_files)} files...")
-
-        msg = f"Successfully generated {len(all_metadata_entries)} manifest entries from legacy data."
-        logger.info(msg)
-        return (0, msg, all_metadata_entries)
-    
-    except Exception as e:
-        logger.error(f"An unexpected error occurred: {e}", exc_info=True)
-        return (1, f"Unexpected error in legacy importer: {e}", None)
+class ImportCheckpoint:
+    """
+    The images an import has already added to the manifest, as a text file
+    with one path (relative to the imported directory) per line. Lines are
+    only appended, and flushed to disk right after each batch is added to
+    the manifest.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> set[str]:
+        try:
+            with self.path.open('r') as f:
+                return {line.rstrip('\n') for line in f if line.strip()}
+        except FileNotFoundError:
+            return set()
+
+    def record(self, relative_paths: list[str]):
+        with self.path.open('a') as f:
+            f.writelines(f'{relative_path}\n' for relative_path in relative_paths)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def reset(self):
+        self.path.unlink(missing_ok=True)
+
+
+class ImageFileImport:
+    """
+    Imports the existing images under a directory (the legacy data importer).
+
+    batches() yields the metadata entries of the images in batches of
+    'chunk_size', in path order, so each batch can be added to the manifest
+    (and processed) while the next one is prepared. Capture times are taken
+    from the filenames where possible, and only files without one are
+    stat'ed for their modification time.
+
+    Once a batch has been added to the manifest, mark_imported() records it
+    in the checkpoint file ('checkpoint_filename' in the data directory).
+    Images recorded there are skipped, so an interrupted import resumes where
+    it stopped instead of adding images twice. The checkpoint is removed once
+    every batch has been added. On resume, images already in
+    the manifest are skipped as well (the import may have stopped between
+    adding a batch and recording it), as are the PNGs the compressor made
+    from imported '.npy' files.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        recursive: bool = IMPORT_RECURSIVE,
+        patterns: list[str] = IMPORT_PATTERNS,
+        checkpoint: ImportCheckpoint | None = None,
+        manifest_path: Path | None = None,
+    ):
+        self.data_dir = data_dir
+        self.chunk_size = chunk_size
+        self.recursive = recursive
+        self.patterns = list(patterns)
+        self.checkpoint = checkpoint or ImportCheckpoint(Path(data_dir, IMPORT_CHECKPOINT_FILENAME))
+        self.manifest_path = manifest_path or Path(data_dir, METADATA_FILENAME)
+        self._batch_paths = []  # Relative paths of the images in the last batch yielded
+        self._resolved_dirs = {}  # Relative directory -> resolved path, resolved once per directory
+
+    def _resolved_dir(self, relative_path: str) -> str:
+        """Returns the resolved directory of an image, as stored in its manifest entry's 'filepath'."""
+        relative_dir = PurePosixPath(relative_path).parent.as_posix()
+        if relative_dir not in self._resolved_dirs:
+            self._resolved_dirs[relative_dir] = Path(self.data_dir, relative_dir).resolve().as_posix()
+        return self._resolved_dirs[relative_dir]
+
+    def _images_to_import(self) -> Iterator[tuple[str, os.DirEntry]]:
+        """Yields the images found by find_images() that this import has not added yet."""
+        images = find_images(self.data_dir, self.recursive, self.patterns)
+        already_imported = self.checkpoint.load()
+        if not already_imported:
+            yield from images
+            return
+
+        # Resuming: the manifest was kept, and holds every image added before the interruption
+        manifest_files = {
+            (entry['camera_data']['filepath'], entry['camera_data']['filename'])
+            for entry in load_metadata_with_lock(self.manifest_path)
+            if (entry.get('camera_data') or {}).get('filepath') and entry['camera_data'].get('filename')
+        }
+        logger.info(
+            f'[IMAGE IMPORTER] Resuming: {len(already_imported)} images were already imported, '
+            f'{len(manifest_files)} files are in the manifest.'
+        )
+        skipped = 0
+        for relative_path, entry in images:
+            path = PurePosixPath(relative_path)
+            if (
+                relative_path in already_imported
+                or (path.suffix == '.png' and path.with_suffix('.npy').as_posix() in already_imported)
+                or (self._resolved_dir(relative_path), entry.name) in manifest_files
+            ):
+                skipped += 1
+                continue
+            yield relative_path, entry
+        logger.info(f'[IMAGE IMPORTER] Skipped {skipped} images that were already imported.')
+
+    def batches(self) -> Iterator[list[dict]]:
+        """Yields batches of metadata entries. Raises FileNotFoundError if the directory does not exist."""
+        logger.info('[IMAGE IMPORTER] --- Starting Image File Importer ---')
+        if not self.data_dir.is_dir():
+            raise FileNotFoundError(f"Data directory '{self.data_dir}' not found.")
+
+        scope = 'recursively ' if self.recursive else ''
+        logger.info(f"[IMAGE IMPORTER] Scanning '{self.data_dir}' {scope}for image files, importing as they are found...")
+        images = self._images_to_import()
+        prepared = 0
+        with ThreadPoolExecutor(max_workers=STAT_THREADS, thread_name_prefix='import-stat') as executor:
+            while batch := list(islice(images, self.chunk_size)):
+                timestamps = [timestamp_from_filename(entry.name) for _, entry in batch]
+                unnamed = [i for i, timestamp in enumerate(timestamps) if timestamp is None]
+                for i, timestamp in zip(unnamed, executor.map(_modified_time, (batch[i][1] for i in unnamed))):
+                    timestamps[i] = timestamp
+
+                entries = []
+                for (relative_path, entry), timestamp in zip(batch, timestamps):
+                    entries.append(
+                        {
+                            'type': 'image',
+                            'filename': entry.name,
+                            'filepath': self._resolved_dir(relative_path),
+                            'timestamp_iso': timestamp.isoformat(),
+                            'camera_index': 'IMAGE_IMPORTER',
+                            'error_flag': False,
+                            'error_message': None,
+                        }
+                    )
+                self._batch_paths = [relative_path for relative_path, _ in batch]
+                prepared += len(batch)
+                logger.info(f'[IMAGE IMPORTER] Prepared {prepared} files so far...')
+                yield entries
+        logger.info(f'[IMAGE IMPORTER] Scan complete: {prepared} images to import.')
+        # Only reached once the last batch has been added and recorded, so the import is complete
+        # and the next run starts a new one instead of resuming this one
+        self.checkpoint.reset()
+
+    def mark_imported(self):
+        """Records the last batch yielded by batches() as added to the manifest."""
+        self.checkpoint.record(self._batch_paths)
+        self._batch_paths = []
@@ -0,0 +1,131 @@
+import subprocess
+import threading
+
+from phorest_pipeline.shared.logger_config import configure_logger
+
+logger = configure_logger(name=__name__, rotate_daily=True, log_filename="data_source.log")
+
+SOI = b"\xff\xd8"  # JPEG start of image
+EOI = b"\xff\xd9"  # JPEG end of image
+READ_SIZE = 1 << 16
+MAX_FRAME_BYTES = 64 * 1024 * 1024  # A partial frame larger than this is discarded
+STOP_TIMEOUT = 5.0
+
+
+class MjpegStream:
+    """
+    Runs a process that writes an MJPEG stream (JPEG images back to back) to
+    its stdout, e.g. 'rpicam-vid --codec mjpeg -o -', and keeps the latest
+    complete JPEG it has written.
+
+    Frames are split on the JPEG start (FFD8) and end (FFD9) markers. Inside
+    the compressed data an FF byte is always followed by 00, so the end
+    marker can only appear at the end of a frame (frames must not carry
+    embedded thumbnails, which rpicam-vid does not add). Frames are kept as
+    bytes and only decoded by whoever asks for them, so frames that nobody
+    asks for cost nothing but the read.
+
+    Any command that writes JPEGs to stdout can be used, so the stream can be
+    tested against a stand-in process (e.g. 'cat recorded.mjpeg').
+    """
+
+    def __init__(self, command: list[str]):
+        self.command = command
+        self._process = None
+        self._threads = []
+        self._condition = threading.Condition()
+        self._latest = None
+        self._sequence = 0
+        self._ended = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self):
+        logger.info(f"[STREAM] Starting: {' '.join(self.command)}")
+        self._process = subprocess.Popen(
+            self.command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0
+        )
+        self._threads = [
+            threading.Thread(target=self._read_frames, name="mjpeg-frames", daemon=True),
+            threading.Thread(target=self._read_diagnostics, name="mjpeg-stderr", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _read_frames(self):
+        buffer = bytearray()
+        scanned = 0  # Bytes of the partial frame at the start of 'buffer' already searched for EOI
+        stdout = self._process.stdout
+        while True:
+            chunk = stdout.read(READ_SIZE)
+            if not chunk:
+                break
+            buffer += chunk
+
+            latest = None
+            while True:
+                start = buffer.find(SOI)
+                if start < 0:
+                    del buffer[:-1]  # The last byte may be the first half of a marker
+                    scanned = 0
+                    break
+                # Only new data is searched (from one byte back, for a marker split across reads),
+                # so a large frame is scanned once rather than once per chunk
+                end = buffer.find(EOI, max(start + len(SOI), scanned - 1))
+                if end < 0:
+                    del buffer[:start]
+                    scanned = len(buffer)
+                    if len(buffer) > MAX_FRAME_BYTES:
+                        logger.warning("[STREAM] No end of frame found. Discarding data.")
+                        buffer.clear()
+                        scanned = 0
+                    break
+                latest = bytes(buffer[start : end + len(EOI)])
+                del buffer[: end + len(EOI)]
+                scanned = 0
+
+            if latest is not None:
+                with self._condition:
+                    self._latest = latest
+                    self._sequence += 1
+                    self._condition.notify_all()
+
+        with self._condition:
+            self._ended = True
+            self._condition.notify_all()
+        logger.info("[STREAM] Stream ended.")
+
+    def _read_diagnostics(self):
+        for line in self._process.stderr:
+            logger.debug(f"[STREAM] {line.decode(errors='replace').rstrip()}")
+
+    def latest(self, after: int, timeout: float) -> tuple[bytes | None, int]:
+        """
+        Returns the latest JPEG and its sequence number, waiting up to 'timeout'
+        seconds for one newer than sequence number 'after'. Returns (None, 'after')
+        if none arrived in time or the stream has ended.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._sequence > after or self._ended, timeout)
+            if self._sequence > after:
+                return self._latest, self._sequence
+            return None, after
+
+    def stop(self):
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        for thread in self._threads:
+            thread.join(timeout=STOP_TIMEOUT)
+        self._process.stdout.close()
+        self._process.stderr.close()
+        self._process = None
+        logger.info("[STREAM] Stopped.")
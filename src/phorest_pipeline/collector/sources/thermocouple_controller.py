@@ -1,16 +1,21 @@
 # phorest_pipeline/collector/thermocouple_controller.py
 import datetime
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from phorest_pipeline.shared.config import (
+    THERMOCOUPLE_BULK_CONVERSION,
+    THERMOCOUPLE_DEVICE_DIR,
     THERMOCOUPLE_IDS,
 )
 from phorest_pipeline.shared.logger_config import configure_logger
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename='data_source.log')
 
-DEVICE_LOC = Path('/sys/bus/w1/devices/')
+DEVICE_LOC = THERMOCOUPLE_DEVICE_DIR
+CONVERSION_TIMEOUT = 2.0  # Seconds to wait for a bulk conversion (a 12-bit conversion takes 750 ms)
+CONVERSION_POLL_INTERVAL = 0.05
 
 
 def start_w1():
@@ -35,7 +40,57 @@ def read_sensor_ROM(device_id):
         return f.readlines()
 
 
-def read_temp(device_id) -> tuple[int, str, float | None]:
+def trigger_bulk_conversion() -> bool:
+    """
+    Starts the temperature conversion of every sensor at once, through the
+    'therm_bulk_read' file of each 1-Wire bus master, and waits for it to end.
+    The next read of each sensor then returns the converted value without
+    starting a conversion of its own. Returns False if the bus masters do
+    not support bulk conversion (the sensors then convert on read).
+    """
+    bulk_read_files = list(DEVICE_LOC.glob('w1_bus_master*/therm_bulk_read'))
+    if not bulk_read_files:
+        return False
+    try:
+        for bulk_read_file in bulk_read_files:
+            bulk_read_file.write_text('trigger\n')
+        # Reads -1 while a conversion is in progress
+        deadline = time.monotonic() + CONVERSION_TIMEOUT
+        while any(f.read_text().strip() == '-1' for f in bulk_read_files):
+            if time.monotonic() >= deadline:
+                logger.warning('[THERMOCOUPLE] Bulk conversion did not finish in time.')
+                break
+            time.sleep(CONVERSION_POLL_INTERVAL)
+        return True
+    except OSError as e:
+        logger.warning(f'[THERMOCOUPLE] Bulk conversion failed: {e}. Sensors will convert on read.')
+        return False
+
+
+def read_temps(device_ids: list[str]) -> dict[str, float | None]:
+    """
+    Reads all sensors concurrently, so the time taken is about one conversion
+    period whatever the number of sensors. Returns sensor ID -> temperature,
+    None for sensors that could not be read.
+    """
+    if not device_ids:
+        return {}
+    if THERMOCOUPLE_BULK_CONVERSION:
+        trigger_bulk_conversion()
+    with ThreadPoolExecutor(max_workers=len(device_ids), thread_name_prefix='w1-read') as executor:
+        temperatures = executor.map(_read_temp_or_none, device_ids)
+        return dict(zip(device_ids, temperatures))
+
+
+def _read_temp_or_none(device_id) -> float | None:
+    try:
+        return read_temp(device_id)
+    except (OSError, IndexError, ValueError) as e:
+        logger.error(f'[THERMOCOUPLE] Could not read {device_id}: {e}')
+        return None
+
+
+def read_temp(device_id) -> float | None:
     lines = read_sensor_ROM(device_id)
     error_count = 0
     while lines[0].strip()[-3:] != 'YES' and error_count < 5:
@@ -82,17 +137,20 @@ def thermocouple_controller() -> tuple[int, str, dict | None]:
 
         logger.info('[THERMOCOUPLE]  Taking temperature measurements ...')
 
-        error = False
-        error_message = 'Error reading temperature from:'
+        read_start = time.monotonic()
+        temperatures = read_temps(list(THERMOCOUPLE_IDS))
+        logger.debug(f'[THERMOCOUPLE] Read {len(temperatures)} sensors in {time.monotonic() - read_start:.2f}s.')
+
+        failed_sensors = []
         for sensor_id, sensor_name in THERMOCOUPLE_IDS.items():
-            temperature = read_temp(sensor_id)
+            temperature = temperatures[sensor_id]
             if temperature is None:
-                error = True
-                ''.join(error_message, f'{sensor_name} ({sensor_id})')
+                failed_sensors.append(f'{sensor_name} ({sensor_id})')
                 logger.error(f'[THERMOCOUPLE] Error reading temperature from: {sensor_name} ({sensor_id})')
             temp_data[sensor_name] = temperature
+        error_message = f'Error reading temperature from: {", ".join(failed_sensors)}'
 
-        if error:
+        if failed_sensors:
             metadata = {
                 'type': 'temperature',
                 'timestamp_iso': measurement_timestamp.isoformat(),
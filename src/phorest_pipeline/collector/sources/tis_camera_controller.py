@@ -1,27 +1,107 @@
 import datetime
-import time
 from pathlib import Path
 
 import cv2
 import numpy as np
 
+from phorest_pipeline.collector.sources.camera_session import get_session, to_grayscale
 from phorest_pipeline.shared.config import (
+    CAMERA_BURST_FRAMES,
     CAMERA_EXPOSURE,
     CAMERA_INDEX,
     CAMERA_TRANFORM,
 )
+from phorest_pipeline.shared.image_io import CAPTURE_SUFFIX, store_image
 from phorest_pipeline.shared.logger_config import configure_logger
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename='data_source.log')
 
-BUFFER_CLEAR_UP_FRAMES = 5
-
 RESOLUTION = (4000, 3000)
 IMAGE_FORMAT = 'GREY'
 GAIN_VALUE = 32  # Low value to reduce noise
 CAMERA_BRIGHTNESS = 500
 
 
+def _configure_camera(cap: cv2.VideoCapture) -> str | None:
+    """Applies the camera settings to a newly opened camera. Returns an error message, or None."""
+    # --- Camera Settings ---
+    # 0. Set resolution and image format
+    logger.info('[CAMERA] Attempting to set resolution')
+    success = cap.set(cv2.CAP_PROP_FRAME_WIDTH, RESOLUTION[0])
+    success = success and cap.set(cv2.CAP_PROP_FRAME_HEIGHT, RESOLUTION[1])
+    if not success:
+        logger.error(f'[CAMERA] Failed to set the RESOLUTION to: {RESOLUTION[0]}x{RESOLUTION[1]}')
+    else:
+        width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
+        height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        if width != RESOLUTION[0] or height != RESOLUTION[1]:
+            logger.error(f'[CAMERA] Camera resolution not set correctly: {width}x{height}')
+    logger.info('[CAMERA] Camera resolution set')
+
+    logger.info('[CAMERA] Attempting to set image format')
+    fourcc = cv2.VideoWriter_fourcc(*IMAGE_FORMAT)
+    success = cap.set(cv2.CAP_PROP_FOURCC, fourcc)
+    if not success:
+        logger.error(f'[CAMERA] Failed to set the IMAGE_FORMAT to: {IMAGE_FORMAT}')
+    else:
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        fourcc_str = (
+            chr((fourcc & 0xFF))
+            + chr((fourcc >> 8) & 0xFF)
+            + chr((fourcc >> 16) & 0xFF)
+            + chr((fourcc >> 24) & 0xFF)
+        )
+
+        if fourcc_str != IMAGE_FORMAT:
+            logger.error(f'[CAMERA] Camera image format not set correctly: {fourcc_str}')
+    logger.info('[CAMERA] Camera image format set')
+
+    logger.info('[CAMERA] Attempting to set camera auto exposure to manual')
+    success = cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 1)
+    if not success:
+        return '[CAMERA] [ERROR] Could not set CAP_PROP_AUTO_EXPOSURE to manual'
+    else:
+        current = cap.get(cv2.CAP_PROP_AUTO_EXPOSURE)
+        if current != 1:
+            return '[CAMERA] [ERROR] Could not set CAP_PROP_AUTO_EXPOSURE to manual'
+    logger.info('[CAMERA] Camera auto exposure set to manual')
+
+    # 1. Set Brightness: brightness
+    success = cap.set(cv2.CAP_PROP_BRIGHTNESS, CAMERA_BRIGHTNESS)
+    if not success:
+        logger.error(f'[CAMERA] Could not set CAP_PROP_BRIGHTNESS to {CAMERA_BRIGHTNESS}.')
+    else:
+        current = cap.get(cv2.CAP_PROP_BRIGHTNESS)
+        if current != CAMERA_BRIGHTNESS:
+            logger.error('[CAMERA] CAP_PROP_BRIGHTNESS not set')
+
+    # 2. Set fixed Gain: gain
+    success = cap.set(cv2.CAP_PROP_GAIN, GAIN_VALUE)
+    if not success:
+        logger.error(f'[CAMERA] Could not set CAP_PROP_GAIN to {GAIN_VALUE}.')
+    else:
+        current = cap.get(cv2.CAP_PROP_GAIN)
+        if current != GAIN_VALUE:
+            logger.error('[CAMERA] CAP_PROP_GAIN not set')
+
+
+    # 3. Set Exposure: exposure
+    success = cap.set(cv2.CAP_PROP_EXPOSURE, CAMERA_EXPOSURE)
+    if not success:
+        logger.error(f'[CAMERA] Could not set CAP_PROP_EXPOSURE to {CAMERA_EXPOSURE}.')
+    else:
+        current = cap.get(cv2.CAP_PROP_EXPOSURE)
+        if current != CAMERA_EXPOSURE:
+            logger.error('[CAMERA] CAP_PROP_EXPOSURE not set')
+    return None
+
+
+def _prepare_frame(frame: np.ndarray) -> np.ndarray:
+    """Keeps the 12 significant bits of a frame and converts it to grayscale, before averaging."""
+    frame = np.bitwise_and(frame.astype(np.uint16), 0x0FFF)
+    return to_grayscale(frame)
+
+
 def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple = None) -> tuple[int, str, dict | None]:
     """
     Controls camera, captures image, saves, returns status and metadata dict.
@@ -34,7 +114,6 @@ def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple =
     """
     logger.info('[CAMERA] --- Starting TIS Camera Controller ---')
 
-    cap = None
     filepath = None
     metadata_dict = None
     if resolution:
@@ -42,118 +121,19 @@ def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple =
         RESOLUTION = resolution
 
     try:
-        logger.info(f'[CAMERA] Opening camera {CAMERA_INDEX}...')
-        cap = cv2.VideoCapture(CAMERA_INDEX)
-
-        if not cap.isOpened():
-            retry_count = 0
-            while not cap.isOpened() and retry_count < 5:
-                logger.warning(f'[CAMERA] Camera {CAMERA_INDEX} not opened. Retrying...')
-                time.sleep(0.5)
-                cap = cv2.VideoCapture(CAMERA_INDEX)
-                if cap.isOpened():
-                    break
-                retry_count += 1
-            if not cap.isOpened():
-                return (
-                    1,
-                    f'[CAMERA] [ERROR] Could not open camera at index {CAMERA_INDEX}.',
-                    None,
-                )
-        logger.info(f'[CAMERA] Camera {CAMERA_INDEX} opened.')
-        time.sleep(0.1)
-
-        # --- Camera Settings ---
-        # 0. Set resolution and image format
-        logger.info('[CAMERA] Attempting to set resolution')
-        success = cap.set(cv2.CAP_PROP_FRAME_WIDTH, RESOLUTION[0])
-        success = success and cap.set(cv2.CAP_PROP_FRAME_HEIGHT, RESOLUTION[1])
-        if not success:
-            logger.error(f'[CAMERA] Failed to set the RESOLUTION to: {RESOLUTION[0]}x{RESOLUTION[1]}')
-        else:
-            width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-            height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
-            if width != RESOLUTION[0] or height != RESOLUTION[1]:
-                logger.error(f'[CAMERA] Camera resolution not set correctly: {width}x{height}')
-        logger.info('[CAMERA] Camera resolution set')
-
-        logger.info('[CAMERA] Attempting to set image format')
-        fourcc = cv2.VideoWriter_fourcc(*IMAGE_FORMAT)
-        success = cap.set(cv2.CAP_PROP_FOURCC, fourcc)
-        if not success:
-            logger.error(f'[CAMERA] Failed to set the IMAGE_FORMAT to: {IMAGE_FORMAT}')
-        else:
-            fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
-            fourcc_str = (
-                chr((fourcc & 0xFF))
-                + chr((fourcc >> 8) & 0xFF)
-                + chr((fourcc >> 16) & 0xFF)
-                + chr((fourcc >> 24) & 0xFF)
-            )
-
-            if fourcc_str != IMAGE_FORMAT:
-                logger.error(f'[CAMERA] Camera image format not set correctly: {fourcc_str}')
-        logger.info('[CAMERA] Camera image format set')
-
-        logger.info('[CAMERA] Attempting to set camera auto exposure to manual')
-        success = cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 1)
-        if not success:
-            return (1, '[CAMERA] [ERROR] Could not set CAP_PROP_AUTO_EXPOSURE to manual', None)
-        else:
-            current = cap.get(cv2.CAP_PROP_AUTO_EXPOSURE)
-            if current != 1:
-                return (1, '[CAMERA] [ERROR] Could not set CAP_PROP_AUTO_EXPOSURE to manual', None)
-        logger.info('[CAMERA] Camera auto exposure set to manual')
-
-        # 1. Set Brightness: brightness
-        success = cap.set(cv2.CAP_PROP_BRIGHTNESS, CAMERA_BRIGHTNESS)
-        if not success:
-            logger.error(f'[CAMERA] Could not set CAP_PROP_BRIGHTNESS to {CAMERA_BRIGHTNESS}.')
-        else:
-            current = cap.get(cv2.CAP_PROP_BRIGHTNESS)
-            if current != CAMERA_BRIGHTNESS:
-                logger.error('[CAMERA] CAP_PROP_BRIGHTNESS not set')
-
-        # 2. Set fixed Gain: gain
-        success = cap.set(cv2.CAP_PROP_GAIN, GAIN_VALUE)
-        if not success:
-            logger.error(f'[CAMERA] Could not set CAP_PROP_GAIN to {GAIN_VALUE}.')
-        else:
-            current = cap.get(cv2.CAP_PROP_GAIN)
-            if current != GAIN_VALUE:
-                logger.error('[CAMERA] CAP_PROP_GAIN not set')
-
-        logger.info('[CAMERA] Camera configuration complete.')
+        session = get_session(CAMERA_INDEX, RESOLUTION, _configure_camera)
 
-        # 3. Set Exposure: exposure
-        success = cap.set(cv2.CAP_PROP_EXPOSURE, CAMERA_EXPOSURE)
-        if not success:
-            logger.error(f'[CAMERA] Could not set CAP_PROP_EXPOSURE to {CAMERA_EXPOSURE}.')
+        if CAMERA_BURST_FRAMES > 1:
+            logger.info(f'[CAMERA] Taking burst of {CAMERA_BURST_FRAMES} frames ...')
         else:
-            current = cap.get(cv2.CAP_PROP_EXPOSURE)
-            if current != CAMERA_EXPOSURE:
-                logger.error('[CAMERA] CAP_PROP_EXPOSURE not set')
-
-        # --- Clear camera buffer ---
-        logger.info(f'[CAMERA] Clearing camera buffer with {BUFFER_CLEAR_UP_FRAMES} captures...')
-        for i in range(BUFFER_CLEAR_UP_FRAMES):
-            ret, _ = cap.read()  # Read and discard the frame
-            if not ret:
-                logger.warning(f'[CAMERA] Warm-up frame {i + 1} capture failed. Continuing...')
-                time.sleep(0.5)
-            else:
-                time.sleep(0.1)
-        logger.info('[CAMERA] Warm-up complete.')
-
-        logger.info('[CAMERA] Taking image ...')
-        ret, frame_raw = cap.read()  # Read the frame
-        frame_raw = frame_raw.astype(np.uint16)
-        frame_raw = np.bitwise_and(frame_raw, 0x0FFF)
+            logger.info('[CAMERA] Taking image ...')
+        frame_raw, read_error_msg = session.read_mean(CAMERA_BURST_FRAMES, _prepare_frame)
         capture_timestamp = datetime.datetime.now()
 
-        if not ret or frame_raw is None:
-            return (1, '[CAMERA] [ERROR] Failed to capture frame.', None)
+        if frame_raw is None:
+            return (1, read_error_msg, None)
         else:
+
             original_dtype = str(frame_raw.dtype)
             logger.info(f'[CAMERA] Raw frame captured. Shape: {frame_raw.shape}, dtype: {original_dtype}')
 
@@ -215,7 +195,7 @@ def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple =
             # --- Save the 8-bit Grayscale Frame ---
             if not savename:
                 filename = (
-                    f'image_{capture_timestamp.strftime("%Y%m%d_%H%M%S_%f")}_cam{CAMERA_INDEX}.png'
+                    f'image_{capture_timestamp.strftime("%Y%m%d_%H%M%S_%f")}_cam{CAMERA_INDEX}{CAPTURE_SUFFIX}'
                 )
             else:
                 filename = savename
@@ -223,7 +203,7 @@ def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple =
             filepath = Path(data_dir, filename)
             filepath.parent.mkdir(parents=True, exist_ok=True)
             logger.info(f'[CAMERA] Saving image to {filepath} ...')
-            saved = cv2.imwrite(str(filepath), frame_gray_8bit)  # Use original BGR frame
+            saved = store_image(filepath, frame_gray_8bit)
 
             if saved:
                 logger.info('[CAMERA] Image saved.')
@@ -247,7 +227,4 @@ def camera_controller(data_dir: Path, savename: Path = None, resolution: tuple =
     except Exception as e:
         return (1, f'[CAMERA] [ERROR] Unexpected error: {e}', None)
     finally:
-        if cap is not None and cap.isOpened():
-            cap.release()
-            logger.info(f'[CAMERA] Camera {CAMERA_INDEX} released.')
         logger.info('[CAMERA] --- Camera Controller Done ---')
@@ -0,0 +1,160 @@
+# phorest_pipeline/collector/temperature_sampler.py
+import datetime
+import threading
+import time
+
+import numpy as np
+
+from phorest_pipeline.collector.sources.thermocouple_controller import (
+    thermocouple_controller,
+)
+from phorest_pipeline.shared import metrics
+from phorest_pipeline.shared.logger_config import configure_logger
+
+logger = configure_logger(name=__name__, rotate_daily=True, log_filename="collector.log")
+
+SAMPLE_BUFFER_SIZE = 600  # Samples kept, e.g. 10 minutes at one sample per second
+MIN_MAX_SAMPLE_AGE = 5.0  # Seconds, see TemperatureSampler.max_age
+
+SAMPLES_TAKEN = metrics.counter(
+    "phorest_temperature_samples_total", "Temperature samples taken by the sampler thread"
+)
+SAMPLE_FAILURES = metrics.counter(
+    "phorest_temperature_sample_failures_total", "Temperature samples with a sensor read error"
+)
+SAMPLE_SECONDS = metrics.histogram(
+    "phorest_temperature_sample_seconds", "Time to read all temperature sensors once"
+)
+
+
+class TemperatureSampler(threading.Thread):
+    """
+    Reads the thermocouples every 'interval' seconds, independently of the
+    image captures, into a time-indexed ring buffer of the last
+    SAMPLE_BUFFER_SIZE samples.
+
+    Each sample is stamped with time.monotonic() halfway through the read (the
+    clock the collector stamps captures with), so reading_at() can give the
+    temperature at the moment of a capture: interpolated between the samples
+    either side of it, or the nearest sample if the capture is newer than the
+    latest one. Slow sensor reads never delay a capture, and temperature can
+    be sampled faster than images are taken.
+    """
+
+    def __init__(self, interval: float, sensor_names: list[str], size: int = SAMPLE_BUFFER_SIZE):
+        super().__init__(name="temperature-sampler", daemon=True)
+        self.interval = interval
+        self.sensor_names = list(sensor_names)
+        # A reading further than this from the nearest sample is reported as an error
+        self.max_age = max(3 * interval, MIN_MAX_SAMPLE_AGE)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._first_sample = threading.Event()
+        self._times = np.zeros(size)  # time.monotonic()
+        self._wall_times = np.zeros(size)  # time.time(), for the reading's timestamp
+        self._values = np.full((size, len(self.sensor_names)), np.nan)  # NaN = read error
+        self._errors = [None] * size
+        self._next = 0
+        self._count = 0
+
+    def run(self):
+        logger.info(f"[SAMPLER] Sampling temperature every {self.interval}s.")
+        while not self._stop_event.is_set():
+            start = time.monotonic()
+            self._sample()
+            elapsed = time.monotonic() - start
+            SAMPLE_SECONDS.observe(elapsed)
+            self._stop_event.wait(max(0.0, self.interval - elapsed))
+
+    def _sample(self):
+        start = time.monotonic()
+        try:
+            status, message, metadata = thermocouple_controller()
+        except (OSError, ValueError) as e:  # Sensor reads that fail outside the controller's own handling
+            status, metadata = 1, None
+            message = f"Unexpected error during thermocouple collection: {e}"
+        sampled_at = (start + time.monotonic()) / 2
+        wall_time = time.time() - (time.monotonic() - sampled_at)
+
+        data = (metadata or {}).get("data") or {}
+        values = [data.get(name) for name in self.sensor_names]
+        values = [np.nan if value is None else value for value in values]
+        SAMPLES_TAKEN.inc()
+        if status != 0:
+            SAMPLE_FAILURES.inc()
+            logger.error(f"[SAMPLER] Temperature sample failed: {message}")
+
+        with self._lock:
+            slot = self._next
+            self._times[slot] = sampled_at
+            self._wall_times[slot] = wall_time
+            self._values[slot] = values
+            self._errors[slot] = message if status != 0 else None
+            self._next = (slot + 1) % len(self._times)
+            self._count = min(self._count + 1, len(self._times))
+        self._first_sample.set()
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Waits until the first sample has been taken. Returns False on timeout."""
+        return self._first_sample.wait(timeout)
+
+    def _slots(self) -> np.ndarray:
+        """Returns the occupied slots, oldest first."""
+        start = (self._next - self._count) % len(self._times)
+        return (start + np.arange(self._count)) % len(self._times)
+
+    def reading_at(self, timestamp: float) -> dict:
+        """
+        Returns the temperature metadata for a time.monotonic() timestamp, in
+        the format of thermocouple_controller(), with 'interpolated' set if it
+        was interpolated between two samples.
+        """
+        with self._lock:
+            slots = self._slots()
+            times = self._times[slots]
+            right = int(np.searchsorted(times, timestamp))
+            if right == 0 or right == len(slots):
+                # Before the first or after the latest sample: use the nearest one
+                nearest = slots[min(right, len(slots) - 1)] if len(slots) else None
+                used = [nearest] if nearest is not None else []
+                weights = [1.0]
+            else:
+                before, after = slots[right - 1], slots[right]
+                span = self._times[after] - self._times[before]
+                fraction = (timestamp - self._times[before]) / span if span > 0 else 0.0
+                used = [before, after]
+                weights = [1.0 - fraction, fraction]
+            errors = [self._errors[slot] for slot in used if self._errors[slot]]
+            values = sum(weight * self._values[slot] for weight, slot in zip(weights, used))
+            if used:
+                wall_time = self._wall_times[used[0]] + (timestamp - self._times[used[0]])
+            else:
+                wall_time = time.time()
+            age = min((abs(timestamp - self._times[slot]) for slot in used), default=None)
+
+        reading = {
+            "type": "temperature",
+            "timestamp_iso": datetime.datetime.fromtimestamp(wall_time).isoformat(),
+            "data": None,
+            "interpolated": len(used) == 2,
+            "error_flag": True,
+            "error_message": None,
+        }
+        if not used:
+            reading["error_message"] = "[SAMPLER] [ERROR] No temperature sample taken yet."
+        elif age > self.max_age:
+            reading["error_message"] = (
+                f"[SAMPLER] [ERROR] Nearest temperature sample is {age:.1f}s from the capture."
+            )
+        elif errors:
+            reading["error_message"] = errors[-1]
+        else:
+            reading["data"] = {
+                name: round(float(value), 4) for name, value in zip(self.sensor_names, values)
+            }
+            reading["error_flag"] = False
+        return reading
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=self.interval + 5)
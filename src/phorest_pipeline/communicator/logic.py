@@ -1,9 +1,8 @@
 # src/process_pipeline/communicator/logic.py
-import signal
-import sys
 import time
 from pathlib import Path
 
+from phorest_pipeline.shared import latency
 from phorest_pipeline.shared.communication_methods import CommunicationMethod
 from phorest_pipeline.shared.config import (
     COMMUNICATION_METHOD,
@@ -16,13 +15,16 @@ from phorest_pipeline.shared.config import (
     RESULTS_READY_FLAG,
     settings,
 )
+from phorest_pipeline.shared.event_types import EventType
 from phorest_pipeline.shared.helper_utils import move_existing_files_to_backup
 from phorest_pipeline.shared.logger_config import configure_logger
+from phorest_pipeline.shared.message_bus import subscribe
 from phorest_pipeline.shared.metadata_manager import (
     load_metadata_with_lock,
     update_metadata_manifest_entry,
-    update_service_status,
 )
+from phorest_pipeline.shared.notifier import FlagNotifier
+from phorest_pipeline.shared.service import Service
 from phorest_pipeline.shared.states import CommunicatorState
 
 from .outputs.csv_plot_handler import generate_report
@@ -63,25 +65,30 @@ def find_not_transmitted_entries_indices(metadata_list: list) -> list[int]:
     return not_transmitted_indices
 
 
-class Communicator:
+class Communicator(Service):
     """Encapsulates the state and logic for the communicator process"""
 
+    SCRIPT_NAME = SCRIPT_NAME
+    DISPLAY_NAME = "Communicator"
+    FATAL_STATE = CommunicatorState.FATAL_ERROR
+
     def __init__(self):
-        self.shutdown_requested = False
-        self.current_state = CommunicatorState.COMMUNICATING
+        super().__init__(logger, CommunicatorState.COMMUNICATING)
         self.next_run_time = 0
+        self.notifier = FlagNotifier(RESULTS_READY_FLAG)
+
+        # Processed entries announced on the message bus (if enabled)
+        self.bus = subscribe("communicator", {EventType.ENTRY_PROCESSED})
+        self.announced_entries = []
 
-        # Register the signal handler
-        signal.signal(signal.SIGINT, self._graceful_shutdown)
-        signal.signal(signal.SIGTERM, self._graceful_shutdown)
+        # Rolling capture-to-report latency of recently transmitted entries
+        self.latency = latency.LatencyTracker("reported")
 
-    def _graceful_shutdown(self, _signum, _frame):
-        """Signal handler to initiate a graceful shutdown"""
-        if not self.shutdown_requested:
-            logger.info("Shutdown signal received. Finishing current cycle before stopping...")
-            self.shutdown_requested = True
+    def _queue_events(self, events: list):
+        for _, payload in events:
+            self.announced_entries.extend(payload.get("entries", []))
 
-    def _perform_communication(self):
+    async def perform(self):
         """State machine logic for the communicator."""
 
         if settings is None:
@@ -99,35 +106,52 @@ class Communicator:
                 self.current_state = CommunicatorState.WAITING_FOR_RESULTS
 
             case CommunicatorState.WAITING_FOR_RESULTS:
-                now = time.monotonic()
-                if now >= self.next_run_time:
-                    if RESULTS_READY_FLAG.exists():
-                        logger.debug(f"Found flag {RESULTS_READY_FLAG}.")
-                        # Consume the flag
-                        try:
-                            RESULTS_READY_FLAG.unlink()
-                            logger.debug(f"Deleted flag {RESULTS_READY_FLAG}.")
-                            logger.debug("WAITING_FOR_RESULTS -> COMMUNICATING")
-                            self.current_state = CommunicatorState.COMMUNICATING
-                        except FileNotFoundError:
-                            logger.debug("Flag disappeared before deletion. Re-checking...")
-                            self.current_state = CommunicatorState.WAITING_FOR_RESULTS
-                        except OSError as e:
-                            logger.error(f"Could not delete flag {RESULTS_READY_FLAG}: {e}")
-                            self.current_state = CommunicatorState.WAITING_FOR_RESULTS
-                            time.sleep(POLL_INTERVAL)
-                    else:
-                        self.current_state = CommunicatorState.IDLE
-                        logger.debug("WAITING_FOR_RESULTS -> IDLE")
+                if self.bus is not None:
+                    self._queue_events(self.bus.receive())
+
+                if RESULTS_READY_FLAG.exists():
+                    logger.debug(f"Found flag {RESULTS_READY_FLAG}.")
+                    # Consume the flag
+                    try:
+                        RESULTS_READY_FLAG.unlink()
+                        logger.debug(f"Deleted flag {RESULTS_READY_FLAG}.")
+                        logger.debug("WAITING_FOR_RESULTS -> COMMUNICATING")
+                        self.current_state = CommunicatorState.COMMUNICATING
+                    except FileNotFoundError:
+                        logger.debug("Flag disappeared before deletion. Re-checking...")
+                        self.current_state = CommunicatorState.WAITING_FOR_RESULTS
+                    except OSError as e:
+                        logger.error(f"Could not delete flag {RESULTS_READY_FLAG}: {e}")
+                        self.current_state = CommunicatorState.WAITING_FOR_RESULTS
+                        await self.sleep(POLL_INTERVAL)
+                elif self.announced_entries:
+                    logger.debug("New results announced on the message bus.")
+                    logger.debug("WAITING_FOR_RESULTS -> COMMUNICATING")
+                    self.current_state = CommunicatorState.COMMUNICATING
+                elif time.monotonic() >= self.next_run_time:
+                    self.current_state = CommunicatorState.IDLE
+                    logger.debug("WAITING_FOR_RESULTS -> IDLE")
                 else:
-                    for _ in range(int(POLL_INTERVAL)):
-                        if self.shutdown_requested:
-                            return
-                        time.sleep(1)
+                    # Wake up as soon as the processor raises the flag (or announces results)
+                    await self.wait(
+                        min(POLL_INTERVAL, self.next_run_time - time.monotonic()),
+                        self.notifier,
+                        self.bus,
+                    )
 
             case CommunicatorState.COMMUNICATING:
                 logger.info("--- Running Communication ---")
                 communication_successful = False
+
+                # If the bus announced only failed/rejected entries there is nothing new to report
+                announced_entries, self.announced_entries = self.announced_entries, []
+                if announced_entries and not any(
+                    entry.get("status") == "processed" for entry in announced_entries
+                ):
+                    logger.info("No newly processed entries announced. Skipping report.")
+                    self.current_state = CommunicatorState.IDLE
+                    return
+
                 try:
                     # 1. Load single source of truth
                     manifest_data = load_metadata_with_lock(Path(DATA_DIR, METADATA_FILENAME))
@@ -170,11 +194,16 @@ class Communicator:
                         logger.debug(
                             f"Communication successful. Marking {len(indices_to_mark_as_transmitted)} entries as transmitted."
                         )
+                        reported_at = latency.stamp()
                         update_metadata_manifest_entry(
                             manifest_path=Path(DATA_DIR, METADATA_FILENAME),
                             entry_index=indices_to_mark_as_transmitted,
                             data_transmitted=True,
+                            latency_stamps={"reported": reported_at},
                         )
+                        for index in indices_to_mark_as_transmitted:
+                            self.latency.add(manifest_data[index].get("latency_stamps"), reported_at)
+                        logger.info(self.latency.summary())
                     elif communication_successful:
                         logger.debug("Communication successful, no new entries to mark.")
                     else:
@@ -186,7 +215,7 @@ class Communicator:
                     self.current_state = (
                         CommunicatorState.COMMUNICATING
                     )  # Stay in COMMUNICATING to retry
-                    time.sleep(POLL_INTERVAL * 5)
+                    await self.sleep(POLL_INTERVAL * 5)
                     return
 
                 logger.debug("COMMUNICATING -> IDLE")
@@ -194,13 +223,9 @@ class Communicator:
 
             case CommunicatorState.FATAL_ERROR:
                 logger.error("[FATAL ERROR] Shutting down communicator.")
-                time.sleep(10)  # Prevent busy-looping in fatal state
-
-    def run(self):
-        """Main loop for the communicator process."""
-        logger.info("--- Starting Communicator ---")
-        print("--- Starting Communicator ---")
+                await self.sleep(10)  # Prevent busy-looping in fatal state
 
+    def on_start(self) -> bool:
         # Initial cleanup: remove results flag if it exists on startup
         if settings:
             files_to_move = [Path(RESULTS_DIR, CSV_FILENAME), Path(RESULTS_DIR, IMAGE_FILENAME)]
@@ -211,34 +236,19 @@ class Communicator:
                 logger.debug(f"Ensured flag {RESULTS_READY_FLAG} is initially removed.")
             except OSError as e:
                 logger.warning(f"Could not remove initial flag {RESULTS_READY_FLAG}: {e}")
+        return True
 
-        try:
-            while not self.shutdown_requested:
-                self._perform_communication()
-
-                # After a cycle is complete, send a heartbeat.
-                update_service_status(SCRIPT_NAME, heartbeat=True)
-
-                if self.current_state == CommunicatorState.FATAL_ERROR:
-                    logger.error("Exiting due to FATAL_ERROR state.")
-                    break
-                time.sleep(0.1)  # Small sleep to prevent busy-looping
-        except Exception as e:
-            logger.critical(f"UNEXPECTED ERROR in main loop: {e}", exc_info=True)
-        finally:
-            # Cleanup on exit
-            if settings:
-                logger.info("Cleaning up flags...")
-                try:
-                    RESULTS_READY_FLAG.unlink(missing_ok=True)
-                except OSError as e:
-                    logger.error(f"Could not clean up flag {RESULTS_READY_FLAG} on exit: {e}")
-            logger.info("--- Communicator Stopped ---")
-            print("--- Communicator Stopped ---")
-            if self.current_state == CommunicatorState.FATAL_ERROR and not self.shutdown_requested:
-                sys.exit(1)  # Exit with error code if fatal
-            else:
-                sys.exit(0)  # Exit cleanly
+    def on_stop(self):
+        self.notifier.close()
+        if self.bus is not None:
+            self.bus.close()
+        # Cleanup on exit
+        if settings:
+            logger.info("Cleaning up flags...")
+            try:
+                RESULTS_READY_FLAG.unlink(missing_ok=True)
+            except OSError as e:
+                logger.error(f"Could not clean up flag {RESULTS_READY_FLAG} on exit: {e}")
 
 
 def run_communicator():
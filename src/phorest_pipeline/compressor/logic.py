@@ -1,10 +1,10 @@
 # phorest_pipeline/compressor/logic.py
 import gzip
 import shutil
-import signal
 import time
 from pathlib import Path
 
+from phorest_pipeline.shared import latency, metrics
 from phorest_pipeline.shared.config import (
     COMPRESSOR_INTERVAL,
     DATA_DIR,
@@ -12,12 +12,15 @@ from phorest_pipeline.shared.config import (
     METADATA_FILENAME,
     settings,
 )
+from phorest_pipeline.shared.event_types import EventType
+from phorest_pipeline.shared.image_io import RAW_IMAGE_SUFFIX, convert_raw_to_png
 from phorest_pipeline.shared.logger_config import configure_logger
+from phorest_pipeline.shared.message_bus import publish
 from phorest_pipeline.shared.metadata_manager import (
     load_metadata_with_lock,
     update_metadata_manifest_entry,
-    update_service_status,
 )
+from phorest_pipeline.shared.service import Service
 from phorest_pipeline.shared.states import CompressorState
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename="compressor.log")
@@ -26,17 +29,30 @@ SCRIPT_NAME = "phorest-compressor"
 
 POLL_INTERVAL = COMPRESSOR_INTERVAL / 20 if COMPRESSOR_INTERVAL > (5 * 20) else 5
 
+BYTES_IN = metrics.counter(
+    "phorest_compress_bytes_in_total", "Size of the images before compression"
+)
+BYTES_OUT = metrics.counter(
+    "phorest_compress_bytes_out_total", "Size of the images after compression"
+)
+FILES_COMPRESSED = metrics.counter("phorest_files_compressed_total", "Images compressed")
+COMPRESSION_FAILURES = metrics.counter(
+    "phorest_compression_failures_total", "Images that could not be compressed"
+)
+
 
 def find_entries_to_compress(metadata_list: list) -> list[tuple[int, dict]]:
     """
-    Finds all entries that have been processed but not yet compressed.
+    Finds all entries that have been processed (or rejected as blank or
+    saturated) but not yet compressed.
     This is universal for all image types but avoids re-compressing .gz files.
+    Raw (.npy) frames are selected too, these are converted to PNG instead.
     """
     entries_to_compress = []
     for index, entry in enumerate(metadata_list):
         camera_data = entry.get("camera_data")
         if (
-            entry.get("processing_status", "pending") == "processed"
+            entry.get("processing_status", "pending") in ("processed", "rejected")
             and not entry.get("compression_attempted", False)
             and camera_data
             and camera_data.get("filename")
@@ -48,27 +64,65 @@ def find_entries_to_compress(metadata_list: list) -> list[tuple[int, dict]]:
     return entries_to_compress
 
 
-class Compressor:
+def compress_entry(entry_index: int, entry_data: dict) -> dict:
+    """
+    Compresses the image of one manifest entry: raw (.npy) frames are
+    converted to PNG, anything else is gzipped. Returns the manifest update,
+    with a 'new_filename' of None if the image could not be compressed.
+    """
+    try:
+        camera_data = entry_data["camera_data"]
+        original_filepath = Path(camera_data["filepath"], camera_data["filename"])
+        original_size = original_filepath.stat().st_size
+
+        if original_filepath.suffix.lower() == RAW_IMAGE_SUFFIX:
+            # Raw frames are archived as lossless PNG rather than gzipped
+            logger.debug(f"Converting raw frame {original_filepath} to PNG...")
+            png_filepath = convert_raw_to_png(original_filepath)
+            if png_filepath is None:
+                raise OSError(f"Could not convert {original_filepath.name} to PNG")
+            BYTES_IN.inc(original_size)
+            BYTES_OUT.inc(png_filepath.stat().st_size)
+            FILES_COMPRESSED.inc()
+            logger.info(f"Successfully converted {original_filepath.name} to PNG.")
+            return {"index": entry_index, "new_filename": png_filepath.name}
+
+        gzipped_filename = original_filepath.name + ".gz"
+        gzipped_filepath = original_filepath.with_name(gzipped_filename)
+
+        logger.debug(f"gzipping {original_filepath} to {gzipped_filepath}...")
+        with (
+            original_filepath.open("rb") as f_in,
+            gzip.open(gzipped_filepath, "wb") as f_out,
+        ):
+            shutil.copyfileobj(f_in, f_out)
+
+        original_filepath.unlink()
+        BYTES_IN.inc(original_size)
+        BYTES_OUT.inc(gzipped_filepath.stat().st_size)
+        FILES_COMPRESSED.inc()
+        logger.info(f"Successfully gzipped {original_filepath.name}.")
+        return {"index": entry_index, "new_filename": gzipped_filename}
+    except Exception:
+        logger.error(f"Failed to compress {original_filepath.name}.", exc_info=True)
+        COMPRESSION_FAILURES.inc()
+        return {"index": entry_index, "new_filename": None}
+
+
+class Compressor(Service):
     """Encapsulates the state and logic for the file compressor."""
 
+    SCRIPT_NAME = SCRIPT_NAME
+    DISPLAY_NAME = "Compressor"
+    FATAL_STATE = CompressorState.FATAL_ERROR
+
     def __init__(self):
         # All state is now managed by the instance
-        self.shutdown_requested = False
-        self.current_state = CompressorState.IDLE
+        super().__init__(logger, CompressorState.IDLE)
         self.next_run_time = 0
         self.entries_to_process = []  # To hold the batch of work
 
-        # Register signal handlers
-        signal.signal(signal.SIGINT, self._graceful_shutdown)
-        signal.signal(signal.SIGTERM, self._graceful_shutdown)
-
-    def _graceful_shutdown(self, _signum, _frame):
-        """Signal handler to initiate a graceful shutdown"""
-        if not self.shutdown_requested:
-            logger.info("Shutdown signal received. Finishing current cycle before stopping...")
-            self.shutdown_requested = True
-
-    def _perform_compression_cycle(self):
+    async def perform(self):
         """State machine logic for the compressor."""
 
         if settings is None:
@@ -104,49 +158,17 @@ class Compressor:
                 if now >= self.next_run_time:
                     self.current_state = CompressorState.IDLE
                 else:
-                    for _ in range(int(POLL_INTERVAL)):
-                        if self.shutdown_requested:
-                            return
-                        time.sleep(1)
+                    await self.sleep(min(POLL_INTERVAL, self.next_run_time - now))
 
             case CompressorState.COMPRESSING_IMAGES:
                 logger.info(
                     f"--- Starting Image Compression for batch of {len(self.entries_to_process)} files ---"
                 )
 
-                updates_for_manifest = []
-                for entry_index, entry_data in self.entries_to_process:
-                    try:
-                        camera_data = entry_data["camera_data"]
-                        original_filepath = Path(camera_data["filepath"], camera_data["filename"])
-
-                        gzipped_filename = original_filepath.name + ".gz"
-                        gzipped_filepath = original_filepath.with_name(gzipped_filename)
-
-                        logger.debug(f"gzipping {original_filepath} to {gzipped_filepath}...")
-                        with (
-                            original_filepath.open("rb") as f_in,
-                            gzip.open(gzipped_filepath, "wb") as f_out,
-                        ):
-                            shutil.copyfileobj(f_in, f_out)
-
-                        original_filepath.unlink()
-
-                        updates_for_manifest.append(
-                            {
-                                "index": entry_index,
-                                "new_filename": gzipped_filename,
-                            }
-                        )
-                        logger.info(f"Successfully gzipped {original_filepath.name}.")
-                    except Exception:
-                        logger.error(f"Failed to gzip {original_filepath.name}.", exc_info=True)
-                        updates_for_manifest.append(
-                            {
-                                "index": entry_index,
-                                "new_filename": None,
-                            }
-                        )
+                updates_for_manifest = [
+                    compress_entry(entry_index, entry_data)
+                    for entry_index, entry_data in self.entries_to_process
+                ]
 
                 # Update manifest
                 if updates_for_manifest:
@@ -162,8 +184,17 @@ class Compressor:
                             entry_index=indices,
                             compression_attempted=True,
                             new_filename=filenames,
+                            latency_stamps={"compressed": latency.stamp()},
                         )
                         logger.info("Batch manifest update successful.")
+                        publish(
+                            EventType.IMAGE_COMPRESSED,
+                            entries=[
+                                {"index": item["index"], "filename": item["new_filename"]}
+                                for item in updates_for_manifest
+                                if item["new_filename"]
+                            ],
+                        )
                     except Exception as e:
                         logger.error(
                             f"CRITICAL: Failed to update manifest after compression batch: {e}",
@@ -174,38 +205,21 @@ class Compressor:
 
                 logger.debug("COMPRESSING_FILES -> CHECKING (for more work)")
                 self.current_state = CompressorState.CHECKING
-                time.sleep(0.1)
+                await self.sleep(0.1)
 
             case CompressorState.FATAL_ERROR:
                 logger.error("[FATAL ERROR] Shutting down compressor.")
-                time.sleep(10)  # Prevent busy-looping in fatal state
-
-    def run(self):
-        """Main loop for the compressor process."""
-        logger.info("--- Starting Compressor ---")
-        print("--- Starting Compressor ---")
+                await self.sleep(10)  # Prevent busy-looping in fatal state
 
+    def on_start(self) -> bool:
         if settings is None:
             logger.debug("Configuration error. Exiting.")
-            return
+            return False
 
         if not ENABLE_COMPRESSOR:
             logger.info("Compressor is disabled in config. Exiting.")
-            return
-
-        try:
-            while not self.shutdown_requested:
-                self._perform_compression_cycle()
-
-                # After a cycle is complete, send a heartbeat.
-                update_service_status(SCRIPT_NAME, heartbeat=True)
-
-                time.sleep(0.1)
-        except Exception as e:
-            logger.critical(f"UNEXPECTED ERROR in main loop: {e}", exc_info=True)
-        finally:
-            logger.info("--- Compressor Stopped ---")
-            print("--- Compressor Stopped ---")
+            return False
+        return True
 
 
 def run_compressor():
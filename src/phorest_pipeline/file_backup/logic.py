@@ -2,7 +2,6 @@
 import datetime
 import gzip
 import shutil
-import signal
 import time
 from pathlib import Path
 
@@ -21,7 +20,8 @@ from phorest_pipeline.shared.config import (
     settings,
 )
 from phorest_pipeline.shared.logger_config import configure_logger
-from phorest_pipeline.shared.metadata_manager import move_file_with_lock, update_service_status
+from phorest_pipeline.shared.metadata_manager import move_file_with_lock
+from phorest_pipeline.shared.service import Service
 from phorest_pipeline.shared.states import BackupState
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename="file_backup.log")
@@ -94,25 +94,18 @@ def compress_files_in_backup_dir():
             logger.error(f"An unexpected error occurred compressing '{file_path}': {e}")
 
 
-class FileBackup:
+class FileBackup(Service):
     """Encapsulates the state and logic for the file backup process."""
 
+    SCRIPT_NAME = SCRIPT_NAME
+    DISPLAY_NAME = "File Backup"
+    FATAL_STATE = BackupState.FATAL_ERROR
+
     def __init__(self):
-        self.shutdown_requested = False
-        self.current_state = BackupState.IDLE
+        super().__init__(logger, BackupState.IDLE)
         self.next_run_time = 0
 
-        # Register the signal handler
-        signal.signal(signal.SIGINT, self._graceful_shutdown)
-        signal.signal(signal.SIGTERM, self._graceful_shutdown)
-
-    def _graceful_shutdown(self, _signum, _frame):
-        """Signal handler to initiate a graceful shutdown"""
-        if not self.shutdown_requested:
-            logger.info("Shutdown signal received. Finishing current cycle before stopping...")
-            self.shutdown_requested = True
-
-    def _perform_file_backup_cycle(self):
+    async def perform(self):
         """State machine logic for the file renamer."""
 
         if settings is None:
@@ -133,10 +126,7 @@ class FileBackup:
                     logger.debug("WAITING_TO_RUN -> BACKUP_FILES")
                     self.current_state = BackupState.BACKUP_FILES
                 else:
-                    for _ in range(int(POLL_INTERVAL)):
-                        if self.shutdown_requested:
-                            return
-                        time.sleep(1)
+                    await self.sleep(min(POLL_INTERVAL, self.next_run_time - now))
 
             case BackupState.BACKUP_FILES:
                 logger.info("--- Starting Full Backup and Compression Cycle ---")
@@ -146,33 +136,15 @@ class FileBackup:
                 logger.debug("BACKUP_FILES -> IDLE")
                 self.current_state = BackupState.IDLE
 
-    def run(self):
-        """Main loop for the file backup process."""
-        logger.info("--- Starting File Backup ---")
-        print("--- Starting File Backup ---")
-
+    def on_start(self) -> bool:
         if settings is None:
             logger.debug("Configuration error. Halting.")
-            return
+            return False
 
         if not ENABLE_BACKUP:
             logger.info("File backup is disabled in config. Exiting.")
-            return
-
-        try:
-            while not self.shutdown_requested:
-                self._perform_file_backup_cycle()
-
-                # After a cycle is complete, send a heartbeat.
-                update_service_status(SCRIPT_NAME, heartbeat=True)
-
-                if self.current_state == BackupState.IDLE:
-                    time.sleep(0.1)
-        except Exception as e:
-            logger.critical(f"UNEXPECTED ERROR in main loop: {e}", exc_info=True)
-        finally:
-            logger.info("--- File Backup Stopped ---")
-            print("--- File Backup Stopped ---")
+            return False
+        return True
 
 
 def run_file_backup():
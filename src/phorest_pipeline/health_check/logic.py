@@ -1,14 +1,10 @@
 # src/phorest_pipeline/health_checker/logic.py
 import datetime
 import json
-import signal
-import subprocess
+import os
 import time
-from collections import deque
 from pathlib import Path
 
-import matplotlib.pyplot as plt
-
 from phorest_pipeline.shared.config import (
     COLLECTOR_INTERVAL,
     COMMUNICATOR_INTERVAL,
@@ -17,6 +13,7 @@ from phorest_pipeline.shared.config import (
     FILE_BACKUP_INTERVAL,
     FLAG_DIR,
     LOGS_DIR,
+    METRICS_FILENAME,
     PROCESSOR_INTERVAL,
     RESULTS_DIR,
     STATUS_FILENAME,
@@ -24,7 +21,10 @@ from phorest_pipeline.shared.config import (
     settings,
 )
 from phorest_pipeline.shared.logger_config import configure_logger
-from phorest_pipeline.shared.metadata_manager import lock_and_manage_file, update_service_status
+from phorest_pipeline.shared.metadata_manager import get_pipeline_status
+from phorest_pipeline.shared.metrics import aggregate_metrics, read_metric_totals
+from phorest_pipeline.shared.process_info import ProcessTable
+from phorest_pipeline.shared.service import Service
 from phorest_pipeline.shared.states import HealthCheckerState  # Assuming you add this
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename="health_checker.log")
@@ -35,6 +35,8 @@ SCRIPT_NAME = 'phorest-health-check'
 HEALTH_CHECK_INTERVAL = 30  # Check every 10 minutes by default
 POLL_INTERVAL = 10
 REPORT_FILENAME = Path("health_report.png")
+JSON_REPORT_FILENAME = Path("health_report.json")
+LOG_TAIL_BLOCK_SIZE = 4096
 
 # Map service names to their log files and intervals
 SERVICE_CONFIG = {
@@ -47,51 +49,82 @@ SERVICE_CONFIG = {
 }
 
 
-def is_pid_active(pid: int | None, expected_name: str) -> bool:
+def get_log_tail(log_path: Path, lines: int = 5) -> str:
     """
-    Checks if a given PID is active AND is running the expected command.
+    Gets the last N lines of a log file. The file is read backwards from its
+    end in blocks, so only the tail is read however large the log has grown.
     """
-    if pid is None:
-        return False
-    try:
-        result = subprocess.run(
-            ["ps", "-p", str(pid), "-o", "command="], capture_output=True, text=True, check=False
-        )
-        # Check if the process exists and the command name is in the output
-        return result.returncode == 0 and expected_name in result.stdout
-    except Exception:
-        return False
-
-
-def get_log_tail(log_path: Path, lines: int = 5) -> str:
-    """Gets the last N lines of a log file."""
     if not log_path.exists():
         return f"Log file not found:\n{log_path.name}"
     try:
-        with log_path.open("r") as f:
-            # Use a deque for an efficient way to get the last lines
-            return "".join(deque(f, lines))
+        with log_path.open("rb") as f:
+            position = f.seek(0, os.SEEK_END)
+            tail = b""
+            # One more newline than lines wanted, as the last line usually ends with one
+            while position > 0 and tail.count(b"\n") <= lines:
+                read_size = min(LOG_TAIL_BLOCK_SIZE, position)
+                position -= read_size
+                f.seek(position)
+                tail = f.read(read_size) + tail
+        return "".join(tail.decode(errors="replace").splitlines(keepends=True)[-lines:])
     except Exception as e:
         return f"Could not read log file:\n{e}"
 
 
-class HealthChecker:
+class HealthChecker(Service):
     """A service to monitor the health of the pipeline components."""
 
+    SCRIPT_NAME = SCRIPT_NAME
+    DISPLAY_NAME = "Health Checker"
+    FATAL_STATE = HealthCheckerState.FATAL_ERROR
+
     def __init__(self):
-        self.shutdown_requested = False
-        self.current_state = HealthCheckerState.CHECKING_HEALTH
+        super().__init__(logger, HealthCheckerState.CHECKING_HEALTH)
         self.next_run_time = 0
-        signal.signal(signal.SIGINT, self._graceful_shutdown)
-        signal.signal(signal.SIGTERM, self._graceful_shutdown)
+        # Service -> status of the last report, so the PNG is only redrawn on a change
+        self.previous_statuses = self._load_previous_statuses()
 
-    def _graceful_shutdown(self, _signum, _frame):
-        if not self.shutdown_requested:
-            logger.info("Shutdown signal received.")
-            self.shutdown_requested = True
+    def _load_previous_statuses(self) -> dict:
+        """Reads the service statuses from the last JSON report, if there is one."""
+        report_path = Path(RESULTS_DIR, JSON_REPORT_FILENAME)
+        try:
+            with report_path.open("r") as f:
+                report = json.load(f)
+            return {service: data["status"] for service, data in report["services"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _find_transitions(self, health_data: dict) -> dict:
+        """Returns {service: (old status, new status)} for every service whose status changed."""
+        return {
+            service: (self.previous_statuses.get(service), data["status"])
+            for service, data in health_data.items()
+            if self.previous_statuses.get(service) != data["status"]
+        }
+
+    def _write_json_report(self, health_data: dict, transitions: dict):
+        """Writes the current status of all services, and what changed, as JSON."""
+        report = {
+            "generated_at": datetime.datetime.now().isoformat(),
+            "services": health_data,
+            "transitions": {
+                service: {"from": old, "to": new} for service, (old, new) in transitions.items()
+            },
+        }
+        report_path = Path(RESULTS_DIR, JSON_REPORT_FILENAME)
+        temp_path = report_path.with_suffix(report_path.suffix + ".tmp")
+        try:
+            with temp_path.open("w") as f:
+                json.dump(report, f, indent=4)
+            temp_path.replace(report_path)
+        except OSError as e:
+            logger.error(f"Failed to save JSON health report: {e}")
 
     def _generate_report(self, health_data: dict):
         """Generates a PNG image report of the system status using Matplotlib."""
+        # Imported here, as it is only needed when a service changes state
+        import matplotlib.pyplot as plt
+
         logger.info("Generating health report PNG...")
         num_services = len(health_data)
         fig, axes = plt.subplots(
@@ -140,17 +173,14 @@ class HealthChecker:
 
     def _perform_service_check(self):
         """The main logic for checking the status of all services."""
-        status_path = Path(FLAG_DIR, STATUS_FILENAME)
         health_data = {}
 
-        try:
-            with lock_and_manage_file(status_path):
-                with status_path.open("r") as f:
-                    status_json = json.load(f)
-        except Exception as e:
-            logger.error(f"Could not load status file at {status_path}: {e}")
+        status_json = get_pipeline_status()
+        if not status_json:
+            logger.error(f"Could not load status file at {Path(FLAG_DIR, STATUS_FILENAME)}.")
             return
 
+        processes = ProcessTable()
         for service, config in SERVICE_CONFIG.items():
             data = status_json.get(service, {})
             pid = data.get("pid")
@@ -162,7 +192,7 @@ class HealthChecker:
             if status == "stopped":
                 health_info["status"] = "Stopped"
                 health_info["color"] = "grey"
-            elif not is_pid_active(pid, service):
+            elif not processes.is_active(pid, service, data.get("pid_start_time")):
                 health_info["status"] = "Crashed"
                 health_info["color"] = "red"
                 health_info["log_tail"] = get_log_tail(Path(LOGS_DIR, config["log"]))
@@ -183,10 +213,21 @@ class HealthChecker:
                     health_info["status"] = "Running OK"
                     health_info["color"] = "green"
 
+                # A service falls behind once entries take longer to get through it (capture-to-stage
+                # latency, see shared/latency.py) than one collection interval plus its own interval,
+                # since an entry can wait up to a full cycle of the service before it is picked up
+                latency_p90 = read_metric_totals(service).get("phorest_latency_p90_seconds")
+                if latency_p90 is not None:
+                    health_info["latency_p90_seconds"] = latency_p90
+                    latency_limit = COLLECTOR_INTERVAL + config["interval"]
+                    if latency_p90 > latency_limit and health_info["color"] == "green":
+                        health_info["status"] = "Falling Behind"
+                        health_info["color"] = "yellow"
+
             health_data[service] = health_info
         return health_data
 
-    def _perform_health_check_cycle(self):
+    async def perform(self):
         """State machin logic for the health checker."""
 
         if settings is None:
@@ -206,17 +247,26 @@ class HealthChecker:
                     logger.debug("WAITING_TO_RUN -> CHECKING_HEALTH")
                     self.current_state = HealthCheckerState.CHECKING_HEALTH
                 else:
-                    for _ in range(int(POLL_INTERVAL)):
-                        if self.shutdown_requested:
-                            return
-                        time.sleep(1)
+                    await self.sleep(min(POLL_INTERVAL, self.next_run_time - now))
 
             case HealthCheckerState.CHECKING_HEALTH:
                 logger.info("--- Starting Health Check Cycle ---")
                 try:
                     health_data = self._perform_service_check()
                     if health_data:
-                        self._generate_report(health_data)
+                        transitions = self._find_transitions(health_data)
+                        self._write_json_report(health_data, transitions)
+                        for service, (old, new) in transitions.items():
+                            logger.info(f"{service}: {old or 'Unknown'} -> {new}")
+                        if transitions or not Path(RESULTS_DIR, REPORT_FILENAME).exists():
+                            self._generate_report(health_data)
+                        else:
+                            logger.info("No service changed state. Health report PNG not redrawn.")
+                        self.previous_statuses = {
+                            service: data["status"] for service, data in health_data.items()
+                        }
+                    merged = aggregate_metrics(Path(RESULTS_DIR, METRICS_FILENAME))
+                    logger.info(f"Merged the metrics of {merged} services into {METRICS_FILENAME}.")
                     logger.info("--- Health Check Cycle Finished ---")
                 except Exception as e:
                     logger.error(f"Error during health check cycle: {e}")
@@ -225,34 +275,17 @@ class HealthChecker:
 
             case HealthCheckerState.FATAL_ERROR:
                 logger.error("[FATAL ERROR] Shutting down health checker.")
-                time.sleep(10)  # Prevent busy-looping in fatal state
-
-    def run(self):
-        """Main loop for the health checker process."""
-        logger.info("--- Starting Health Checker ---")
-        print("--- Starting Health Checker ---")
+                await self.sleep(10)  # Prevent busy-looping in fatal state
 
+    def on_start(self) -> bool:
         if settings is None:
             logger.debug("Configuration error. Halting.")
-            return
+            return False
 
         if not ENABLE_HEALTH_CHECK:
             logger.info("Health checker is disabled in config. Exiting.")
-            return
-
-        try:
-            while not self.shutdown_requested:
-                self._perform_health_check_cycle()
-
-                # After a cycle is complete, send a heartbeat.
-                update_service_status(SCRIPT_NAME, heartbeat=True)
-
-                time.sleep(0.1)
-        except Exception as e:
-            logger.critical(f"UNEXPECTED ERROR in main loop: {e}", exc_info=True)
-        finally:
-            logger.info("--- Health Checker Stopped ---")
-            print("--- Health Checker Stopped ---")
+            return False
+        return True
 
 
 def run_health_check():
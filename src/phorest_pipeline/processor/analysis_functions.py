@@ -1,4 +1,5 @@
 import logging
+import warnings
 from typing import Dict, Tuple
 
 import cv2
@@ -24,6 +25,80 @@ def get_image_brightness_contrast(data: np.ndarray) -> Tuple[float, float]:
     return (float(brightness), float(contrast))
 
 
+def assess_frame_quality(
+    data: np.ndarray,
+    min_brightness: float,
+    max_brightness: float,
+    min_contrast: float,
+    thumbnail_factor: int = 8,
+) -> Tuple[float, float, str | None]:
+    """
+    Function Details
+    ============================================================================
+    Cheap pre-check used to reject blank, saturated or featureless frames
+    before the (expensive) rotation and per-row fitting is performed.
+
+    Parameters
+    ----------
+    data : ndarray
+        2D array representing the raw image (any integer or float dtype)
+    min_brightness, max_brightness : float
+        Accepted range of the mean pixel value, on a 0-255 scale
+    min_contrast : float
+        Minimum accepted spread between the 5th and 95th percentile, on a
+        0-255 scale
+    thumbnail_factor : int
+        Downsampling factor applied before the measurements are taken
+
+    Returns
+    -------
+    _ : Tuple
+        (brightness, contrast, rejection_reason), rejection_reason is None if
+        the frame passes all checks
+
+    Notes
+    -----
+    The measurements are taken on an area-averaged thumbnail, so the values
+    are slightly smoother than those from get_image_brightness_contrast(),
+    but are more than adequate to spot lighting failures.  Integer images
+    with more than 8 bits are scaled onto 0-255 so the thresholds are the
+    same regardless of camera bit depth.
+
+    Examples
+    --------
+    brightness, contrast, reason = assess_frame_quality(image_data, 5, 250, 5)
+
+    ----------------------------------------------------------------------------
+    Update History
+    ==============
+
+    18/10/2026
+    ----------
+    Created function.
+    """
+    height, width = data.shape[:2]
+    thumbnail = cv2.resize(
+        data,
+        (max(1, width // thumbnail_factor), max(1, height // thumbnail_factor)),
+        interpolation=cv2.INTER_AREA,
+    ).astype(np.float32)
+
+    if np.issubdtype(data.dtype, np.integer) and np.iinfo(data.dtype).max > 255:
+        thumbnail *= 255.0 / np.iinfo(data.dtype).max
+
+    brightness = round(float(np.mean(thumbnail)), 2)
+    lower, upper = np.percentile(thumbnail, (5, 95))
+    contrast = round(float(upper - lower), 2)
+
+    if brightness < min_brightness:
+        return brightness, contrast, f'Frame too dark (brightness {brightness} < {min_brightness})'
+    if brightness > max_brightness:
+        return brightness, contrast, f'Frame saturated (brightness {brightness} > {max_brightness})'
+    if contrast < min_contrast:
+        return brightness, contrast, f'Frame has no contrast (contrast {contrast} < {min_contrast})'
+    return brightness, contrast, None
+
+
 def extract_roi_data(data: np.ndarray, ID: str, ROIs: Dict) -> np.ndarray:
     """
     Function Details
@@ -198,6 +273,166 @@ def analyse_roi_data(data: np.ndarray, analysis_method: str) -> Dict:
     return results
 
 
+ROI_STATISTICS_FIELDS = ('Mean', 'STD', 'LQ', 'Median', 'UQ', 'Max', 'Min', 'Smoothness')
+STATISTICS_DECIMAL_PLACES = 3
+
+
+def roi_statistics_dtype(metric_length: int) -> np.dtype:
+    """Structured dtype of the compute_roi_statistics() records, with room for metric names of 'metric_length' characters."""
+    return np.dtype(
+        [('roi', np.int32), ('metric', f'U{max(1, metric_length)}')]
+        + [(field, np.float64) for field in ROI_STATISTICS_FIELDS]
+    )
+
+
+def _summary_statistics(values: np.ndarray) -> np.ndarray:
+    """
+    Reduces a (metrics, rows) array, padded with NaN where a metric has fewer
+    rows, along its rows.  Each row of the result holds: mean, std, LQ,
+    median, UQ, max, min and the std of the row-to-row differences (used for
+    Smoothness).  Metrics without any values give NaN.
+    """
+    raw = np.full((values.shape[0], len(ROI_STATISTICS_FIELDS)), np.nan)
+    if values.shape[1] == 0:
+        return raw
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)  # Metrics without any values
+        raw[:, 0] = np.nanmean(values, axis=1)
+        raw[:, 1] = np.nanstd(values, axis=1)
+        raw[:, 2:5] = np.nanpercentile(values, (25, 50, 75), axis=1).T
+        raw[:, 5] = np.nanmax(values, axis=1)
+        raw[:, 6] = np.nanmin(values, axis=1)
+        if values.shape[1] > 1:
+            # Values are packed to the left, so only the step into the padding is NaN
+            raw[:, 7] = np.nanstd(np.diff(values, axis=1), axis=1)
+    return raw
+
+
+def compute_roi_statistics(roi_results: list) -> np.ndarray:
+    """
+    Function Details
+    ============================================================================
+    Computes the summary statistics for every metric of every ROI of a frame
+    in one call, returning a compact structured array.
+
+    Parameters
+    ----------
+    roi_results : list
+        List of raw result dictionaries from analyse_roi_data(), one per ROI
+
+    Returns
+    -------
+    statistics : ndarray
+        Structured array (roi_statistics_dtype()) with one record per ROI
+        metric, in ROI order.  The 'roi' field is the position of the ROI
+        within 'roi_results', see split_roi_statistics()
+
+    Notes
+    -----
+    The values of each ROI are gathered into one 2D array (one row per
+    metric, NaN padded where a metric skipped rows) and reduced along its
+    rows, the rounding is then applied to the full frame in a single
+    vectorised call.  Smoothness is computed from the rounded Max and Min to
+    match the previous per-ROI behaviour.
+
+    Examples
+    --------
+    statistics = compute_roi_statistics([result_1, result_2])
+
+    ----------------------------------------------------------------------------
+    Update History
+    ==============
+
+    18/10/2026
+    ----------
+    Created function.
+    """
+    records = []
+    blocks = []
+    for roi_idx, data in enumerate(roi_results):
+        keys = [key for key in data if 'Analysis-method' not in key]
+        segments = [data[key]['Values'] for key in keys]
+        if not keys:
+            continue
+        lengths = {len(segment) for segment in segments}
+        if len(lengths) == 1:
+            values = np.asarray(segments, dtype=np.float64).reshape(len(keys), -1)
+        else:
+            values = np.full((len(keys), max(lengths)), np.nan)
+            for row, segment in enumerate(segments):
+                values[row, : len(segment)] = segment
+        records.extend((roi_idx, key) for key in keys)
+        blocks.append(_summary_statistics(values))
+
+    statistics = np.zeros(
+        len(records), dtype=roi_statistics_dtype(max((len(key) for _, key in records), default=1))
+    )
+    if not records:
+        return statistics
+
+    raw = np.concatenate(blocks)
+    diff_std = raw[:, 7].copy()
+    raw = np.round(raw, decimals=STATISTICS_DECIMAL_PLACES)
+    data_range = raw[:, 5] - raw[:, 6]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        smoothness = np.where(data_range == 0, 0.0, diff_std / data_range)
+    raw[:, 7] = np.round(smoothness, decimals=STATISTICS_DECIMAL_PLACES)
+
+    statistics['roi'] = [roi_idx for roi_idx, _ in records]
+    statistics['metric'] = [key for _, key in records]
+    for field_idx, field in enumerate(ROI_STATISTICS_FIELDS):
+        statistics[field] = raw[:, field_idx]
+    return statistics
+
+
+def split_roi_statistics(statistics: np.ndarray, roi_count: int) -> list:
+    """Splits compute_roi_statistics() records into one (possibly empty) array per ROI, in a single pass."""
+    order = np.argsort(statistics['roi'], kind='stable')
+    grouped = statistics[order]
+    bounds = np.searchsorted(grouped['roi'], np.arange(roi_count + 1))
+    return [grouped[bounds[i] : bounds[i + 1]] for i in range(roi_count)]
+
+
+def roi_statistics_to_dict(data: Dict, statistics: np.ndarray) -> Dict:
+    """
+    Function Details
+    ============================================================================
+    Serialises the statistics records of a single ROI back into its results
+    dictionary, ready to be written out as JSON.
+
+    Parameters
+    ----------
+    data : Dictionary
+        Dictionary containing raw results from analyse_roi_data()
+    statistics : ndarray
+        Records from compute_roi_statistics() belonging to this ROI
+
+    Returns
+    -------
+    results : Dictionary
+        Dictionary with statistical measurements added
+
+    Examples
+    --------
+    results = roi_statistics_to_dict(result, split_roi_statistics(statistics, len(results))[idx])
+
+    ----------------------------------------------------------------------------
+    Update History
+    ==============
+
+    18/10/2026
+    ----------
+    Created function.
+    """
+    for record in statistics:
+        metric = data[str(record['metric'])]
+        for field in ROI_STATISTICS_FIELDS:
+            metric[field] = float(record[field])
+        if not DEBUG_MODE:
+            del metric['Values']
+    return data
+
+
 def postprocess_roi_results(data: Dict) -> Dict:
     """
     Function Details
@@ -216,8 +451,10 @@ def postprocess_roi_results(data: Dict) -> Dict:
 
     Notes
     -----
-    Currently there are six measurements added to the results dictionary: mean,
-    standard deviation, lower quantile, median, upper quantile and maximum value
+    Currently there are eight measurements added to the results dictionary:
+    mean, standard deviation, lower quantile, median, upper quantile, maximum
+    value, minimum value and smoothness.  For whole frames prefer
+    compute_roi_statistics(), which handles all ROIs in a single call.
 
     Examples
     --------
@@ -230,26 +467,9 @@ def postprocess_roi_results(data: Dict) -> Dict:
     16/10/2024
     ----------
     Created function CR.
+
+    18/10/2026
+    ----------
+    Now a thin wrapper around compute_roi_statistics().
     """
-    dp = 3
-    for key, value in data.items():
-        if 'Analysis-method' in key:
-            continue
-        temp = np.array(value['Values'])
-        data[key]['Mean'] = np.round(np.mean(temp), decimals=dp)
-        data[key]['STD'] = np.round(np.std(temp), decimals=dp)
-        data[key]['LQ'] = np.round(np.quantile(temp, 0.25), decimals=dp)
-        data[key]['Median'] = np.round(np.quantile(temp, 0.50), decimals=dp)
-        data[key]['UQ'] = np.round(np.quantile(temp, 0.75), decimals=dp)
-        data[key]['Max'] = np.round(np.max(temp), decimals=dp)
-        data[key]['Min'] = np.round(np.min(temp), decimals=dp)
-        data_range = data[key]['Max'] - data[key]['Min']
-        if data_range == 0:
-            data[key]['Smoothness'] = 0.0
-        else:
-            data[key]['Smoothness'] = np.round(
-                np.std(np.diff(temp)) / data_range, decimals=dp
-            )  # Smoothness i.e. Variation
-        if not DEBUG_MODE:
-            del value["Values"]
-    return data
+    return roi_statistics_to_dict(data, compute_roi_statistics([data]))
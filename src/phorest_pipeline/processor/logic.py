@@ -1,12 +1,11 @@
 # phorest_pipeline/processor/logic.py
 import datetime
-import signal
-import sys
 import time
 from multiprocessing import Pool, cpu_count
 from pathlib import Path
 
 from phorest_pipeline.processor.process_image import process_image
+from phorest_pipeline.shared import latency, metrics
 from phorest_pipeline.shared.config import (
     DATA_DIR,
     DATA_READY_FLAG,
@@ -19,16 +18,20 @@ from phorest_pipeline.shared.config import (
     RESULTS_READY_FLAG,
     settings,  # Check if config loaded
 )
+from phorest_pipeline.shared.event_types import EventType
 from phorest_pipeline.shared.helper_utils import move_existing_files_to_backup, snapshot_configs
 from phorest_pipeline.shared.logger_config import configure_logger
+from phorest_pipeline.shared.message_bus import publish, subscribe
 
 # Assuming metadata_manager handles loading/saving the manifest
 from phorest_pipeline.shared.metadata_manager import (
     append_metadata,
+    claim_pending_entries,
     load_metadata_with_lock,
     update_metadata_manifest_entry,
-    update_service_status,
 )
+from phorest_pipeline.shared.notifier import FlagNotifier
+from phorest_pipeline.shared.service import Service
 from phorest_pipeline.shared.states import ProcessorState
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename="processor.log")
@@ -37,6 +40,13 @@ SCRIPT_NAME = "phorest-processor"
 
 POLL_INTERVAL = PROCESSOR_INTERVAL / 20 if PROCESSOR_INTERVAL > (5 * 20) else 5
 
+PENDING_ENTRIES = metrics.gauge(
+    "phorest_pending_entries", "Entries waiting to be processed, as of the last check"
+)
+IMAGE_PROCESSING_SECONDS = metrics.histogram(
+    "phorest_image_processing_seconds", "Processing time per entry (chunk time / chunk size)"
+)
+
 
 def process_image_worker(args: tuple) -> tuple[dict, dict]:
     """
@@ -48,26 +58,34 @@ def process_image_worker(args: tuple) -> tuple[dict, dict]:
 
     image_results = None
     img_proc_error_msg = None
+    rejection_reason = None
     processing_successful = False
+    latency_stamps = dict(entry_data.get("latency_stamps") or {})
     try:
         if ENABLE_CAMERA:
             image_meta = entry_data.get("camera_data")
             if image_meta and image_meta.get("filename"):
-                image_results, img_proc_error_msg = process_image(image_meta)
+                image_results, img_proc_error_msg = process_image(image_meta, latency_stamps)
             else:
                 img_proc_error_msg = "Camera enabled but no image data in entry."
         else:
             img_proc_error_msg = "Camera not enabled."
 
+        if image_results and image_results[0].get("frame_rejected"):
+            rejection_reason = image_results[0].get("rejection_reason")
+
         temperature_data = entry_data.get("temperature_data") if ENABLE_THERMOCOUPLE else None
 
-        if (ENABLE_CAMERA and image_results) or (
+        if rejection_reason:
+            img_proc_error_msg = rejection_reason
+        elif (ENABLE_CAMERA and image_results) or (
             ENABLE_THERMOCOUPLE and temperature_data and not temperature_data.get("error_flag")
         ):
             processing_successful = True
 
         if not processing_successful and not img_proc_error_msg:
             img_proc_error_msg = "Processing failed for an unknown reason."
+        latency_stamps["analysed"] = latency.stamp()
 
         # Aggregate results for the results.jsonl file
         result_for_append = {
@@ -80,15 +98,28 @@ def process_image_worker(args: tuple) -> tuple[dict, dict]:
             "processing_timestamp_iso": datetime.datetime.now().isoformat(),
             "processing_successful": processing_successful,
             "processing_error_message": img_proc_error_msg,
+            "frame_rejected": rejection_reason is not None,
             "image_analysis": image_results,
             "temperature_readings": temperature_data.get("data") if temperature_data else None,
         }
 
         # Aggregate results for the manifest update
+        if rejection_reason:
+            status = "rejected"
+        else:
+            status = "processed" if processing_successful else "failed"
         result_for_manifest = {
             "index": entry_index,
-            "status": "processed" if processing_successful else "failed",
+            "status": status,
             "error_msg": img_proc_error_msg,
+            # Short summary for the ENTRY_PROCESSED bus event
+            "summary": {
+                "brightness": image_results[0].get("brightness"),
+                "contrast": image_results[0].get("contrast"),
+            }
+            if image_results
+            else None,
+            "latency_stamps": latency_stamps,
         }
         return result_for_append, result_for_manifest
 
@@ -136,6 +167,11 @@ def save_results_out(all_results_for_append, all_results_for_manifest_update):
         indices_to_update = [res["index"] for res in all_results_for_manifest_update]
         updated_statues = [res["status"] for res in all_results_for_manifest_update]
         updated_error_msgs = [res["error_msg"] for res in all_results_for_manifest_update]
+        appended_at = latency.stamp()
+        updated_stamps = [
+            {**res.get("latency_stamps", {}), "result_appended": appended_at}
+            for res in all_results_for_manifest_update
+        ]
 
         try:
             update_metadata_manifest_entry(
@@ -145,10 +181,12 @@ def save_results_out(all_results_for_append, all_results_for_manifest_update):
                 processing_timestamp_iso=datetime.datetime.now().isoformat(),  # Apply same timestamp to whole batch
                 processing_error=[s == "failed" for s in updated_statues],
                 processing_error_msg=updated_error_msgs,
+                latency_stamps=updated_stamps,
             )
             logger.info(
                 f"Successfully performed batch update on manifest for {len(indices_to_update)} entries."
             )
+            publish(EventType.ENTRY_PROCESSED, entries=all_results_for_manifest_update)
 
             logger.debug(f"Creating results ready flag: {RESULTS_READY_FLAG}")
             try:
@@ -162,28 +200,37 @@ def save_results_out(all_results_for_append, all_results_for_manifest_update):
             )
 
 
-class Processor:
+class Processor(Service):
     """Encapsulates the state and logic for the processing pipeline."""
 
+    SCRIPT_NAME = SCRIPT_NAME
+    DISPLAY_NAME = "Processor"
+    FATAL_STATE = ProcessorState.FATAL_ERROR
+
     def __init__(self):
         # All global state now lives here as instance state
-        self.shutdown_requested = False
-        self.current_state = ProcessorState.PROCESSING
+        super().__init__(logger, ProcessorState.PROCESSING)
         self.next_run_time = 0
 
         self.num_workers = max(1, cpu_count() - 2)
+        self.notifier = FlagNotifier(DATA_READY_FLAG)
+
+        # New entries announced on the message bus (if enabled), so the manifest need not be
+        # scanned every time. Events can be dropped, and entries may have been pending before
+        # the processor started, so the bus is only a hint: the manifest is still scanned on
+        # start-up, after a failed claim and at least once every PROCESSOR_INTERVAL.
+        self.bus = subscribe("processor", {EventType.ENTRY_ADDED})
+        self.pending_indices = []
+        self.next_scan_time = 0  # time.monotonic() of the next full manifest scan
 
-        # Register signal handler
-        signal.signal(signal.SIGINT, self._graceful_shutdown)
-        signal.signal(signal.SIGTERM, self._graceful_shutdown)
+        # Rolling capture-to-analysis latency of recently processed entries
+        self.latency = latency.LatencyTracker("analysed")
 
-    def _graceful_shutdown(self, _signum, _frame):
-        """Signal handler to initiate a graceful shutdown"""
-        if not self.shutdown_requested:
-            logger.info("Shutdown signal received. Finishing current batch before stopping...")
-            self.shutdown_requested = True
+    def _queue_events(self, events: list):
+        for _, payload in events:
+            self.pending_indices.extend(payload.get("indices", []))
 
-    def _perform_processing(self) -> None:
+    async def perform(self) -> None:
         """State machine logic for the processor."""
 
         if settings is None:
@@ -200,60 +247,83 @@ class Processor:
                 self.current_state = ProcessorState.WAITING_FOR_DATA
 
             case ProcessorState.WAITING_FOR_DATA:
-                logger.debug(f"Waiting for {PROCESSOR_INTERVAL} seconds until next cycle...")
-                now = time.monotonic()
-                if now >= self.next_run_time:
-                    if DATA_READY_FLAG.exists():
-                        logger.debug(f"Found flag {DATA_READY_FLAG}. Consuming.")
-                        try:
-                            DATA_READY_FLAG.unlink()
-                            logger.debug(f"Deleted flag {DATA_READY_FLAG}.")
-                            logger.debug("WAITING_FOR_DATA -> PROCESSING")
-                            self.current_state = ProcessorState.PROCESSING
-                        except (FileNotFoundError, OSError) as e:
-                            logger.error(f"Could not delete flag {DATA_READY_FLAG}: {e}")
-                            # Stay waiting, maybe the flag is gone or perms issue
-                            time.sleep(5)
-                    else:
-                        self.current_state = ProcessorState.IDLE
-                        logger.debug("WAITING_FOR_DATA -> IDLE")
+                if self.bus is not None:
+                    self._queue_events(self.bus.receive())
+
+                if DATA_READY_FLAG.exists():
+                    logger.debug(f"Found flag {DATA_READY_FLAG}. Consuming.")
+                    try:
+                        DATA_READY_FLAG.unlink()
+                        logger.debug(f"Deleted flag {DATA_READY_FLAG}.")
+                        logger.debug("WAITING_FOR_DATA -> PROCESSING")
+                        self.current_state = ProcessorState.PROCESSING
+                    except (FileNotFoundError, OSError) as e:
+                        logger.error(f"Could not delete flag {DATA_READY_FLAG}: {e}")
+                        # Stay waiting, maybe the flag is gone or perms issue
+                        await self.sleep(5)
+                elif self.pending_indices:
+                    logger.debug("New entries announced on the message bus.")
+                    logger.debug("WAITING_FOR_DATA -> PROCESSING")
+                    self.current_state = ProcessorState.PROCESSING
+                elif self.bus is not None and time.monotonic() >= self.next_scan_time:
+                    logger.debug("Manifest scan due.")
+                    logger.debug("WAITING_FOR_DATA -> PROCESSING")
+                    self.current_state = ProcessorState.PROCESSING
+                elif time.monotonic() >= self.next_run_time:
+                    self.current_state = ProcessorState.IDLE
+                    logger.debug("WAITING_FOR_DATA -> IDLE")
                 else:
-                    for _ in range(int(POLL_INTERVAL)):
-                        if self.shutdown_requested:
-                            return
-                        time.sleep(1)
+                    # Wake up as soon as the collector raises the flag (or announces new entries)
+                    await self.wait(
+                        min(POLL_INTERVAL, self.next_run_time - time.monotonic()),
+                        self.notifier,
+                        self.bus,
+                    )
 
             case ProcessorState.PROCESSING:
                 logger.info("--- Checking for PENDING Data to Process ---")
 
-                # 1. Load data manifest to find available work
-                manifest_data = load_metadata_with_lock(Path(DATA_DIR, METADATA_FILENAME))
-                work_queue = find_all_unprocessed_entries(manifest_data)
-
-                if not work_queue:
-                    logger.info("No more PENDING entries found in manifest.")
-                    logger.debug("PROCESSING -> IDLE")
-                    self.current_state = ProcessorState.IDLE
-                    return
-
-                # 2. Define chunk size to process now
+                # 1. Find available work. Entries announced on the message bus are used
+                # directly, unless a full scan of the manifest for pending entries is due.
                 chunk_size = 10
-                process_chunk = work_queue[:chunk_size]
-                indicies_to_claim = [index for index, _ in process_chunk]
+                from_bus = bool(self.pending_indices) and time.monotonic() < self.next_scan_time
+                if from_bus:
+                    indicies_to_claim = self.pending_indices[:chunk_size]
+                    del self.pending_indices[:chunk_size]
+                    logger.info(
+                        f"{len(indicies_to_claim) + len(self.pending_indices)} new entries announced. Claiming a chunk of {len(indicies_to_claim)}."
+                    )
+                    PENDING_ENTRIES.set(len(indicies_to_claim) + len(self.pending_indices))
+                else:
+                    # The scan finds every announced entry too
+                    self.pending_indices.clear()
+                    manifest_data = load_metadata_with_lock(Path(DATA_DIR, METADATA_FILENAME))
+                    work_queue = find_all_unprocessed_entries(manifest_data)
+                    PENDING_ENTRIES.set(len(work_queue))
+
+                    if not work_queue:
+                        logger.info("No more PENDING entries found in manifest.")
+                        self.next_scan_time = time.monotonic() + PROCESSOR_INTERVAL
+                        logger.debug("PROCESSING -> IDLE")
+                        self.current_state = ProcessorState.IDLE
+                        return
 
-                # 3. Lock the manifest and 'claim' ONLY the chunk of work
-                logger.info(
-                    f"Found batch of {len(work_queue)} entries to process. Claiming a chunk of {len(process_chunk)}."
-                )
+                    # 2. Define chunk size to process now
+                    indicies_to_claim = [index for index, _ in work_queue[:chunk_size]]
+                    logger.info(
+                        f"Found batch of {len(work_queue)} entries to process. Claiming a chunk of {len(indicies_to_claim)}."
+                    )
+
+                # 3. Lock the manifest and 'claim' ONLY the chunk of work that is still pending
                 try:
-                    update_metadata_manifest_entry(
+                    process_chunk = claim_pending_entries(
                         Path(DATA_DIR, METADATA_FILENAME),
-                        entry_index=indicies_to_claim,
-                        status="processing",
+                        indicies_to_claim,
                         processing_timestamp_iso=datetime.datetime.now().isoformat(),
                     )
                 except Exception as e:
                     logger.error(f"Failed to claim chunk for processing: {e}", exc_info=True)
+                    self.next_scan_time = 0  # The chunk is not announced again, find it by scanning
                     self.current_state = ProcessorState.IDLE  # Go idle and retry later
                     return
 
@@ -266,32 +336,44 @@ class Processor:
                     all_results_for_append = []
                     all_results_for_manifest_update = []
 
+                    chunk_start = time.monotonic()
                     with Pool(processes=self.num_workers) as pool:
                         results = pool.map(process_image_worker, process_chunk)
+                    chunk_seconds = time.monotonic() - chunk_start
 
                     for res_append, res_manifest in results:
                         if res_append:
                             all_results_for_append.append(res_append)
                         if res_manifest:
                             all_results_for_manifest_update.append(res_manifest)
+                            metrics.counter(
+                                "phorest_entries_processed_total",
+                                "Entries processed, by resulting status (failed = fit failure)",
+                                status=res_manifest["status"],
+                            ).inc()
+                            IMAGE_PROCESSING_SECONDS.observe(chunk_seconds / len(process_chunk))
+                            stamps = res_manifest.get("latency_stamps")
+                            self.latency.add(stamps, stamps.get("analysed") if stamps else None)
+                    logger.info(self.latency.summary())
 
                     # 5. Save all results for the entire chunk of work at once
                     logger.info("--- Collating results for batch update ---")
                     save_results_out(all_results_for_append, all_results_for_manifest_update)
 
-                # 6. Loop back immediately to check for next chunk of work
-                self.current_state = ProcessorState.PROCESSING
+                # 6. Loop back immediately to check for next chunk of work. Entries
+                # announced on the bus are complete, so there is no need to scan afterwards.
+                if from_bus and not self.pending_indices:
+                    logger.debug("PROCESSING -> IDLE")
+                    self.current_state = ProcessorState.IDLE
+                else:
+                    self.current_state = ProcessorState.PROCESSING
 
             case ProcessorState.FATAL_ERROR:
                 # Should not technically be called again once in this state if loop breaks
                 logger.error("[FATAL ERROR] Shutting down processor.")
-                time.sleep(10)  # Sleep long if it somehow gets called
-
-    def run(self):
-        """Main loop for the processor process."""
-        logger.info("--- Starting Processor ---")
-        print("--- Starting Processor ---")
+                await self.sleep(10)  # Sleep long if it somehow gets called
 
+    def on_start(self) -> bool:
         # Initial cleanup: remove data flag if it exists on startup
         if settings:
             snapshot_configs(logger=logger)
@@ -306,55 +388,30 @@ class Processor:
                 logger.debug(f"Ensured flag {DATA_READY_FLAG} is initially removed.")
             except OSError as e:
                 logger.warning(f"Could not remove initial flag {DATA_READY_FLAG}: {e}")
+        return True
 
-        try:
-            while not self.shutdown_requested:
-                self._perform_processing()
-
-                # After a cycle is complete, send a heartbeat.
-                update_service_status(SCRIPT_NAME, heartbeat=True)
-
-                # --- Check for FATAL_ERROR state to exit ---
-                if self.current_state == ProcessorState.FATAL_ERROR:
-                    logger.info("Exiting due to FATAL_ERROR state or shutdown request.")
-                    break  # Exit the while loop
-
-                # Sleep only when waiting, processing loop handles its own pacing/delays
-                if (
-                    self.current_state == ProcessorState.WAITING_FOR_DATA
-                    or self.current_state == ProcessorState.IDLE
-                ):
-                    time.sleep(0.1)  # Prevent busy-looping when idle/waiting
-        except Exception as e:
-            logger.critical(f"UNEXPECTED ERROR in main loop: {e}", exc_info=True)
-            self.current_state = ProcessorState.FATAL_ERROR
-        finally:
-            # No flags need specific cleanup here unless DATA_READY might be left mid-operation
-            if settings:
-                logger.info("Performing final cleanup of temporary files...")
-                results_temp_path = Path(RESULTS_DIR, RESULTS_FILENAME).with_suffix(
-                    RESULTS_FILENAME.suffix + ".tmp"
-                )
-                if results_temp_path.exists():
-                    try:
-                        results_temp_path.unlink()
-                        logger.debug(f"Cleaned up {results_temp_path.name} on shutdown.")
-                    except OSError as e:
-                        logger.error(
-                            f"Could not clean up {results_temp_path.name} on shutdown: {e}"
-                        )
-
-                logger.debug("Cleaning up flags...")
+    def on_stop(self):
+        self.notifier.close()
+        if self.bus is not None:
+            self.bus.close()
+        # No flags need specific cleanup here unless DATA_READY might be left mid-operation
+        if settings:
+            logger.info("Performing final cleanup of temporary files...")
+            results_temp_path = Path(RESULTS_DIR, RESULTS_FILENAME).with_suffix(
+                RESULTS_FILENAME.suffix + ".tmp"
+            )
+            if results_temp_path.exists():
                 try:
-                    DATA_READY_FLAG.unlink(missing_ok=True)
+                    results_temp_path.unlink()
+                    logger.debug(f"Cleaned up {results_temp_path.name} on shutdown.")
                 except OSError as e:
-                    logger.error(f"Could not clean up flag {DATA_READY_FLAG} on exit: {e}")
-            logger.info("--- Processor Stopped ---")
-            print("--- Processor Stopped ---")
-            if self.current_state == ProcessorState.FATAL_ERROR and not self.shutdown_requested:
-                sys.exit(1)
-            else:
-                sys.exit(0)
+                    logger.error(f"Could not clean up {results_temp_path.name} on shutdown: {e}")
+
+            logger.debug("Cleaning up flags...")
+            try:
+                DATA_READY_FLAG.unlink(missing_ok=True)
+            except OSError as e:
+                logger.error(f"Could not clean up flag {DATA_READY_FLAG} on exit: {e}")
 
 
 def run_processor():
@@ -21,17 +21,27 @@ import numpy as np
 
 from phorest_pipeline.processor.analysis_functions import (
     analyse_roi_data,
+    assess_frame_quality,
+    compute_roi_statistics,
     extract_roi_data,
     get_image_brightness_contrast,
-    postprocess_roi_results,
     preprocess_roi_data,
+    roi_statistics_to_dict,
+    split_roi_statistics,
 )
+from phorest_pipeline.shared import latency
 from phorest_pipeline.shared.config import (
+    ENABLE_FRAME_REJECTION,
     GENERATED_FILES_DIR,
     METHOD,
     NUMBER_SUB_ROIS,
+    REJECT_MAX_BRIGHTNESS,
+    REJECT_MIN_BRIGHTNESS,
+    REJECT_MIN_CONTRAST,
     ROI_MANIFEST_FILENAME,
 )
+from phorest_pipeline.shared.frame_ring import get_frame_ring
+from phorest_pipeline.shared.image_io import RING_IMAGE_SUFFIX, load_image
 from phorest_pipeline.shared.logger_config import configure_logger
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename="processor.log")
@@ -40,7 +50,20 @@ IMAGE_SIZE_THRESHOLD = 15_000  # Bits
 ROI_MANIFEST_PATH = Path(GENERATED_FILES_DIR, ROI_MANIFEST_FILENAME)
 
 
-def process_image(image_meta: dict | None) -> tuple[list | None, str | None]:
+def _ring_frame_overwritten(image_filepath: Path, ring_read: tuple | None) -> bool:
+    """True if a frame read from the frame ring was overwritten while it was being used."""
+    if ring_read is None:
+        return False
+    return not get_frame_ring(image_filepath.parent).is_current(image_filepath.name, ring_read[1])
+
+
+def process_image(
+    image_meta: dict | None, latency_stamps: dict | None = None
+) -> tuple[list | None, str | None]:
+    """
+    Analyses one image. If 'latency_stamps' is given, the time at which the
+    image was decoded is recorded in it as 'decoded'.
+    """
     logger.info("[ANALYSER] Processing image...")
     logger.info(f"[ANALYSER] Number of subROIs: {NUMBER_SUB_ROIS}")
     if not image_meta or not image_meta.get("filename") or not image_meta.get("filepath"):
@@ -58,20 +81,48 @@ def process_image(image_meta: dict | None) -> tuple[list | None, str | None]:
     processing_results = []
 
     try:
-        if not image_filepath.exists():
-            return None, f"Image file not found: {image_filepath}"
-
-        image_size_good = image_filepath.stat().st_size > IMAGE_SIZE_THRESHOLD
-
-        if not image_size_good:
-            return None, f"Image does not match size criteria : {image_filepath}"
-
-        # Load image
-        image_data = cv2.imread(str(image_filepath), cv2.IMREAD_UNCHANGED)
+        # Frames in the frame ring have no file of their own to check
+        if image_filepath.suffix != RING_IMAGE_SUFFIX:
+            if not image_filepath.exists():
+                return None, f"Image file not found: {image_filepath}"
+
+            image_size_good = image_filepath.stat().st_size > IMAGE_SIZE_THRESHOLD
+
+            if not image_size_good:
+                return None, f"Image does not match size criteria : {image_filepath}"
+
+        # Load image. Frames in the frame ring are a zero-copy view of their slot, which the
+        # collector may reuse meanwhile, so the view is checked again once it has been used.
+        ring_read = None
+        if image_filepath.suffix == RING_IMAGE_SUFFIX:
+            ring_read = get_frame_ring(image_filepath.parent).read(image_filename)
+            image_data = ring_read[0] if ring_read else None
+        else:
+            image_data = load_image(image_filepath)
+        if latency_stamps is not None:
+            latency_stamps["decoded"] = latency.stamp()
 
         if image_data is None:
             return None, f"Failed to load image file (may be corrupt): {image_filepath}"
 
+        # Reject blank/saturated frames before any expensive analysis
+        if ENABLE_FRAME_REJECTION:
+            brightness, contrast, rejection_reason = assess_frame_quality(
+                image_data, REJECT_MIN_BRIGHTNESS, REJECT_MAX_BRIGHTNESS, REJECT_MIN_CONTRAST
+            )
+            if rejection_reason:
+                if _ring_frame_overwritten(image_filepath, ring_read):
+                    return None, f"Frame was overwritten in the frame ring while being analysed: {image_filepath}"
+                logger.warning(f"[ANALYSER] Rejected {image_filename}: {rejection_reason}")
+                return [
+                    {
+                        "brightness": brightness,
+                        "contrast": contrast,
+                        "frame_rejected": True,
+                        "rejection_reason": rejection_reason,
+                    }
+                ], None
+
         brightness, contrast = get_image_brightness_contrast(image_data)
 
         processing_results.append(
@@ -100,15 +151,18 @@ def process_image(image_meta: dict | None) -> tuple[list | None, str | None]:
         rotation_matrix = cv2.getRotationMatrix2D(rot_centre, -ROI_dictionary["image_angle"], 1.0)
         image_data = cv2.warpAffine(image_data, rotation_matrix, (w, h))
 
+        # The analysis below only uses the rotated copy
+        if _ring_frame_overwritten(image_filepath, ring_read):
+            return None, f"Frame was overwritten in the frame ring while being analysed: {image_filepath}"
+
         # Begin loop over ROIs
+        roi_labels = []
+        roi_results = []
         for ROI_ID in ROI_dictionary:
             if "ROI" not in ROI_ID:
                 continue
             logger.debug(f'[ANALYSER] Processing ROI "{ROI_ID}"')
 
-            # Add ROI label to results dictionary
-            results = {"ROI-label": ROI_dictionary[ROI_ID]["label"]}
-
             # Slice image to ROI
             ROI_data = extract_roi_data(image_data, ROI_ID, ROI_dictionary)
 
@@ -122,9 +176,14 @@ def process_image(image_meta: dict | None) -> tuple[list | None, str | None]:
                 logger.warning(f"[ANALYSER] ROI {ROI_ID} - Resonance not visible")
                 continue
 
-            # Post-process results to add statistical analysis
-            results.update(postprocess_roi_results(result))
+            roi_labels.append(ROI_dictionary[ROI_ID]["label"])
+            roi_results.append(result)
 
+        # Statistical analysis of all ROIs at once, serialised per ROI
+        statistics = split_roi_statistics(compute_roi_statistics(roi_results), len(roi_results))
+        for label, result, roi_statistics in zip(roi_labels, roi_results, statistics):
+            results = {"ROI-label": label}
+            results.update(roi_statistics_to_dict(result, roi_statistics))
             processing_results.append(results)
 
         return processing_results, None
@@ -0,0 +1,127 @@
+# src/phorest_pipeline/scripts/benchmark_codecs.py
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from phorest_pipeline.shared.config import DATA_DIR, IMAGE_CODEC, PNG_COMPRESSION_LEVEL
+from phorest_pipeline.shared.helper_utils import IMAGE_SUFFIXES
+from phorest_pipeline.shared.image_io import encode_params, load_image
+from phorest_pipeline.shared.image_sources import ImageCodec
+
+REPEATS = 5  # Encodes per codec and frame, the median time is reported
+SAMPLE_FRAMES = 3  # Recent captures benchmarked when no images are given
+PNG_LEVELS = (0, 1, 3, 6, 9)
+SYNTHETIC_RESOLUTION = (1080, 1920)  # Rows, columns
+
+
+def synthetic_frame() -> np.ndarray:
+    """An 8-bit greyscale frame with a grating pattern, a gradient and sensor noise."""
+    rows, cols = SYNTHETIC_RESOLUTION
+    x = np.linspace(0, 60 * np.pi, cols, dtype=np.float32)
+    y = np.linspace(0, 1, rows, dtype=np.float32)[:, None]
+    pattern = 90 + 60 * np.sin(x)[None, :] * (0.5 + y) + 40 * y
+    noise = np.random.default_rng(0).normal(0, 4, (rows, cols))
+    return np.clip(pattern + noise, 0, 255).astype(np.uint8)
+
+
+def sample_frames(paths: list[Path]) -> list[tuple[str, np.ndarray]]:
+    """Loads the given images, else the latest captures in the data directory, else a synthetic frame."""
+    if not paths and DATA_DIR.is_dir():
+        captures = [path for path in DATA_DIR.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES]
+        captures.sort(key=lambda path: path.stat().st_mtime)
+        paths = captures[-SAMPLE_FRAMES:]
+    frames = []
+    for path in paths:
+        frame = load_image(path)
+        if frame is None:
+            print(f"Warning: Could not load {path}. Skipping.")
+            continue
+        frames.append((path.name, np.array(frame)))
+    if not frames:
+        print("No images found, using a synthetic frame.")
+        frames.append(("synthetic", synthetic_frame()))
+    return frames
+
+
+def encode(frame: np.ndarray, suffix: str, png_level: int) -> bytes | None:
+    """Encodes a frame in memory the way save_image() writes it to disk."""
+    if suffix == ImageCodec.NPY.value:
+        buffer = io.BytesIO()
+        np.save(buffer, np.ascontiguousarray(frame))
+        return buffer.getvalue()
+    ok, encoded = cv2.imencode(suffix, frame, encode_params(suffix, png_level))
+    return encoded.tobytes() if ok else None
+
+
+def decode(data: bytes, suffix: str) -> np.ndarray:
+    if suffix == ImageCodec.NPY.value:
+        return np.load(io.BytesIO(data), allow_pickle=False)
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED)
+
+
+def codec_variants() -> list[tuple[str, str, int]]:
+    """(label, suffix, PNG level) of every codec setting to benchmark."""
+    variants = [(f"png level {level}", ImageCodec.PNG.value, level) for level in PNG_LEVELS]
+    for codec in (ImageCodec.TIFF, ImageCodec.WEBP, ImageCodec.NPY):
+        variants.append((codec.name.lower(), codec.value, PNG_COMPRESSION_LEVEL))
+    return variants
+
+
+def benchmark(frame: np.ndarray, suffix: str, png_level: int) -> tuple[float, float, int] | None:
+    """
+    Returns the median encode and decode times (seconds) and the encoded size
+    (bytes), or None if the codec cannot store the frame losslessly.
+    """
+    encode_times = []
+    decode_times = []
+    data = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        data = encode(frame, suffix, png_level)
+        encode_times.append(time.perf_counter() - start)
+        if data is None:
+            return None
+        start = time.perf_counter()
+        decoded = decode(data, suffix)
+        decode_times.append(time.perf_counter() - start)
+        if decoded is not None and decoded.ndim == 3 and frame.ndim == 2:
+            decoded = decoded[:, :, 0]  # WebP stores greyscale frames as three equal channels
+        if decoded is None or not np.array_equal(decoded, frame):
+            return None  # Lossy or unsupported for this frame type
+    return statistics.median(encode_times), statistics.median(decode_times), len(data)
+
+
+def main():
+    """Reports encode time, decode time and size of every image codec on representative frames."""
+    frames = sample_frames([Path(arg) for arg in sys.argv[1:]])
+    configured = IMAGE_CODEC.name.lower()
+    if IMAGE_CODEC == ImageCodec.PNG:
+        configured += f" level {PNG_COMPRESSION_LEVEL}"
+    print(f"Configured codec: {configured}. Median of {REPEATS} runs per frame.\n")
+
+    for name, frame in frames:
+        print(
+            f"{name}: {frame.shape[1]}x{frame.shape[0]}, {frame.dtype}, "
+            f"{frame.nbytes / 1e6:.1f} MB raw"
+        )
+        print(f"  {'codec':<14}{'encode ms':>11}{'decode ms':>11}{'size MB':>10}{'ratio':>8}")
+        for label, suffix, png_level in codec_variants():
+            result = benchmark(frame, suffix, png_level)
+            if result is None:
+                print(f"  {label:<14}{'not lossless for this frame type':>40}")
+                continue
+            encode_time, decode_time, size = result
+            print(
+                f"  {label:<14}{encode_time * 1e3:>11.1f}{decode_time * 1e3:>11.1f}"
+                f"{size / 1e6:>10.2f}{frame.nbytes / size:>8.2f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
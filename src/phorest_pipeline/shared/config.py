@@ -5,9 +5,11 @@ from pathlib import Path
 
 from phorest_pipeline.shared.communication_methods import CommunicationMethod
 from phorest_pipeline.shared.image_sources import (
+    ImageCodec,
     ImageSourceType,
     ImageTransform,
 )
+from phorest_pipeline.shared.storage_modes import StorageMode
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
 
@@ -20,6 +22,7 @@ CSV_FILENAME = Path("communicating_results.csv")
 IMAGE_FILENAME = Path("processed_data_plot.png")
 
 STATUS_FILENAME = Path("pipeline_status.json")
+METRICS_FILENAME = Path("pipeline_metrics.prom")
 
 
 
@@ -66,6 +69,12 @@ try:
     # --- Data analysis ---
     METHOD = settings.get("Data_Analysis", {}).get("method", "gaussian")
     NUMBER_SUB_ROIS = int(settings.get("Data_Analysis", {}).get("number_of_subROIs", 1))
+    ENABLE_FRAME_REJECTION = settings.get("Data_Analysis", {}).get("enable_frame_rejection", False)
+    REJECT_MIN_BRIGHTNESS = float(settings.get("Data_Analysis", {}).get("reject_min_brightness", 5))
+    REJECT_MAX_BRIGHTNESS = float(
+        settings.get("Data_Analysis", {}).get("reject_max_brightness", 250)
+    )
+    REJECT_MIN_CONTRAST = float(settings.get("Data_Analysis", {}).get("reject_min_contrast", 5))
 
     # --- Paths ---
     REMOTE_ROOT_DIR = get_path(settings, "Paths", "remote_root_dir", "remote")
@@ -98,6 +107,7 @@ try:
     ENABLE_COMPRESSOR = settings.get("Services", {}).get("enable_image_compression", False)
     ENABLE_SYNCER = settings.get("Services", {}).get("enable_remote_sync", False)
     ENABLE_HEALTH_CHECK = settings.get("Services", {}).get("enable_service_health_check", False)
+    ENABLE_MESSAGE_BUS = settings.get("Services", {}).get("enable_message_bus", False)
 
 
     # --- Timing ---
@@ -116,6 +126,19 @@ try:
 
     # --- Buffer ---
     IMAGE_BUFFER_SIZE = settings.get("Buffer", {}).get("image_buffer_size", 300)
+    storage_mode_str = settings.get("Buffer", {}).get("storage_mode", "FILES").upper()
+    try:
+        STORAGE_MODE = StorageMode[storage_mode_str]
+    except KeyError:
+        print(f"[CONFIG] Invalid storage mode: {storage_mode_str}.")
+        print(f"Please use one of {', '.join(StorageMode.__members__.keys())}")
+        sys.exit(1)
+    RING_FILENAME = Path(settings.get("Buffer", {}).get("ring_filename", "frame_ring.bin"))
+    SYNCED_LOG_FILENAME = Path(
+        settings.get("Buffer", {}).get("synced_log_filename", "synced_images.txt")
+    )
+    IMAGE_WRITER_THREADS = settings.get("Buffer", {}).get("writer_threads", 0)
+    IMAGE_WRITER_QUEUE_SIZE = settings.get("Buffer", {}).get("writer_queue_size", 8)
 
     # --- Communication Settings ---
     communication_method_str = settings.get("Communication", {}).get("method", "CSV_PLOT")
@@ -141,6 +164,21 @@ try:
     CAMERA_GAIN = int(settings.get("Camera", {}).get("camera_gain", 32))
     CAMERA_BRIGHTNESS = int(settings.get("Camera", {}).get("camera_brightness", 128))
     CAMERA_CONTRAST = int(settings.get("Camera", {}).get("camera_contrast", 32))
+    # 'raw_capture = true' from older configs means the NPY codec
+    default_codec = "NPY" if settings.get("Camera", {}).get("raw_capture", False) else "PNG"
+    image_codec_str = settings.get("Camera", {}).get("image_codec", default_codec).upper()
+    try:
+        IMAGE_CODEC = ImageCodec[image_codec_str]
+    except KeyError:
+        print(f"[CONFIG] Invalid image codec: {image_codec_str}.")
+        print(f"Please use one of {', '.join(ImageCodec.__members__.keys())}")
+        sys.exit(1)
+    PNG_COMPRESSION_LEVEL = int(settings.get("Camera", {}).get("png_compression_level", 3))
+    CAMERA_BACKGROUND_GRAB = settings.get("Camera", {}).get("background_grab", False)
+    CAMERA_BURST_FRAMES = max(1, int(settings.get("Camera", {}).get("burst_frames", 1)))
+    HAWKEYE_STREAMING = settings.get("Camera", {}).get("hawkeye_streaming", False)
+    HAWKEYE_STREAM_COMMAND = settings.get("Camera", {}).get("hawkeye_stream_command", "")
+    HAWKEYE_STREAM_FRAMERATE = float(settings.get("Camera", {}).get("hawkeye_stream_framerate", 2.0))
 
     camera_transform_str = settings.get("Camera", {}).get("camera_transform", "NONE")
     camera_transform_str = camera_transform_str.upper()
@@ -151,8 +189,24 @@ try:
         print(f"Please use one of {', '.join(ImageTransform.__members__.keys())}")
         exit(1)
 
+    # --- Importer Settings ---
+    IMPORT_CHUNK_SIZE = max(1, int(settings.get("Importer", {}).get("chunk_size", 1000)))
+    IMPORT_RECURSIVE = settings.get("Importer", {}).get("recursive", False)
+    IMPORT_PATTERNS = settings.get("Importer", {}).get("patterns", [])
+    IMPORT_RESUME = settings.get("Importer", {}).get("resume", True)
+    IMPORT_CHECKPOINT_FILENAME = Path(
+        settings.get("Importer", {}).get("checkpoint_filename", "import_checkpoint.txt")
+    )
+
     # --- Temperature Settings ---
     THERMOCOUPLE_IDS = settings.get("Temperature", {}).get("thermocouple_sensors", {})
+    THERMOCOUPLE_DEVICE_DIR = Path(
+        settings.get("Temperature", {}).get("device_dir", "/sys/bus/w1/devices")
+    )
+    THERMOCOUPLE_BULK_CONVERSION = settings.get("Temperature", {}).get("bulk_conversion", True)
+    TEMPERATURE_SAMPLE_INTERVAL = float(
+        settings.get("Temperature", {}).get("sample_interval_seconds", 0)
+    )
 
     # --- Brightfield Settings ---
     BRIGHTFIELD_CAMERA_INDEX = int(settings.get("Brightfield", {}).get("camera_id", 1))
@@ -166,6 +220,9 @@ try:
     
     DATA_READY_FLAG = Path(FLAG_DIR, DATA_READY_FLAG)
     RESULTS_READY_FLAG = Path(FLAG_DIR, RESULTS_READY_FLAG)
+    BUS_DIR = Path(FLAG_DIR, settings.get("Flags", {}).get("bus_dir", "bus"))
+    HEARTBEAT_DIR = Path(FLAG_DIR, settings.get("Flags", {}).get("heartbeat_dir", "heartbeats"))
+    METRICS_DIR = Path(FLAG_DIR, settings.get("Flags", {}).get("metrics_dir", "metrics"))
 
     # --- Static Asset Paths ---
     ROI_GENERATION_IMAGE_PATH = Path(
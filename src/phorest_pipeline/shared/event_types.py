@@ -0,0 +1,9 @@
+# src/process_pipeline/shared/event_types.py
+from enum import Enum, auto
+
+
+class EventType(Enum):
+    ENTRY_ADDED = auto()
+    ENTRY_PROCESSED = auto()
+    IMAGE_COMPRESSED = auto()
+    IMAGE_SYNCED = auto()
@@ -0,0 +1,299 @@
+# phorest_pipeline/shared/frame_ring.py
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from phorest_pipeline.shared.config import (
+    ENABLE_SYNCER,
+    IMAGE_BUFFER_SIZE,
+    METADATA_FILENAME,
+    RING_FILENAME,
+)
+from phorest_pipeline.shared.logger_config import configure_logger
+from phorest_pipeline.shared.metadata_manager import (
+    lock_and_manage_file,
+    rename_image_files,
+)
+
+logger = configure_logger(name=__name__, rotate_daily=True, log_filename="shared.log")
+
+RING_MAGIC = b"PHRING01"
+HEADER_SIZE = 64  # Bytes reserved for the header, the index starts straight after
+
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("slot_count", "<u4"),
+        ("height", "<u4"),
+        ("width", "<u4"),
+        ("dtype", "S8"),
+        ("write_pointer", "<u4"),
+        ("sequence", "<u8"),
+    ]
+)
+
+# One record per slot. A sequence number of 0 marks the slot as free.
+INDEX_DTYPE = np.dtype(
+    [
+        ("sequence", "<u8"),
+        ("timestamp", "<f8"),
+        ("synced", "u1"),
+        ("name", "S95"),
+    ]
+)
+
+
+class FrameRing:
+    """
+    A fixed number of frame slots held in one preallocated, memory-mapped file.
+
+    The file holds a small header (frame geometry, write pointer, sequence
+    counter), an index with one record per slot (sequence, capture time, sync
+    state and image name) and the frame data itself. Writing a frame is a
+    copy into the next slot and an index update, so there is no per-image
+    file to create or delete, and readers get a zero-copy view of the slot.
+
+    The view is not locked: read() also returns the slot's sequence number,
+    and a reader checks it with is_current() once it is done with the view.
+    The writer clears the sequence number before replacing a slot and sets it
+    last, so a slot that was overwritten while being read never passes.
+
+    The file is created lazily on the first write, using the geometry of that
+    frame. If 'protect_unsynced' is set, slots holding frames that have not
+    yet been synced are skipped when looking for the next slot to overwrite.
+    If the frame geometry changes, the unsynced frames are saved as files
+    before the ring is recreated, and the manifest in the ring's directory
+    is pointed at those files.
+    """
+
+    def __init__(self, path: Path, slot_count: int, protect_unsynced: bool = False):
+        self.path = path
+        self.slot_count = slot_count
+        self.protect_unsynced = protect_unsynced
+        self._inode = None
+        self.header = None
+        self.index = None
+        self.frames = None
+
+    # --- Mapping ---
+    def _close(self):
+        self._inode = None
+        self.header = None
+        self.index = None
+        self.frames = None
+
+    def _open(self) -> bool:
+        """Maps the ring file, re-mapping it if it has been replaced since the last call."""
+        try:
+            inode = self.path.stat().st_ino
+        except FileNotFoundError:
+            self._close()
+            return False
+        if inode == self._inode:
+            return True
+
+        header = np.memmap(self.path, dtype=HEADER_DTYPE, mode="r+", shape=(1,))
+        if header["magic"][0] != RING_MAGIC:
+            logger.error(f"[RING] {self.path.name} is not a frame ring file.")
+            self._close()
+            return False
+
+        slot_count = int(header["slot_count"][0])
+        height = int(header["height"][0])
+        width = int(header["width"][0])
+        frame_dtype = np.dtype(header["dtype"][0].decode())
+
+        self.header = header
+        self.index = np.memmap(
+            self.path, dtype=INDEX_DTYPE, mode="r+", offset=HEADER_SIZE, shape=(slot_count,)
+        )
+        self.frames = np.memmap(
+            self.path,
+            dtype=frame_dtype,
+            mode="r+",
+            offset=HEADER_SIZE + slot_count * INDEX_DTYPE.itemsize,
+            shape=(slot_count, height, width),
+        )
+        self._inode = inode
+        logger.debug(
+            f"[RING] Mapped {self.path.name}: {slot_count} slots of {height}x{width} {frame_dtype}."
+        )
+        return True
+
+    def _create(self, shape: tuple, dtype: np.dtype):
+        """Creates (or replaces) the ring file. The temporary file is renamed into place."""
+        height, width = shape
+        frame_bytes = height * width * dtype.itemsize
+        total_size = HEADER_SIZE + self.slot_count * (INDEX_DTYPE.itemsize + frame_bytes)
+
+        temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with temp_path.open("wb") as f:
+            f.truncate(total_size)
+        header = np.memmap(temp_path, dtype=HEADER_DTYPE, mode="r+", shape=(1,))
+        header[0] = (RING_MAGIC, self.slot_count, height, width, dtype.str.encode(), 0, 0)
+        header.flush()
+        del header
+        temp_path.replace(self.path)
+        logger.info(
+            f"[RING] Created {self.path.name} with {self.slot_count} slots of {height}x{width} "
+            f"{dtype} ({total_size / 1e6:.1f} MB)."
+        )
+        self._close()
+        self._open()
+
+    def _find(self, name: str) -> int | None:
+        hits = np.flatnonzero((self.index["name"] == name.encode()) & (self.index["sequence"] != 0))
+        return int(hits[0]) if hits.size else None
+
+    def _next_slot(self) -> int | None:
+        start = int(self.header["write_pointer"][0])
+        if not self.protect_unsynced:
+            return start
+        order = (np.arange(self.frames.shape[0]) + start) % self.frames.shape[0]
+        available = (self.index["sequence"][order] == 0) | (self.index["synced"][order] == 1)
+        hits = np.flatnonzero(available)
+        return int(order[hits[0]]) if hits.size else None
+
+    # --- Public interface ---
+    def write(self, name: str, frame: np.ndarray) -> bool:
+        """Copies a 2D frame into the next available slot under 'name'."""
+        if frame.ndim != 2:
+            logger.error(f"[RING] Only single channel frames can be stored, got {frame.shape}.")
+            return False
+        if len(name.encode()) > INDEX_DTYPE["name"].itemsize:
+            logger.error(f"[RING] Image name too long for ring index: {name}")
+            return False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with lock_and_manage_file(self.path):
+            if not self._open():
+                self._create(frame.shape, frame.dtype)
+            elif self.frames.shape[1:] != frame.shape or self.frames.dtype != frame.dtype:
+                logger.warning(
+                    f"[RING] Frame geometry changed from {self.frames.shape[1:]} {self.frames.dtype} "
+                    f"to {frame.shape} {frame.dtype}. Recreating {self.path.name}."
+                )
+                spilled = self.spill_unsynced(
+                    self.path.parent, manifest_path=Path(self.path.parent, METADATA_FILENAME)
+                )
+                if spilled:
+                    logger.info(f"[RING] Saved {len(spilled)} unsynced frames before recreating the ring.")
+                self._create(frame.shape, frame.dtype)
+
+            slot = self._next_slot()
+            if slot is None:
+                logger.error("[RING] All slots hold unsynced frames. Cannot store new frame.")
+                return False
+
+            sequence = int(self.header["sequence"][0]) + 1
+            self.index["sequence"][slot] = 0  # Invalidate while the data is replaced
+            self.frames[slot] = frame
+            self.index[slot] = (0, time.time(), 0, name.encode())
+            self.index["sequence"][slot] = sequence  # Set last, readers check it (see is_current)
+            self.header["sequence"][0] = sequence
+            self.header["write_pointer"][0] = (slot + 1) % self.frames.shape[0]
+        logger.debug(f"[RING] Stored {name} in slot {slot} (sequence {sequence}).")
+        return True
+
+    def read(self, name: str) -> tuple[np.ndarray, int] | None:
+        """
+        Returns a read-only, zero-copy view of the frame stored under 'name'
+        and the sequence number of its slot. The slot may be overwritten while
+        the view is in use, so check is_current() once done with it.
+        """
+        if not self._open():
+            return None
+        slot = self._find(name)
+        if slot is None:
+            return None
+        sequence = int(self.index["sequence"][slot])
+        if sequence == 0 or self.index["name"][slot] != name.encode():
+            return None  # Overwritten since it was found
+        frame = np.asarray(self.frames[slot])
+        frame.flags.writeable = False
+        return frame, sequence
+
+    def is_current(self, name: str, sequence: int) -> bool:
+        """True if the frame read as 'sequence' is still stored under 'name', untouched."""
+        if not self._open():
+            return False
+        slot = self._find(name)
+        return slot is not None and int(self.index["sequence"][slot]) == sequence
+
+    def read_copy(self, name: str) -> np.ndarray | None:
+        """Returns a copy of the frame stored under 'name', or None if it was overwritten meanwhile."""
+        result = self.read(name)
+        if result is None:
+            return None
+        frame, sequence = result
+        frame = np.array(frame)
+        return frame if self.is_current(name, sequence) else None
+
+    def mark_synced(self, name: str) -> bool:
+        with lock_and_manage_file(self.path):
+            if not self._open():
+                return False
+            slot = self._find(name)
+            if slot is None:
+                return False
+            self.index["synced"][slot] = 1
+        return True
+
+    def export(self, name: str, destination: Path) -> bool:
+        """Encodes the frame stored under 'name' to an image file (format from the suffix)."""
+        result = self.read(name)
+        if result is None:
+            return False
+        frame, sequence = result
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if not cv2.imwrite(str(destination), frame):
+            return False
+        if not self.is_current(name, sequence):
+            logger.warning(f"[RING] {name} was overwritten while being exported.")
+            destination.unlink(missing_ok=True)
+            return False
+        return True
+
+    def spill_unsynced(
+        self, directory: Path, suffix: str = ".png", manifest_path: Path | None = None
+    ) -> list[Path]:
+        """
+        Exports every frame that has not been synced to individual files in
+        'directory'. If 'manifest_path' is given, its entries are renamed to
+        the exported files, so they are processed and synced from there.
+        """
+        if not self._open():
+            return []
+        spilled = {}  # Frame name -> exported file
+        for slot in np.flatnonzero((self.index["sequence"] != 0) & (self.index["synced"] == 0)):
+            name = self.index["name"][slot].decode()
+            destination = Path(directory, Path(name).stem + suffix)
+            if self.export(name, destination):
+                spilled[name] = destination
+            else:
+                logger.error(f"[RING] Failed to spill unsynced frame {name}.")
+        if spilled and manifest_path is not None:
+            rename_image_files(manifest_path, {name: path.name for name, path in spilled.items()})
+        return list(spilled.values())
+
+    def discard(self):
+        """Removes the ring file. It is recreated on the next write."""
+        with lock_and_manage_file(self.path):
+            self._close()
+            self.path.unlink(missing_ok=True)
+        logger.info(f"[RING] Discarded {self.path.name}.")
+
+
+_rings: dict[Path, FrameRing] = {}
+
+
+def get_frame_ring(directory: Path) -> FrameRing:
+    """Returns the (per-process, cached) frame ring living in 'directory'."""
+    ring_path = Path(directory, RING_FILENAME).resolve()
+    if ring_path not in _rings:
+        _rings[ring_path] = FrameRing(
+            ring_path, slot_count=max(1, IMAGE_BUFFER_SIZE), protect_unsynced=ENABLE_SYNCER
+        )
+    return _rings[ring_path]
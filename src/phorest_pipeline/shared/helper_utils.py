@@ -1,6 +1,8 @@
 import datetime
 import logging
+import os
 import shutil
+from collections import deque
 from pathlib import Path
 
 from phorest_pipeline.shared.config import (
@@ -10,11 +12,10 @@ from phorest_pipeline.shared.config import (
     ENABLE_SYNCER,
     GENERATED_FILES_DIR,
     IMAGE_BUFFER_SIZE,
-    METADATA_FILENAME,
     ROI_MANIFEST_FILENAME,
+    SYNCED_LOG_FILENAME,
 )
 from phorest_pipeline.shared.metadata_manager import (
-    load_metadata_with_lock,
     lock_and_manage_file,
     move_file_with_lock,
 )
@@ -61,76 +62,144 @@ def move_existing_files_to_backup(source_filepaths: list, logger: logging.Logger
         logger.error(f"    Total errors: {errors_count}")
 
 
-def ring_buffer_cleanup(logger: logging.Logger):
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".tif", ".tiff", ".npy")
+
+
+def record_synced_images(names: list[str], directory: Path = DATA_DIR):
+    """
+    Appends the names of images the syncer has synced to the synced log in
+    'directory', one per line, for the collector's ring buffer to read.
+    """
+    if not names:
+        return
+    with Path(directory, SYNCED_LOG_FILENAME).open("a") as f:
+        f.writelines(f"{name}\n" for name in names)
+
+
+class ImageRingBuffer:
     """
     Manages the number of images on local storage, ensuring the buffer size
     is not exceeded. If the syncer is enabled, protects unsynced
     images from being deleted.
-    """
-    logger.info("Performing ring buffer cleanup...")
-    try:
-        # 1. Get all image files on disk, sorted by modification time (oldest first)
-        image_files_on_disk = list(DATA_DIR.glob("*.png"))
-        image_files_on_disk.extend(list(DATA_DIR.glob("*.jpg")))
-        image_files_on_disk.extend(list(DATA_DIR.glob("*.jpeg")))
-        image_files_on_disk.extend(list(DATA_DIR.glob("*.webp")))
-        image_files_on_disk.extend(list(DATA_DIR.glob("*.tif")))
-        image_files_on_disk.extend(list(DATA_DIR.glob("*.tiff")))
 
-        image_files_on_disk.sort(key=lambda p: p.stat().st_mtime)
+    The directory is scanned once when the buffer is created. After that the
+    collector reports every new capture with 'add', so a cleanup only looks at
+    the images that are over the limit instead of re-listing the directory.
+    The sync status of those images comes from a set of synced names, kept up
+    to date from the message bus ('mark_synced') and from the lines the
+    syncer has appended to the synced log since it was last read.
+    """
 
-        num_images = len(image_files_on_disk)
-        logger.debug(f"Found {num_images} local images. Buffer limit: {IMAGE_BUFFER_SIZE}.")
+    def __init__(
+        self,
+        logger: logging.Logger,
+        directory: Path = DATA_DIR,
+        buffer_size: int = IMAGE_BUFFER_SIZE,
+        protect_unsynced: bool = ENABLE_SYNCER,
+    ):
+        self.logger = logger
+        self.directory = directory
+        self.buffer_size = buffer_size
+        self.protect_unsynced = protect_unsynced
+        self.synced_log_path = Path(directory, SYNCED_LOG_FILENAME)
+
+        self._names = deque()
+        self._synced_names = set()
+        self._synced_log_offset = 0  # Bytes of the synced log already read
+
+        self._scan()
+
+    def _scan(self):
+        """Seeds the buffer from the images already on disk, oldest first."""
+        images_on_disk = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and Path(entry.name).suffix in IMAGE_SUFFIXES:
+                        images_on_disk.append((entry.stat().st_mtime, entry.name))
+        except FileNotFoundError:
+            pass
+        images_on_disk.sort()
+        self._names.extend(name for _, name in images_on_disk)
+        self.logger.debug(
+            f"Found {len(self._names)} local images. Buffer limit: {self.buffer_size}."
+        )
 
-        if num_images <= IMAGE_BUFFER_SIZE:
-            logger.info("Image count is within buffer limit. No cleanup needed.")
+    def _read_synced_log(self):
+        """Adds the names appended to the synced log since it was last read."""
+        try:
+            with self.synced_log_path.open("rb") as f:
+                if f.seek(0, os.SEEK_END) < self._synced_log_offset:
+                    self._synced_log_offset = 0  # The log was replaced
+                f.seek(self._synced_log_offset)
+                new_data = f.read()
+        except FileNotFoundError:
             return
-
-        # 2. Determine which files are eligible for deletion
-        files_to_potentially_delete = image_files_on_disk[: num_images - IMAGE_BUFFER_SIZE]
-
-        final_files_to_delete = []
-
-        if ENABLE_SYNCER:
-            # --- Sync-Aware Mode ---
-            logger.info("Syncer is ENABLED. Checking sync status before deleting.")
-            manifest_data = load_metadata_with_lock(Path(DATA_DIR, METADATA_FILENAME))
-
-            # Create a lookup map for checking
-            sync_status_map = {
-                entry.get("camera_data", {}).get("filename"): entry.get("image_synced", False)
-                for entry in manifest_data
-                if entry.get("camera_data")
-            }
-
-            for file_path in files_to_potentially_delete:
-                # The file is eligible for deletion ONLY if it has been synced.
-                if sync_status_map.get(file_path.name, False):
-                    final_files_to_delete.append(file_path)
-                else:
-                    logger.warning(f"Unsynced file will not be removed: {file_path.name}")
-        else:
-            # --- Local-Only Mode ---
-            logger.info("Syncer is DISABLED. Deleting oldest files.")
-            final_files_to_delete = files_to_potentially_delete
-
-        # 4. Delete relevant files
-        if not final_files_to_delete:
-            logger.info("No files to delete after checking sync status.")
+        # A line still being written is read in full next time
+        complete = new_data.rfind(b"\n") + 1
+        self._synced_log_offset += complete
+        self._synced_names.update(new_data[:complete].decode(errors="replace").splitlines())
+
+    def _is_synced(self, name: str) -> bool:
+        if name not in self._synced_names:
+            self._read_synced_log()
+        return name in self._synced_names
+
+    def mark_synced(self, names: list[str]):
+        """Records images known to be synced (e.g. from the message bus)."""
+        self._synced_names.update(names)
+
+    def add(self, name: str):
+        """Records a newly captured image (the newest in the buffer)."""
+        self._names.append(name)
+
+    def cleanup(self):
+        """
+        Deletes the oldest images until the buffer size is met. Only the images
+        over the limit are looked at: those that have since been moved away
+        (synced or compressed) are dropped from the buffer, unsynced images are
+        kept and retried next cycle.
+        """
+        excess = len(self._names) - self.buffer_size
+        if excess <= 0:
+            self.logger.debug("Image count is within buffer limit. No cleanup needed.")
             return
 
-        logger.info(f"Buffer limit exceeded. Removing {len(final_files_to_delete)} image(s)...")
-        for file_to_delete in final_files_to_delete:
-            try:
-                logger.debug(f"Deleting: {file_to_delete.name}")
-                file_to_delete.unlink()
-            except OSError as delete_err:
-                logger.error(f"Failed to delete image {file_to_delete.name}: {delete_err}")
-
-    except Exception as buffer_err:
-        logger.error(
-            f"An unexpected error occurred during ring buffer cleanup: {buffer_err}", exc_info=True
-        )
+        self.logger.info("Performing ring buffer cleanup...")
+        retained = []
+        deleted_count = 0
+        try:
+            for _ in range(excess):
+                name = self._names.popleft()
+                file_path = Path(self.directory, name)
+                if not file_path.exists():
+                    self._synced_names.discard(name)
+                    continue
+
+                if self.protect_unsynced and not self._is_synced(name):
+                    self.logger.warning(f"Unsynced file will not be removed: {name}")
+                    retained.append(name)
+                    continue
+
+                try:
+                    self.logger.debug(f"Deleting: {name}")
+                    file_path.unlink()
+                    self._synced_names.discard(name)
+                    deleted_count += 1
+                except OSError as delete_err:
+                    self.logger.error(f"Failed to delete image {name}: {delete_err}")
+        except Exception as buffer_err:
+            self.logger.error(
+                f"An unexpected error occurred during ring buffer cleanup: {buffer_err}",
+                exc_info=True,
+            )
+        finally:
+            self._names.extendleft(reversed(retained))
+
+        if deleted_count:
+            self.logger.info(f"Buffer limit exceeded. Removed {deleted_count} image(s).")
+        else:
+            self.logger.info("No files to delete after checking sync status.")
 
 
 def snapshot_configs(logger: logging.Logger):
@@ -0,0 +1,120 @@
+# phorest_pipeline/shared/image_io.py
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from phorest_pipeline.shared.config import (
+    IMAGE_CODEC,
+    PNG_COMPRESSION_LEVEL,
+    STORAGE_MODE,
+)
+from phorest_pipeline.shared.frame_ring import get_frame_ring
+from phorest_pipeline.shared.image_sources import ImageCodec
+from phorest_pipeline.shared.storage_modes import StorageMode
+
+RAW_IMAGE_SUFFIX = ImageCodec.NPY.value
+ARCHIVE_IMAGE_SUFFIX = ImageCodec.PNG.value
+# Not a real file, the frame lives in the frame ring of that directory
+RING_IMAGE_SUFFIX = ".ring"
+
+# Suffix used by the camera controllers for newly captured frames
+if STORAGE_MODE == StorageMode.RING:
+    CAPTURE_SUFFIX = RING_IMAGE_SUFFIX
+else:
+    CAPTURE_SUFFIX = IMAGE_CODEC.value
+
+
+def encode_params(
+    suffix: str, png_compression_level: int = PNG_COMPRESSION_LEVEL
+) -> list[int]:
+    """Returns the cv2.imwrite parameters frames with this suffix are saved with."""
+    suffix = suffix.lower()
+    if suffix == ".png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, png_compression_level]
+    if suffix in (".tif", ".tiff"):
+        return [cv2.IMWRITE_TIFF_COMPRESSION, 1]  # 1 = no compression
+    if suffix == ".webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, 101]  # Above 100 = lossless
+    return []
+
+
+# Writer that store_image() queues frames on (see collector/image_writer.py), if any
+_image_writer = None
+
+
+def save_image(filepath: Path, frame: np.ndarray) -> bool:
+    """
+    Saves a frame to disk, choosing the format from the file suffix.
+    '.npy' files are written as a raw array with a small fixed header, with no
+    encoding cost, '.ring' frames are copied into the directory's frame ring
+    and all other suffixes are encoded by OpenCV, with the settings from
+    encode_params().
+    """
+    if filepath.suffix.lower() == RING_IMAGE_SUFFIX:
+        return get_frame_ring(filepath.parent).write(filepath.name, frame)
+    if filepath.suffix.lower() == RAW_IMAGE_SUFFIX:
+        temp_filepath = filepath.with_suffix(filepath.suffix + ".tmp")
+        try:
+            with temp_filepath.open("wb") as f:
+                np.save(f, np.ascontiguousarray(frame))
+            temp_filepath.replace(filepath)
+            return True
+        except OSError:
+            temp_filepath.unlink(missing_ok=True)
+            return False
+    if filepath.suffix.lower() == ImageCodec.WEBP.value and frame.dtype != np.uint8:
+        return False  # OpenCV would silently convert the frame to 8-bit
+    return cv2.imwrite(str(filepath), frame, encode_params(filepath.suffix))
+
+
+def set_image_writer(writer):
+    """Makes store_image() queue frames on 'writer', or write them directly if None."""
+    global _image_writer
+    _image_writer = writer
+
+
+def store_image(filepath: Path, frame: np.ndarray) -> bool:
+    """
+    Saves a newly captured frame. If an image writer is set, the frame is
+    queued to be written in the background and True means it was queued.
+    Frames going into the frame ring are only a copy, so they are always
+    stored straight away.
+    """
+    if _image_writer is not None and filepath.suffix.lower() != RING_IMAGE_SUFFIX:
+        return _image_writer.submit(filepath, frame)
+    return save_image(filepath, frame)
+
+
+def load_image(filepath: Path) -> np.ndarray | None:
+    """
+    Loads a frame from disk. '.npy' files are memory-mapped read-only, so no
+    decode or copy happens until the pixels are actually used, and '.ring'
+    frames are copied out of the frame ring (use FrameRing.read() directly
+    for a zero-copy view).
+    Returns None if the file cannot be read (same behaviour as cv2.imread).
+    """
+    if filepath.suffix.lower() == RING_IMAGE_SUFFIX:
+        return get_frame_ring(filepath.parent).read_copy(filepath.name)
+    if filepath.suffix.lower() == RAW_IMAGE_SUFFIX:
+        try:
+            return np.asarray(np.load(filepath, mmap_mode="r", allow_pickle=False))
+        except (OSError, ValueError):
+            return None
+    return cv2.imread(str(filepath), cv2.IMREAD_UNCHANGED)
+
+
+def convert_raw_to_png(filepath: Path) -> Path | None:
+    """
+    Converts a raw '.npy' frame into a losslessly compressed PNG alongside it
+    and removes the raw file. Returns the new path, or None on failure.
+    """
+    frame = load_image(filepath)
+    if frame is None:
+        return None
+    png_filepath = filepath.with_suffix(ARCHIVE_IMAGE_SUFFIX)
+    if not cv2.imwrite(str(png_filepath), frame, encode_params(ARCHIVE_IMAGE_SUFFIX)):
+        return None
+    del frame  # Release the memory map before removing the file
+    filepath.unlink()
+    return png_filepath
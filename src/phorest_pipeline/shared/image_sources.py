@@ -13,6 +13,15 @@ class ImageSourceType(Enum):
     FILE_IMPORTER = auto()
 
 
+class ImageCodec(Enum):
+    """Format newly captured frames are saved in. The value is the file suffix."""
+
+    PNG = ".png"
+    TIFF = ".tiff"  # Uncompressed
+    WEBP = ".webp"  # Lossless, 8-bit frames only
+    NPY = ".npy"  # Raw array, no encoding
+
+
 class ImageTransform(Enum):
     NONE = 0
     HORIZONTAL_FLIP = 1
@@ -0,0 +1,78 @@
+# phorest_pipeline/shared/latency.py
+import time
+from collections import deque
+
+from phorest_pipeline.shared import metrics
+from phorest_pipeline.shared.manifest_summary import percentile
+
+# End-to-end latency tracking.
+# Each manifest entry carries "latency_stamps", a dictionary of stage name ->
+# time.monotonic() at which the entry reached that stage (see STAGES). The
+# monotonic clock is shared by all processes on the machine, so stamps written
+# by different services can be compared directly. They cannot be compared
+# across a reboot.
+
+STAGES = (
+    "captured",  # Frame captured (collector)
+    "inserted",  # Entry added to the manifest (collector)
+    "claimed",  # Entry claimed for processing (processor)
+    "decoded",  # Image loaded (processor worker)
+    "analysed",  # Analysis complete (processor worker)
+    "result_appended",  # Result written to the results file (processor)
+    "reported",  # Included in the CSV/plot report (communicator)
+    "compressed",  # Image compressed (compressor)
+    "synced",  # Image moved to the remote directory (syncer)
+)
+
+LATENCY_WINDOW = 500  # Number of recent entries the percentiles are computed over
+
+
+def stamp() -> float:
+    """Returns the current time for a latency stamp."""
+    return time.monotonic()
+
+
+class LatencyTracker:
+    """
+    Rolling capture-to-stage latency over the last LATENCY_WINDOW entries.
+    The percentiles are exported as gauges labelled with the stage.
+    """
+
+    def __init__(self, stage: str, window: int = LATENCY_WINDOW):
+        self.stage = stage
+        self.latencies = deque(maxlen=window)
+        self._gauges = {
+            q: metrics.gauge(
+                f"phorest_latency_p{q}_seconds",
+                f"{q}th percentile of the latency from capture to a stage",
+                stage=stage,
+            )
+            for q in (50, 90, 99)
+        }
+
+    def add(self, stamps: dict | None, end: float | None):
+        """Adds the latency of one entry, from its capture (or insert) stamp to 'end'."""
+        if not stamps or end is None:
+            return
+        start = stamps.get("captured", stamps.get("inserted"))
+        if start is not None:
+            self.latencies.append(end - start)
+
+    def percentiles(self) -> dict[int, float | None]:
+        """Returns {50: p50, 90: p90, 99: p99} in seconds (None before the first entry)."""
+        ordered = sorted(self.latencies)
+        result = {q: percentile(ordered, q) for q in self._gauges}
+        for q, value in result.items():
+            if value is not None:
+                self._gauges[q].set(value)
+        return result
+
+    def summary(self) -> str:
+        """Updates the gauges and returns a one-line summary for the log."""
+        result = self.percentiles()
+        if result[50] is None:
+            return f"No capture-to-{self.stage} latency recorded yet."
+        return (
+            f"Capture-to-{self.stage} latency over the last {len(self.latencies)} entries: "
+            f"p50 {result[50]:.2f}s, p90 {result[90]:.2f}s, p99 {result[99]:.2f}s"
+        )
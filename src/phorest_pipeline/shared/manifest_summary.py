@@ -0,0 +1,230 @@
+# phorest_pipeline/shared/manifest_summary.py
+import datetime
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+from phorest_pipeline.shared.logger_config import configure_logger
+
+logger = configure_logger(name=__name__, rotate_daily=True, log_filename="shared.log")
+
+LATENCY_WINDOW = 500  # Most recent processed entries used for the latency percentiles
+RATE_WINDOW = 300  # Seconds over which the processing rate is measured
+
+# The manifest is written with json.dump(..., indent=4), so every top-level
+# entry but the last ends with this, and nested values are indented further
+ENTRY_SEPARATOR = b"\n    },"
+BACKLOG_KEYS = ("compress_backlog", "sync_backlog")  # Counted alongside the statuses
+
+
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    """Returns the q-th percentile (0-100) of an already sorted list, or None if it is empty."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _parse_time(timestamp_iso: str | None) -> datetime.datetime | None:
+    if not timestamp_iso:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(timestamp_iso)
+    except (TypeError, ValueError):
+        return None
+
+
+def _entry_record(entry: dict) -> tuple:
+    """
+    Returns what one entry contributes to the summary: (status, in compressor
+    backlog, in syncer backlog, processing time, capture-to-result latency).
+    The latency comes from the entry's latency stamps, from capture (or
+    insert) to analysis, like the processor's latency metrics.
+    """
+    status = entry.get("processing_status", "unknown")
+    filename = (entry.get("camera_data") or {}).get("filename")
+    done = status in ("processed", "rejected") and bool(filename)
+    compress_pending = (
+        done
+        and not entry.get("compression_attempted", False)
+        and not filename.endswith(".gz")
+    )
+    sync_pending = done and not entry.get("image_synced", False)
+
+    processed_at = None
+    latency_seconds = None
+    if status == "processed":
+        processed_at = _parse_time(entry.get("processing_timestamp_iso"))
+        stamps = entry.get("latency_stamps") or {}
+        start = stamps.get("captured", stamps.get("inserted"))
+        if start is not None and stamps.get("analysed") is not None:
+            latency_seconds = stamps["analysed"] - start
+    return status, compress_pending, sync_pending, processed_at, latency_seconds
+
+
+def processing_rate(processed_times: list[datetime.datetime]) -> float:
+    """Entries processed per minute over the last RATE_WINDOW seconds."""
+    since = datetime.datetime.now() - datetime.timedelta(seconds=RATE_WINDOW)
+    return sum(1 for processed_at in processed_times if processed_at >= since) * 60 / RATE_WINDOW
+
+
+def _recent_processing(records: list[tuple]) -> tuple[list[float], list[datetime.datetime]]:
+    """
+    Returns the capture-to-result latencies (seconds, sorted) and processing
+    times of the most recent LATENCY_WINDOW processed entries.
+    """
+    latencies = []
+    processed_times = []
+    for _, _, _, processed_at, latency_seconds in reversed(records):
+        if len(processed_times) >= LATENCY_WINDOW:
+            break
+        if processed_at is None:
+            continue
+        processed_times.append(processed_at)
+        if latency_seconds is not None:
+            latencies.append(latency_seconds)
+    latencies.sort()
+    return latencies, processed_times
+
+
+def _summary(counts: Counter, total_entries: int, recent_processing: tuple) -> dict:
+    """Builds the summary from the status and backlog counts and _recent_processing()."""
+    latencies, processed_times = recent_processing
+    return {
+        "total_entries": total_entries,
+        "status_counts": {
+            status: count for status, count in counts.items() if status not in BACKLOG_KEYS
+        },
+        "compress_backlog": counts["compress_backlog"],
+        "sync_backlog": counts["sync_backlog"],
+        "processed_per_minute": processing_rate(processed_times),
+        "latency_seconds": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+        },
+    }
+
+
+def _count(counts: Counter, record: tuple, sign: int = 1):
+    """Adds (or with sign -1, removes) one entry record to the status and backlog counts."""
+    status, compress_pending, sync_pending, _, _ = record
+    counts[status] += sign
+    counts["compress_backlog"] += sign * compress_pending
+    counts["sync_backlog"] += sign * sync_pending
+
+
+def summarise_manifest(manifest: list) -> dict:
+    """
+    Summarises the manifest: entries per status, compressor and syncer
+    backlogs, the processing rate and the capture-to-result latency.
+    """
+    records = [_entry_record(entry) for entry in manifest]
+    counts = Counter()
+    for record in records:
+        _count(counts, record)
+    return _summary(counts, len(records), _recent_processing(records))
+
+
+def _split_entries(data: bytes) -> list[bytes] | None:
+    """
+    Splits the text of a manifest written by the metadata manager into the
+    text of each entry, without parsing it. Returns None for any other layout.
+    """
+    data = data.strip()
+    if not data.startswith(b"[") or not data.endswith(b"]"):
+        return None
+    inner = data[1:-1].strip()
+    if not inner:
+        return []
+    chunks = inner.split(ENTRY_SEPARATOR)
+    return [chunk.strip() + b"\n    }" for chunk in chunks[:-1]] + [chunks[-1].strip()]
+
+
+class ManifestSummary:
+    """
+    Keeps a summary of the metadata manifest for dashboards. The manifest is
+    only read again when its modification time or size has changed, and at
+    most once every 'min_interval' seconds. The manifest is replaced
+    atomically on every write, so it is read without taking its lock.
+
+    The text of every entry is kept from the last read, so only entries that
+    were appended or changed since then are parsed and re-summarised. The
+    file itself is still read in full on each change.
+    """
+
+    def __init__(self, manifest_path: Path, min_interval: float = 10.0):
+        self.manifest_path = manifest_path
+        self.min_interval = min_interval
+        self._signature = None
+        self._last_read = 0.0
+        self._entry_texts = []  # Text of each entry at the last read
+        self._records = []  # _entry_record() of each entry
+        self._counts = Counter()  # Entries per status, and the backlogs
+        self._processed_times = []
+        self._summary = summarise_manifest([])
+
+    def _set_record(self, index: int, record: tuple):
+        if index < len(self._records):
+            _count(self._counts, self._records[index], -1)
+            self._records[index] = record
+        else:
+            self._records.append(record)
+        _count(self._counts, record)
+
+    def _update(self, data: bytes):
+        """Updates the entry records from the manifest text. Raises ValueError if it is not valid."""
+        entry_texts = _split_entries(data)
+        if entry_texts is None:
+            # Not the layout the metadata manager writes, parse it as a whole
+            manifest = json.loads(data)
+            entry_texts = [json.dumps(entry).encode() for entry in manifest]
+            new_records = {i: _entry_record(entry) for i, entry in enumerate(manifest)}
+        else:
+            new_records = {}
+            for i, text in enumerate(entry_texts):
+                if i >= len(self._entry_texts) or text != self._entry_texts[i]:
+                    new_records[i] = _entry_record(json.loads(text))
+
+        # Entries are never removed in place, but the manifest may have been replaced by a new run
+        if len(entry_texts) < len(self._records):
+            new_records = {i: _entry_record(json.loads(text)) for i, text in enumerate(entry_texts)}
+            self._records = []
+            self._counts = Counter()
+        for i in sorted(new_records):
+            self._set_record(i, new_records[i])
+        self._counts = +self._counts  # Drop statuses no entry has any more
+        self._entry_texts = entry_texts
+        logger.debug(f"[SUMMARY] {len(new_records)} of {len(entry_texts)} manifest entries parsed.")
+
+    def get(self) -> dict:
+        # The rate depends on the current time, so it is updated even when the manifest is not
+        self._summary["processed_per_minute"] = processing_rate(self._processed_times)
+        now = time.monotonic()
+        if now - self._last_read < self.min_interval:
+            return self._summary
+
+        try:
+            stat = self.manifest_path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+        if signature == self._signature:
+            return self._summary
+
+        try:
+            data = self.manifest_path.read_bytes() if signature is not None else b"[]"
+            self._update(data)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[SUMMARY] Could not read {self.manifest_path.name}: {e}")
+            return self._summary
+
+        recent_processing = _recent_processing(self._records)
+        self._summary = _summary(self._counts, len(self._records), recent_processing)
+        self._processed_times = recent_processing[1]
+        self._signature = signature
+        self._last_read = now
+        return self._summary
@@ -0,0 +1,118 @@
+# phorest_pipeline/shared/message_bus.py
+import json
+import select
+import socket
+import time
+from pathlib import Path
+
+from phorest_pipeline.shared.config import BUS_DIR, ENABLE_MESSAGE_BUS
+from phorest_pipeline.shared.event_types import EventType
+from phorest_pipeline.shared.logger_config import configure_logger
+
+logger = configure_logger(name=__name__, rotate_daily=True, log_filename="shared.log")
+
+# A broker-less message bus between the pipeline services.
+# Every subscriber binds a Unix datagram socket in BUS_DIR, and 'publish' sends
+# each event to every socket found there. Sends never block: if a subscriber is
+# not running, or is too far behind, the event is dropped. Events only tell a
+# service what has changed, the metadata manifest remains the source of truth,
+# so a service that misses an event still picks the change up from the manifest.
+
+SOCKET_SUFFIX = ".sock"
+MAX_MESSAGE_SIZE = 65536
+
+
+def publish(event_type: EventType, **payload) -> int:
+    """
+    Sends an event to all current subscribers. Returns the number of
+    subscribers it was delivered to. Does nothing if the bus is disabled.
+    """
+    if not ENABLE_MESSAGE_BUS:
+        return 0
+
+    message = json.dumps({"type": event_type.name, "time": time.time(), **payload}).encode()
+    if len(message) > MAX_MESSAGE_SIZE:
+        logger.warning(
+            f"[BUS] {event_type.name} event too large ({len(message)} bytes). Not published."
+        )
+        return 0
+
+    delivered = 0
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.setblocking(False)
+        for socket_path in BUS_DIR.glob(f"*{SOCKET_SUFFIX}"):
+            try:
+                sock.sendto(message, str(socket_path))
+                delivered += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                logger.debug(f"[BUS] No subscriber listening on {socket_path.name}.")
+            except BlockingIOError:
+                logger.warning(f"[BUS] Subscriber {socket_path.stem} is full. Event dropped.")
+            except OSError as e:
+                logger.warning(f"[BUS] Could not send to {socket_path.stem}: {e}")
+    logger.debug(f"[BUS] Published {event_type.name} to {delivered} subscriber(s).")
+    return delivered
+
+
+class Subscriber:
+    """Receives the events of the given types published on the bus."""
+
+    def __init__(self, name: str, event_types: set[EventType]):
+        self.name = name
+        self.event_types = event_types
+        self.socket_path = Path(BUS_DIR, f"{name}{SOCKET_SUFFIX}")
+
+        BUS_DIR.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)  # Left behind by a previous run
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+        self._sock.bind(str(self.socket_path))
+        logger.info(
+            f"[BUS] {name} subscribed to {', '.join(sorted(e.name for e in event_types))}."
+        )
+
+    def fileno(self) -> int:
+        return self._sock.fileno()
+
+    def receive(self) -> list[tuple[EventType, dict]]:
+        """Returns all queued events of the subscribed types, without blocking."""
+        events = []
+        while True:
+            try:
+                message = self._sock.recv(MAX_MESSAGE_SIZE)
+            except BlockingIOError:
+                break
+            try:
+                payload = json.loads(message)
+                event_type = EventType[payload.pop("type")]
+            except (ValueError, KeyError) as e:
+                logger.warning(f"[BUS] Ignoring malformed message: {e}")
+                continue
+            if event_type in self.event_types:
+                events.append((event_type, payload))
+        return events
+
+    def wait(self, timeout: float) -> list[tuple[EventType, dict]]:
+        """Blocks for up to 'timeout' seconds until events arrive, then returns them."""
+        deadline = time.monotonic() + timeout
+        while True:
+            events = self.receive()
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                return events
+            select.select([self._sock], [], [], remaining)
+
+    def close(self):
+        self._sock.close()
+        self.socket_path.unlink(missing_ok=True)
+
+
+def subscribe(name: str, event_types: set[EventType]) -> Subscriber | None:
+    """Returns a Subscriber, or None if the message bus is disabled."""
+    if not ENABLE_MESSAGE_BUS:
+        return None
+    try:
+        return Subscriber(name, event_types)
+    except OSError as e:
+        logger.error(f"[BUS] Could not subscribe {name}: {e}. Continuing without the bus.")
+        return None
@@ -4,17 +4,25 @@ import fcntl  # For file locking (Unix/Linux specific)
 import json
 import os
 import shutil
-import subprocess
+import time
 from contextlib import contextmanager
 from pathlib import Path
 
-from phorest_pipeline.shared.config import FLAG_DIR, STATUS_FILENAME
+from phorest_pipeline.shared import latency, metrics
+from phorest_pipeline.shared.config import FLAG_DIR, HEARTBEAT_DIR, STATUS_FILENAME
 from phorest_pipeline.shared.logger_config import configure_logger
+from phorest_pipeline.shared.process_info import ProcessTable, read_start_time
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename="shared.log")
 
 LOCK_FILE_SUFFIX = ".lock"
 
+HEARTBEAT_SUFFIX = ".heartbeat"
+HEARTBEAT_MIN_INTERVAL = 1.0  # Seconds between two heartbeat writes of the same service
+
+# Service name -> time.monotonic() of the last heartbeat written by this process
+_last_heartbeat_writes = {}
+
 
 def _acquire_lock(file_path_for_locking: Path):
     """
@@ -29,7 +37,13 @@ def _acquire_lock(file_path_for_locking: Path):
         # Using a separate lock file ensures we don't try to lock the actual data file
         # which is being replaced atomically.
         lock_file_fd = os.open(lock_path, os.O_CREAT | os.O_RDWR)
+        wait_start = time.monotonic()
         fcntl.flock(lock_file_fd, fcntl.LOCK_EX)  # Exclusive lock (blocking)
+        metrics.histogram(
+            "phorest_lock_wait_seconds",
+            "Time spent waiting for a file lock",
+            lock=lock_path.name,
+        ).observe(time.monotonic() - wait_start)
         logger.debug(f"[METADATA] [LOCK] Acquired lock for {lock_path.name}")
         return lock_file_fd
     except OSError as e:
@@ -126,22 +140,6 @@ def _save_metadata(metadata_path: Path, metadata_list: list):
         raise  # Re-raise to propagate error
 
 
-def _is_pid_active(pid: int | None, expected_name: str) -> bool:
-    """
-    Checks if a given PID is active AND is running the expected command.
-    """
-    if pid is None:
-        return False
-    try:
-        result = subprocess.run(
-            ["ps", "-p", str(pid), "-o", "command="], capture_output=True, text=True, check=False
-        )
-        # Check if the process exists and the command name is in the output
-        return result.returncode == 0 and expected_name in result.stdout
-    except Exception:
-        return False
-
-
 @contextmanager
 def lock_and_manage_file(file_path: Path):
     """
@@ -164,10 +162,12 @@ def add_entry(
     manifest_path: Path,
     camera_meta: dict | list[dict] | None,
     temps_meta: dict | None,
-):
+    latency_stamps: dict | None = None,
+) -> list[tuple[int, dict]]:
     """
     Adds one or more new entries to the processing manifest, protected by a file lock.
-    Used by Collector.
+    Used by Collector. Returns the (index, entry) of each new entry.
+    'latency_stamps' (e.g. the capture time) are copied into every new entry.
     """
 
     try:
@@ -185,7 +185,7 @@ def add_entry(
 
             if not cam_entries and temps_meta is None:
                 logger.warning("[METADATA] [ADD] add_entry called with no data. Nothing to add.")
-                return
+                return []
 
             # If processing a batch of images, one temp reading applies to all
             if len(cam_entries) > 1 and temps_meta:
@@ -196,6 +196,7 @@ def add_entry(
             if not cam_entries and temps_meta:
                 cam_entries = [None]
 
+            added_entries = []
             for cam_entry in cam_entries:
                 overall_collection_error = False
                 error_messages = []
@@ -222,17 +223,57 @@ def add_entry(
                     "processing_error_msg": None,
                     "compression_attempted": False,
                     "image_synced": False,
+                    "latency_stamps": {**(latency_stamps or {}), "inserted": latency.stamp()},
                 }
+                added_entries.append((len(metadata_list), new_manifest_entry))
                 metadata_list.append(new_manifest_entry)
 
             _save_metadata(manifest_path, metadata_list)  # Safe to save under lock
             logger.info(f"[METADATA] [ADD] Added {len(cam_entries)} new entries to manifest.")
+            return added_entries
 
     except Exception as e:
         logger.error(f"[METADATA] [ADD] Error in add_entry (manifest write): {e}")
         raise  # Re-raise to propagate error to collector
 
 
+def claim_pending_entries(
+    manifest_path: Path, entry_indices: list[int], processing_timestamp_iso: str
+) -> list[tuple[int, dict]]:
+    """
+    Marks the given entries as 'processing', but only those that are still
+    'pending', protected by a file lock. Used by Processor.
+    Returns the (index, entry) of each claimed entry.
+    """
+    try:
+        with lock_and_manage_file(manifest_path):
+            metadata_list = _load_metadata(manifest_path)  # Safe to read under lock
+
+            claimed_entries = []
+            for index in entry_indices:
+                if 0 <= index < len(metadata_list):
+                    entry = metadata_list[index]
+                    if entry.get("processing_status") == "pending":
+                        entry["processing_status"] = "processing"
+                        entry["processing_timestamp_iso"] = processing_timestamp_iso
+                        entry["latency_stamps"] = {
+                            **(entry.get("latency_stamps") or {}),
+                            "claimed": latency.stamp(),
+                        }
+                        claimed_entries.append((index, entry))
+
+            if claimed_entries:
+                _save_metadata(manifest_path, metadata_list)
+            logger.info(
+                f"[METADATA] [CLAIM] Claimed {len(claimed_entries)} of {len(entry_indices)} entries."
+            )
+            return claimed_entries
+
+    except Exception as e:
+        logger.error(f"[METADATA] [CLAIM] Error claiming manifest entries: {e}")
+        raise
+
+
 def append_metadata(manifest_path: Path, metadata_to_append: dict | list[dict]):
     """
     Safely appends one or more entries to a metadata file.
@@ -288,12 +329,14 @@ def update_metadata_manifest_entry(
     image_synced: bool | list[bool] | None = None,
     new_filename: str | list[str] | None = None,
     new_filepath: str | list[str] | None = None,
+    latency_stamps: dict | list[dict] | None = None,
 ):
     """
     Updates status and results for one or more entries in the processing manifest.
     If 'entry_index' is a list, data arguments (e.g., 'status', 'processing_error_msg')
     can also be lists of the same length to apply unique values to each entry.
     If data arguments are single values, they are applied to all specified entries.
+    'latency_stamps' are merged into the entry's existing stamps.
     """
 
     try:
@@ -343,6 +386,13 @@ def update_metadata_manifest_entry(
                     if current_filepath is not None:
                         if "camera_data" in entry and entry["camera_data"]:
                             entry["camera_data"]["filepath"] = current_filepath
+
+                    current_stamps = get_value_for_index(latency_stamps, i)
+                    if current_stamps:
+                        entry["latency_stamps"] = {
+                            **(entry.get("latency_stamps") or {}),
+                            **current_stamps,
+                        }
                 else:
                     logger.warning(
                         f"[METADATA] [UPDATE] Attempted to update non-existent manifest entry at index {index_to_update}. "
@@ -360,6 +410,30 @@ def update_metadata_manifest_entry(
         raise  # Re-raise to propagate error
 
 
+def rename_image_files(manifest_path: Path, renamed: dict[str, str]) -> list[dict]:
+    """
+    Points the entries whose image is stored under an old filename (a key of
+    'renamed') at the new filename, under the manifest lock.
+    Returns the entries that were changed.
+    """
+    try:
+        with lock_and_manage_file(manifest_path):
+            metadata_list = _load_metadata(manifest_path)  # Safe to read under lock
+            changed = []
+            for entry in metadata_list:
+                camera_data = entry.get("camera_data") or {}
+                if camera_data.get("filename") in renamed:
+                    camera_data["filename"] = renamed[camera_data["filename"]]
+                    changed.append(entry)
+            if changed:
+                _save_metadata(manifest_path, metadata_list)
+                logger.info(f"[METADATA] [RENAME] Renamed the image of {len(changed)} manifest entries.")
+            return changed
+    except Exception as e:
+        logger.error(f"[METADATA] [RENAME] Error renaming image files: {e}")
+        raise  # Re-raise to propagate error
+
+
 def load_metadata_with_lock(metadata_path: Path) -> list:
     """
     Loads metadata from a JSON file using file locking for safety.
@@ -444,25 +518,23 @@ def initialise_status_file(services: list[str]):
     try:
         with lock_and_manage_file(status_path):
             # 1. Read existing data if the file exists and is not empty
-            if status_path.exists() and status_path.stat().st_size > 0:
-                with status_path.open("r") as f:
-                    current_status = json.load(f)
-            else:
-                current_status = {}
+            current_status = _read_status_file(status_path)
 
             updated = False
 
             # 2. Validate existing entries. If a service is marked "running" but
             # the PID is not active, mark it as "stopped".
+            processes = ProcessTable()
             for service, data in current_status.items():
-                if data.get("status") == "running" and not _is_pid_active(
-                    data.get("pid"), service
+                if data.get("status") == "running" and not processes.is_active(
+                    data.get("pid"), service, data.get("pid_start_time")
                 ):
                     logger.warning(
                         f"Found stale process for '{service}' (PID: {data.get('pid')}). Marking as stopped."
                     )
                     data["status"] = "stopped"
                     data["pid"] = None
+                    data["pid_start_time"] = None
                     updated = True
 
             # 3. Check for new services and add them if they don't exist
@@ -478,8 +550,7 @@ def initialise_status_file(services: list[str]):
 
             # 4. Write back to the file only if changes were made or if it's a new file
             if updated or not status_path.exists():
-                with status_path.open("w") as f:
-                    json.dump(current_status, f, indent=4)
+                _save_metadata(status_path, current_status)
                 logger.info(f"Status file at {status_path} is initialised and up to date.")
             else:
                 logger.info(
@@ -490,19 +561,62 @@ def initialise_status_file(services: list[str]):
         logger.error(f"Failed to initialise status file: {e}", exc_info=True)
 
 
+def _read_status_file(status_path: Path) -> dict:
+    """Reads the pipeline_status.json file. The caller must hold its lock."""
+    if status_path.exists() and status_path.stat().st_size > 0:
+        with status_path.open("r") as f:
+            return json.load(f)
+    return {}
+
+
+def _heartbeat_path(service_name: str) -> Path:
+    return Path(HEARTBEAT_DIR, f"{service_name}{HEARTBEAT_SUFFIX}")
+
+
+def _write_heartbeat(service_name: str, force: bool = False):
+    """
+    Records a heartbeat by touching the service's own heartbeat file; the
+    heartbeat time is the file's mtime. This is a single utime() call, so it
+    needs no lock and a reader never sees a half-written file. Writes are
+    limited to one per HEARTBEAT_MIN_INTERVAL per service unless 'force' is set.
+    """
+    now = time.monotonic()
+    last_write = _last_heartbeat_writes.get(service_name)
+    if not force and last_write is not None and now - last_write < HEARTBEAT_MIN_INTERVAL:
+        return
+
+    heartbeat_path = _heartbeat_path(service_name)
+    try:
+        os.utime(heartbeat_path)
+    except FileNotFoundError:
+        HEARTBEAT_DIR.mkdir(parents=True, exist_ok=True)
+        heartbeat_path.touch()
+    _last_heartbeat_writes[service_name] = now
+
+
+def _merge_heartbeats(current_status: dict):
+    """Sets 'last_heartbeat' of each service to its heartbeat file's time, if that is newer."""
+    for service, data in current_status.items():
+        try:
+            mtime = _heartbeat_path(service).stat().st_mtime
+        except OSError:
+            continue
+        heartbeat = datetime.datetime.fromtimestamp(mtime).isoformat()
+        if data.get("last_heartbeat") is None or heartbeat > data["last_heartbeat"]:
+            data["last_heartbeat"] = heartbeat
+
+
 def get_pipeline_status() -> dict:
     """
-    Safely loads and returns the entire contents of the pipeline_status.json file.
+    Safely loads and returns the entire contents of the pipeline_status.json file,
+    with the latest heartbeat of each service filled in from its heartbeat file.
     """
     status_path = Path(FLAG_DIR, STATUS_FILENAME)
     try:
         with lock_and_manage_file(status_path):
-            if status_path.exists() and status_path.stat().st_size > 0:
-                with status_path.open("r") as f:
-                    return json.load(f)
-            else:
-                return {}
-        logger.info(f"[METADATA] [STATUS] Successfully retrieved status file at {status_path}")
+            current_status = _read_status_file(status_path)
+        _merge_heartbeats(current_status)
+        return current_status
     except Exception as e:
         logger.error(f"Failed to get pipeline status: {e}", exc_info=True)
         return {}
@@ -510,19 +624,13 @@ def get_pipeline_status() -> dict:
 
 def _find_pid_by_name(service_name: str) -> int | None:
     """
-    Finds the PID of a running process by its command name using pgrep.
+    Finds the PID of a running process by its command line.
     This is used to self-heal the status file if it gets deleted.
     """
-    try:
-        # Use 'pgrep -f' to search the full command line for the service name
-        result = subprocess.run(
-            ["pgrep", "-f", service_name], capture_output=True, text=True, check=False
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return int(result.stdout.strip().splitlines()[0])
-    except (FileNotFoundError, ValueError, Exception) as e:
-        logger.warning(f"Could not find PID for '{service_name}' using pgrep: {e}")
-    return None
+    pid = ProcessTable().find_pid(service_name)
+    if pid is None:
+        logger.warning(f"Could not find a running process for '{service_name}'.")
+    return pid
 
 
 def update_service_status(
@@ -531,52 +639,79 @@ def update_service_status(
     """
     Updates the status, PID, and/or heartbeat timestamp for a given service
     in the pipeline_status.json file.
+
+    A heartbeat on its own only touches the service's heartbeat file (see
+    _write_heartbeat). The status file is rewritten, under its lock, when the
+    status or PID changes and on the first heartbeat of a process, so that a
+    running service missing from the status file is registered again.
     """
+    if heartbeat and pid is None and status is None and service_name in _last_heartbeat_writes:
+        try:
+            _write_heartbeat(service_name)
+        except OSError as e:
+            logger.error(f"Failed to write heartbeat for {service_name}: {e}")
+        return
+
     status_path = Path(FLAG_DIR, STATUS_FILENAME)
     try:
-        current_status = get_pipeline_status()
-
-        if service_name not in current_status:
-            # If this is a heartbeat, it means the process is running.
-            if heartbeat:
-                found_pid = _find_pid_by_name(service_name)
-                if found_pid:
-                    logger.info(
-                        f"Re-registering running service '{service_name}' with PID {found_pid}."
-                    )
-                    current_status[service_name] = {
-                        "status": "running",
-                        "pid": found_pid,
-                        "last_heartbeat": None,
-                    }
-                else:
-                    logger.warning(
-                        f"Heartbeat received for '{service_name}', but could not find its PID."
-                    )
-                    current_status[service_name] = {
-                        "status": "unknown",
-                        "pid": None,
-                        "last_heartbeat": None,
-                    }
+        with lock_and_manage_file(status_path):
+            current_status = _read_status_file(status_path)
+            _update_status_entry(current_status, service_name, pid, status, heartbeat)
+            _save_metadata(status_path, current_status)
+        if heartbeat:
+            _write_heartbeat(service_name, force=True)
+        logger.info(f"[METADATA] [STATUS] Successfully updated status file at {status_path}")
+    except Exception as e:
+        logger.error(f"Failed to update status for {service_name}: {e}")
+
+
+def _update_status_entry(
+    current_status: dict,
+    service_name: str,
+    pid: int | None,
+    status: str | None,
+    heartbeat: bool,
+):
+    """Applies a status, PID and/or heartbeat update to the loaded status dictionary."""
+    if service_name not in current_status:
+        # If this is a heartbeat, it means the process is running.
+        if heartbeat:
+            found_pid = _find_pid_by_name(service_name)
+            if found_pid:
+                logger.info(
+                    f"Re-registering running service '{service_name}' with PID {found_pid}."
+                )
+                current_status[service_name] = {
+                    "status": "running",
+                    "pid": found_pid,
+                    "pid_start_time": read_start_time(found_pid),
+                    "last_heartbeat": None,
+                }
             else:
+                logger.warning(
+                    f"Heartbeat received for '{service_name}', but could not find its PID."
+                )
                 current_status[service_name] = {
-                    "status": "stopped",
+                    "status": "unknown",
                     "pid": None,
                     "last_heartbeat": None,
                 }
-
-        # Update the fields that were provided
-        if pid is not None:
-            current_status[service_name]["pid"] = pid
-        if status is not None:
-            current_status[service_name]["status"] = status
-            if status == "stopped":
-                current_status[service_name]["pid"] = None
-        if heartbeat:
-            current_status[service_name]["last_heartbeat"] = datetime.datetime.now().isoformat()
-
-        with status_path.open("w") as f:
-            json.dump(current_status, f, indent=4)
-        logger.info(f"[METADATA] [STATUS] Successfully updated status file at {status_path}")
-    except Exception as e:
-        logger.error(f"Failed to update status for {service_name}: {e}")
+        else:
+            current_status[service_name] = {
+                "status": "stopped",
+                "pid": None,
+                "last_heartbeat": None,
+            }
+
+    # Update the fields that were provided
+    if pid is not None:
+        current_status[service_name]["pid"] = pid
+        # Stored with the PID so a later check is not fooled by the PID being reused
+        current_status[service_name]["pid_start_time"] = read_start_time(pid)
+    if status is not None:
+        current_status[service_name]["status"] = status
+        if status == "stopped":
+            current_status[service_name]["pid"] = None
+            current_status[service_name]["pid_start_time"] = None
+    if heartbeat:
+        current_status[service_name]["last_heartbeat"] = datetime.datetime.now().isoformat()
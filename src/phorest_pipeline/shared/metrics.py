@@ -0,0 +1,250 @@
+# phorest_pipeline/shared/metrics.py
+import math
+import time
+from pathlib import Path
+
+from phorest_pipeline.shared.config import METRICS_DIR
+from phorest_pipeline.shared.logger_config import configure_logger
+
+logger = configure_logger(name=__name__, rotate_daily=True, log_filename="shared.log")
+
+# Performance metrics in the Prometheus text format.
+# Each service keeps its counters, gauges and histograms in memory, and the
+# Service base class writes them to METRICS_DIR/<service>.prom after its steps
+# (at most every METRICS_WRITE_INTERVAL seconds). The health checker merges
+# these files into one, which node_exporter's textfile collector (or anything
+# else that reads the format) can pick up. Every sample is labelled with the
+# service it came from.
+
+METRICS_SUFFIX = ".prom"
+METRICS_WRITE_INTERVAL = 5.0  # Seconds between two writes of a service's metrics file
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# (name, labels) -> metric, and name -> (type, help) for every metric family
+_registry = {}
+_families = {}
+_last_write = 0.0
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Counter:
+    """A value that only goes up, e.g. the number of images processed."""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def reset(self):
+        self.value = 0.0
+
+    def samples(self, extra_labels: dict) -> list[str]:
+        labels = _format_labels({**extra_labels, **self.labels})
+        return [f"{self.name}{labels} {_format_value(self.value)}"]
+
+
+class Gauge(Counter):
+    """A value that can go up and down, e.g. the number of pending entries."""
+
+    TYPE = "gauge"
+
+    def set(self, value: float):
+        self.value = value
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+
+class Histogram:
+    """Counts observations (e.g. durations) in cumulative buckets."""
+
+    TYPE = "histogram"
+
+    def __init__(self, name: str, labels: dict, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.reset()
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def reset(self):
+        self.bucket_counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def samples(self, extra_labels: dict) -> list[str]:
+        labels = {**extra_labels, **self.labels}
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            cumulative += bucket_count
+            bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {self.count}")
+        return lines
+
+
+def _get_or_create(metric_class, name: str, help_text: str, labels: dict, **kwargs):
+    known = _families.get(name)
+    if known is not None and known[0] != metric_class.TYPE:
+        raise ValueError(f"Metric {name} is already registered as a {known[0]}.")
+    key = (name, tuple(sorted(labels.items())))
+    if key not in _registry:
+        _registry[key] = metric_class(name, labels, **kwargs)
+        _families.setdefault(name, (metric_class.TYPE, help_text))
+    return _registry[key]
+
+
+def counter(name: str, help_text: str, **labels) -> Counter:
+    """Returns the counter with this name and labels, creating it on first use."""
+    return _get_or_create(Counter, name, help_text, labels)
+
+
+def gauge(name: str, help_text: str, **labels) -> Gauge:
+    """Returns the gauge with this name and labels, creating it on first use."""
+    return _get_or_create(Gauge, name, help_text, labels)
+
+
+def histogram(
+    name: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS, **labels
+) -> Histogram:
+    """Returns the histogram with this name and labels, creating it on first use."""
+    return _get_or_create(Histogram, name, help_text, labels, buckets=buckets)
+
+
+def reset():
+    """Zeroes all metrics, e.g. in a child process that inherited its parent's values."""
+    for metric in _registry.values():
+        metric.reset()
+
+
+def render(service_name: str) -> str:
+    """Returns all metrics of this process in the Prometheus text format."""
+    by_family = {}
+    for (name, _), metric in _registry.items():
+        by_family.setdefault(name, []).append(metric)
+
+    lines = []
+    for name, metrics in by_family.items():
+        metric_type, help_text = _families[name]
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for metric in metrics:
+            lines.extend(metric.samples({"service": service_name}))
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(service_name: str, force: bool = False):
+    """
+    Writes this process's metrics to METRICS_DIR/<service_name>.prom, at most
+    once every METRICS_WRITE_INTERVAL seconds unless 'force' is set. The file
+    is replaced atomically, so readers never see a partial file.
+    """
+    global _last_write
+    now = time.monotonic()
+    if not force and now - _last_write < METRICS_WRITE_INTERVAL:
+        return
+    _last_write = now
+
+    metrics_path = Path(METRICS_DIR, f"{service_name}{METRICS_SUFFIX}")
+    temp_path = metrics_path.with_suffix(METRICS_SUFFIX + ".tmp")
+    try:
+        METRICS_DIR.mkdir(parents=True, exist_ok=True)
+        temp_path.write_text(render(service_name))
+        temp_path.replace(metrics_path)
+    except OSError as e:
+        logger.error(f"[METRICS] Could not write metrics for {service_name}: {e}")
+
+
+def aggregate_metrics(output_path: Path) -> int:
+    """
+    Merges the metrics files of all services into 'output_path', with one HELP
+    and TYPE line per metric family. Returns the number of files merged.
+    """
+    families = {}  # name -> [help line, type line, samples]
+    file_count = 0
+    for metrics_path in sorted(METRICS_DIR.glob(f"*{METRICS_SUFFIX}")):
+        try:
+            content = metrics_path.read_text()
+        except OSError as e:
+            logger.warning(f"[METRICS] Could not read {metrics_path.name}: {e}")
+            continue
+        file_count += 1
+
+        # Samples always follow the HELP and TYPE lines of their family
+        family = None
+        for line in content.splitlines():
+            if line.startswith(("# HELP ", "# TYPE ")):
+                name = line.split(" ", 3)[2]
+                family = families.setdefault(name, [None, None, []])
+                slot = 0 if line.startswith("# HELP ") else 1
+                family[slot] = family[slot] or line
+            elif line and family is not None:
+                family[2].append(line)
+
+    lines = []
+    for help_line, type_line, samples in families.values():
+        lines.extend(line for line in (help_line, type_line) if line)
+        lines.extend(samples)
+
+    temp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    try:
+        temp_path.write_text("\n".join(lines) + "\n")
+        temp_path.replace(output_path)
+    except OSError as e:
+        logger.error(f"[METRICS] Could not write aggregated metrics to {output_path}: {e}")
+    return file_count
+
+
+def read_metric_totals(service_name: str) -> dict[str, float]:
+    """
+    Reads a service's metrics file and returns the value of every sample name
+    (e.g. 'phorest_image_processing_seconds_sum'), summed over its labels.
+    Returns an empty dictionary if the service has not written any metrics.
+    """
+    metrics_path = Path(METRICS_DIR, f"{service_name}{METRICS_SUFFIX}")
+    totals = {}
+    try:
+        content = metrics_path.read_text()
+    except OSError:
+        return totals
+    for line in content.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        sample, _, value = line.rpartition(" ")
+        name = sample.split("{", 1)[0]
+        try:
+            totals[name] = totals.get(name, 0.0) + float(value)
+        except ValueError:
+            continue
+    return totals
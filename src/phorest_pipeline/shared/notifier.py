@@ -0,0 +1,110 @@
+# phorest_pipeline/shared/notifier.py
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+from pathlib import Path
+
+from phorest_pipeline.shared.logger_config import configure_logger
+
+logger = configure_logger(name=__name__, rotate_daily=True, log_filename="shared.log")
+
+# Values from <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+# Creating a flag, touching an existing one or renaming a file onto it
+FLAG_EVENTS = IN_CREATE | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO
+
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    except OSError:
+        return None
+    if not (hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch")):
+        return None
+    return libc
+
+
+class FlagNotifier:
+    """
+    Waits for a flag file to appear.
+
+    On Linux the directory holding the flag is watched with inotify, so a
+    waiting service wakes up as soon as the flag is created (or touched)
+    instead of on its next poll. Where inotify is not available the flag is
+    polled every 'poll_interval' seconds, which is the old behaviour.
+    """
+
+    def __init__(self, flag_path: Path, poll_interval: float = 1.0):
+        self.flag_path = flag_path
+        self.poll_interval = poll_interval
+        self._fd = None
+
+        libc = _load_libc()
+        if libc is None:
+            logger.warning("[NOTIFIER] inotify not available. Falling back to polling.")
+            return
+
+        flag_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            logger.warning(
+                f"[NOTIFIER] inotify_init1 failed ({os.strerror(ctypes.get_errno())}). "
+                "Falling back to polling."
+            )
+            return
+        if libc.inotify_add_watch(fd, str(flag_path.parent).encode(), FLAG_EVENTS) < 0:
+            logger.warning(
+                f"[NOTIFIER] Could not watch {flag_path.parent} "
+                f"({os.strerror(ctypes.get_errno())}). Falling back to polling."
+            )
+            os.close(fd)
+            return
+        self._fd = fd
+        logger.debug(f"[NOTIFIER] Watching {flag_path.parent} for {flag_path.name}.")
+
+    def fileno(self) -> int | None:
+        """The inotify descriptor (readable when the directory changes), or None when polling."""
+        return self._fd
+
+    def drain(self):
+        """Discards pending inotify events (the flag itself is checked separately)."""
+        if self._fd is None:
+            return
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Blocks until the flag exists or 'timeout' seconds have passed.
+        Returns True if the flag exists. The flag is not consumed.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.flag_path.exists():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if self._fd is None:
+                time.sleep(min(self.poll_interval, remaining))
+                continue
+            # Any change in the flag directory wakes us up; the flag itself is re-checked above
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if readable:
+                self.drain()
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
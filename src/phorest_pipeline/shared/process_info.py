@@ -0,0 +1,88 @@
+# phorest_pipeline/shared/process_info.py
+import os
+from pathlib import Path
+
+# Process inspection through /proc, used instead of spawning 'ps' and 'pgrep'.
+# A ProcessTable caches what it has read, so one refresh of the TUI or one
+# health check reads each process at most once. Create a new table for every
+# refresh, a table never notices processes that start or stop after a read.
+
+PROC_DIR = Path("/proc")
+
+# Services hosted by the supervisor run under the supervisor's command line
+SUPERVISOR_SCRIPT_NAME = "phorest-supervisor"
+
+
+def read_cmdline(pid: int) -> str | None:
+    """Returns the command line of a process (arguments joined by spaces), or None if it is gone."""
+    try:
+        raw = Path(PROC_DIR, str(pid), "cmdline").read_bytes()
+    except OSError:
+        return None
+    return raw.rstrip(b"\0").replace(b"\0", b" ").decode(errors="replace")
+
+
+def read_start_time(pid: int) -> int | None:
+    """
+    Returns the start time of a process in clock ticks since boot, or None if it
+    is gone. Together with the PID it identifies a process, as PIDs are reused.
+    """
+    try:
+        stat = Path(PROC_DIR, str(pid), "stat").read_text()
+    except OSError:
+        return None
+    # The command name (field 2) is in parentheses and may itself contain spaces or
+    # parentheses, so the remaining fields are counted from the last ')'.
+    try:
+        return int(stat.rpartition(")")[2].split()[19])
+    except (IndexError, ValueError):
+        return None
+
+
+class ProcessTable:
+    """A cached view of the running processes, for one refresh."""
+
+    def __init__(self):
+        self._cmdlines = {}
+        self._start_times = {}
+
+    def cmdline(self, pid: int) -> str | None:
+        if pid not in self._cmdlines:
+            self._cmdlines[pid] = read_cmdline(pid)
+        return self._cmdlines[pid]
+
+    def start_time(self, pid: int) -> int | None:
+        if pid not in self._start_times:
+            self._start_times[pid] = read_start_time(pid)
+        return self._start_times[pid]
+
+    def is_active(
+        self, pid: int | None, expected_name: str, start_time: int | None = None
+    ) -> bool:
+        """
+        Checks if a given PID is active AND is running the expected command.
+        If 'start_time' is given, the process must also have started at that
+        time, so a new process that was given a reused PID does not count.
+        """
+        if pid is None:
+            return False
+        cmdline = self.cmdline(pid)
+        if not cmdline or (expected_name not in cmdline and SUPERVISOR_SCRIPT_NAME not in cmdline):
+            return False
+        return start_time is None or self.start_time(pid) == start_time
+
+    def find_pid(self, name: str) -> int | None:
+        """Finds the lowest PID whose command line contains 'name' (like 'pgrep -f')."""
+        own_pid = os.getpid()
+        try:
+            pids = sorted(int(entry.name) for entry in os.scandir(PROC_DIR) if entry.name.isdigit())
+        except OSError:
+            return None
+        for pid in pids:
+            if pid == own_pid:
+                continue
+            cmdline = self.cmdline(pid)
+            if cmdline and name in cmdline:
+                return pid
+        return None
+
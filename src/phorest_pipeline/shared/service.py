@@ -0,0 +1,172 @@
+# phorest_pipeline/shared/service.py
+import abc
+import asyncio
+import logging
+import signal
+import sys
+import time
+from enum import Enum
+
+from phorest_pipeline.shared import metrics
+from phorest_pipeline.shared.metadata_manager import update_service_status
+
+
+class Service(abc.ABC):
+    """
+    Base class for the long-running pipeline services.
+
+    A service is a state machine whose 'perform' coroutine runs one step per
+    call, driven by an asyncio loop. Waiting is done with 'wait' (or 'sleep'),
+    which returns as soon as the timeout expires, one of the given triggers
+    (anything with a 'fileno()', e.g. a FlagNotifier or bus Subscriber) becomes
+    readable, or a shutdown is requested. Idle services therefore use no CPU,
+    and SIGINT/SIGTERM end a wait immediately instead of on the next poll.
+    The work done inside a step is still allowed to block, a shutdown request
+    only takes effect between steps, so the current cycle is always finished.
+
+    The time spent in each state is accumulated in 'state_timings', and is
+    exported with the duration of each step through the metrics module.
+    """
+
+    SCRIPT_NAME = None  # Name used in the status file, e.g. "phorest-collector"
+    DISPLAY_NAME = None  # Name used in the start/stop banners, e.g. "Collector"
+    FATAL_STATE = None  # State that ends the service with a non-zero exit code
+
+    def __init__(self, logger: logging.Logger, initial_state: Enum):
+        self.logger = logger
+        self.shutdown_requested = False
+        self.state_timings = {}
+        self._state = None
+        self._state_entered = 0.0
+        self._wake = None
+        self.current_state = initial_state
+
+    # --- State tracking ---
+    @property
+    def current_state(self) -> Enum:
+        return self._state
+
+    @current_state.setter
+    def current_state(self, state: Enum):
+        now = time.monotonic()
+        if self._state is not None:
+            elapsed = now - self._state_entered
+            self.state_timings[self._state.name] = (
+                self.state_timings.get(self._state.name, 0.0) + elapsed
+            )
+            metrics.counter(
+                "phorest_state_seconds_total", "Time spent in each state", state=self._state.name
+            ).inc(elapsed)
+        self._state = state
+        self._state_entered = now
+
+    # --- Hooks for subclasses ---
+    def on_start(self) -> bool:
+        """Start-up work, run before the first step. Return False to exit straight away."""
+        return True
+
+    def on_stop(self):
+        """Clean-up work, always run when the service stops."""
+
+    @abc.abstractmethod
+    async def perform(self):
+        """Runs one step of the state machine."""
+
+    # --- Waiting ---
+    def _graceful_shutdown(self):
+        """Signal handler to initiate a graceful shutdown"""
+        if not self.shutdown_requested:
+            self.logger.info("Shutdown signal received. Finishing current cycle before stopping...")
+            self.shutdown_requested = True
+        self._wake.set()
+
+    async def wait(self, timeout: float, *triggers) -> bool:
+        """
+        Waits for up to 'timeout' seconds. Returns True if one of the triggers
+        became readable, False on timeout or shutdown. Triggers that are None,
+        or have no file descriptor, are ignored (the caller polls instead).
+        """
+        if self.shutdown_requested or timeout <= 0:
+            return False
+
+        loop = asyncio.get_running_loop()
+        self._wake.clear()
+        watched = []
+        for trigger in triggers:
+            fd = trigger.fileno() if trigger is not None else None
+            if fd is not None:
+                loop.add_reader(fd, self._wake.set)
+                watched.append(fd)
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except TimeoutError:
+            return False
+        finally:
+            for fd in watched:
+                loop.remove_reader(fd)
+
+        if self.shutdown_requested:
+            return False
+        for trigger in triggers:
+            drain = getattr(trigger, "drain", None)
+            if drain is not None:
+                drain()
+        return True
+
+    async def sleep(self, seconds: float):
+        """Sleeps for 'seconds', ending early if a shutdown is requested."""
+        await self.wait(seconds)
+
+    # --- Main loop ---
+    async def _main(self):
+        loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        loop.add_signal_handler(signal.SIGINT, self._graceful_shutdown)
+        loop.add_signal_handler(signal.SIGTERM, self._graceful_shutdown)
+
+        while not self.shutdown_requested:
+            state = self.current_state
+            step_start = time.monotonic()
+            await self.perform()
+            metrics.histogram(
+                "phorest_step_duration_seconds",
+                "Duration of one state machine step, by the state it started in",
+                state=state.name,
+            ).observe(time.monotonic() - step_start)
+
+            # After a cycle is complete, send a heartbeat and publish the metrics.
+            update_service_status(self.SCRIPT_NAME, heartbeat=True)
+            metrics.write_metrics(self.SCRIPT_NAME)
+
+            # --- Check for FATAL_ERROR state to exit ---
+            if self.current_state == self.FATAL_STATE:
+                self.logger.error("Exiting due to FATAL_ERROR state.")
+                break
+
+            await asyncio.sleep(0)  # Let pending signal handlers run between steps
+
+    def run(self):
+        """Main loop for the service process."""
+        self.logger.info(f"--- Starting {self.DISPLAY_NAME} ---")
+        print(f"--- Starting {self.DISPLAY_NAME} ---")
+
+        try:
+            if self.on_start():
+                asyncio.run(self._main())
+        except Exception as e:
+            self.logger.critical(f"UNEXPECTED ERROR in main loop: {e}", exc_info=True)
+            self.current_state = self.FATAL_STATE
+        finally:
+            self.on_stop()
+            self.current_state = self.current_state  # Close the timing of the last state
+            metrics.write_metrics(self.SCRIPT_NAME, force=True)
+            timings = ", ".join(
+                f"{state}: {seconds:.1f}s" for state, seconds in self.state_timings.items()
+            )
+            self.logger.info(f"Time spent per state: {timings}")
+            self.logger.info(f"--- {self.DISPLAY_NAME} Stopped ---")
+            print(f"--- {self.DISPLAY_NAME} Stopped ---")
+
+        if self.current_state == self.FATAL_STATE and not self.shutdown_requested:
+            sys.exit(1)
+        sys.exit(0)
@@ -6,6 +6,7 @@ class CollectorState(Enum):
     IDLE = auto()
     WAITING_TO_RUN = auto()
     COLLECTING = auto()
+    IMPORTING = auto()
     FATAL_ERROR = auto()
 
 
@@ -0,0 +1,7 @@
+# src/process_pipeline/shared/storage_modes.py
+from enum import Enum, auto
+
+
+class StorageMode(Enum):
+    FILES = auto()
+    RING = auto()
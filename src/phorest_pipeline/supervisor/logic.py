@@ -0,0 +1,199 @@
+# phorest_pipeline/supervisor/logic.py
+import importlib
+import multiprocessing
+import signal
+import sys
+import time
+
+from phorest_pipeline.shared import metrics
+from phorest_pipeline.shared.config import (
+    ENABLE_BACKUP,
+    ENABLE_CAMERA,
+    ENABLE_COMPRESSOR,
+    ENABLE_HEALTH_CHECK,
+    ENABLE_SYNCER,
+    ENABLE_THERMOCOUPLE,
+    settings,
+)
+from phorest_pipeline.shared.logger_config import configure_logger
+from phorest_pipeline.shared.metadata_manager import update_service_status
+from phorest_pipeline.shared.process_info import SUPERVISOR_SCRIPT_NAME
+
+logger = configure_logger(name=__name__, rotate_daily=True, log_filename="supervisor.log")
+
+SCRIPT_NAME = SUPERVISOR_SCRIPT_NAME
+
+POLL_INTERVAL = 1
+RESTART_BACKOFF_INITIAL = 1  # Seconds before the first restart of a crashed service
+RESTART_BACKOFF_MAX = 60
+STABLE_RUNTIME = 60  # A service running this long has its restart backoff reset
+STOP_TIMEOUT = 30  # Seconds a service gets to finish its cycle before it is killed
+
+# Service name -> (module, entry point, enabled)
+SERVICES = {
+    "phorest-collector": (
+        "phorest_pipeline.collector.logic",
+        "run_collector",
+        ENABLE_CAMERA or ENABLE_THERMOCOUPLE,
+    ),
+    "phorest-processor": ("phorest_pipeline.processor.logic", "run_processor", True),
+    "phorest-communicator": ("phorest_pipeline.communicator.logic", "run_communicator", True),
+    "phorest-compressor": (
+        "phorest_pipeline.compressor.logic",
+        "run_compressor",
+        ENABLE_COMPRESSOR,
+    ),
+    "phorest-backup": ("phorest_pipeline.file_backup.logic", "run_file_backup", ENABLE_BACKUP),
+    "phorest-syncer": ("phorest_pipeline.syncer.logic", "run_syncer", ENABLE_SYNCER),
+    "phorest-health-check": (
+        "phorest_pipeline.health_check.logic",
+        "run_health_check",
+        ENABLE_HEALTH_CHECK,
+    ),
+}
+
+
+def _run_service(module_name: str, function_name: str):
+    """
+    Entry point of a child process. The service module is only imported here,
+    so each child carries just its own service on top of the shared config.
+    """
+    metrics.reset()  # Start from zero rather than from the supervisor's own values
+    getattr(importlib.import_module(module_name), function_name)()
+
+
+class SupervisedService:
+    """Book-keeping for one service hosted by the supervisor."""
+
+    def __init__(self, name: str, module_name: str, function_name: str):
+        self.name = name
+        self.module_name = module_name
+        self.function_name = function_name
+        self.process = None
+        self.started_at = 0
+        self.restart_at = 0
+        self.backoff = RESTART_BACKOFF_INITIAL
+        self.restarts = 0
+        self.finished = False
+
+
+class Supervisor:
+    """Starts the enabled services as child processes and restarts them if they crash."""
+
+    def __init__(self, service_names: list[str]):
+        self.shutdown_requested = False
+        # Children are forked, so the already imported config is shared with the supervisor
+        self.context = multiprocessing.get_context("fork")
+        self.services = [
+            SupervisedService(name, *SERVICES[name][:2]) for name in service_names
+        ]
+
+        # Register the signal handler
+        signal.signal(signal.SIGINT, self._graceful_shutdown)
+        signal.signal(signal.SIGTERM, self._graceful_shutdown)
+
+    def _graceful_shutdown(self, _signum, _frame):
+        """Signal handler to initiate a graceful shutdown"""
+        if not self.shutdown_requested:
+            logger.info("Shutdown signal received. Stopping all services...")
+            self.shutdown_requested = True
+
+    def _start(self, service: SupervisedService):
+        process = self.context.Process(
+            target=_run_service,
+            args=(service.module_name, service.function_name),
+            name=service.name,
+        )
+        process.start()
+        service.process = process
+        service.started_at = time.monotonic()
+        logger.info(f"Started {service.name} (PID: {process.pid}).")
+        update_service_status(service.name, pid=process.pid, status="running")
+
+    def _check_services(self):
+        """Starts services that are due to (re)start and reaps any that have exited."""
+        now = time.monotonic()
+        for service in self.services:
+            if service.finished:
+                continue
+
+            if service.process is None:
+                if now >= service.restart_at:
+                    self._start(service)
+                continue
+
+            if service.process.is_alive():
+                if now - service.started_at > STABLE_RUNTIME:
+                    service.backoff = RESTART_BACKOFF_INITIAL
+                continue
+
+            service.process.join()
+            exitcode = service.process.exitcode
+            service.process = None
+
+            if exitcode == 0:
+                # A clean exit is deliberate (e.g. the file importer has finished)
+                logger.info(f"{service.name} finished. It will not be restarted.")
+                service.finished = True
+                update_service_status(service.name, status="stopped")
+                continue
+
+            service.restarts += 1
+            service.restart_at = now + service.backoff
+            logger.error(
+                f"{service.name} exited with code {exitcode}. Restarting in {service.backoff}s "
+                f"(restart {service.restarts})."
+            )
+            update_service_status(service.name, status="restarting")
+            service.backoff = min(service.backoff * 2, RESTART_BACKOFF_MAX)
+
+    def _stop_services(self):
+        """Asks all services to stop, and kills any that do not within STOP_TIMEOUT."""
+        running = [s for s in self.services if s.process is not None and s.process.is_alive()]
+        for service in running:
+            logger.info(f"Stopping {service.name} (PID: {service.process.pid})...")
+            service.process.terminate()  # SIGTERM, handled as a graceful shutdown
+
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for service in running:
+            service.process.join(max(0, deadline - time.monotonic()))
+            if service.process.is_alive():
+                logger.warning(f"{service.name} did not stop in time. Killing it.")
+                service.process.kill()
+                service.process.join()
+
+        for service in self.services:
+            if not service.finished:
+                update_service_status(service.name, status="stopped")
+
+    def run(self):
+        """Main loop for the supervisor process."""
+        logger.info("--- Starting Supervisor ---")
+        print("--- Starting Supervisor ---")
+        logger.info(f"Supervising: {', '.join(s.name for s in self.services)}")
+
+        try:
+            while not self.shutdown_requested:
+                self._check_services()
+
+                # After a cycle is complete, send a heartbeat.
+                update_service_status(SCRIPT_NAME, heartbeat=True)
+
+                time.sleep(POLL_INTERVAL)
+        except Exception as e:
+            logger.critical(f"UNEXPECTED ERROR in main loop: {e}", exc_info=True)
+        finally:
+            self._stop_services()
+            logger.info("--- Supervisor Stopped ---")
+            print("--- Supervisor Stopped ---")
+
+
+def run_supervisor():
+    """Main entry point to create and run a Supervisor instance"""
+    if settings is None:
+        logger.error("Configuration error. Halting.")
+        sys.exit(1)
+
+    service_names = [name for name, (_, _, enabled) in SERVICES.items() if enabled]
+    supervisor = Supervisor(service_names)
+    supervisor.run()
@@ -1,9 +1,9 @@
 # phorest_pipeline/syncer/logic.py
 import shutil
-import signal
 import time
 from pathlib import Path
 
+from phorest_pipeline.shared import latency, metrics
 from phorest_pipeline.shared.config import (
     BACKUP_DIR,
     DATA_DIR,
@@ -14,13 +14,18 @@ from phorest_pipeline.shared.config import (
     SYNC_INTERVAL,
     settings,
 )
+from phorest_pipeline.shared.event_types import EventType
+from phorest_pipeline.shared.frame_ring import get_frame_ring
+from phorest_pipeline.shared.helper_utils import record_synced_images
+from phorest_pipeline.shared.image_io import ARCHIVE_IMAGE_SUFFIX, RING_IMAGE_SUFFIX
 from phorest_pipeline.shared.logger_config import configure_logger
+from phorest_pipeline.shared.message_bus import publish
 from phorest_pipeline.shared.metadata_manager import (
     load_metadata_with_lock,
     lock_and_manage_file,
     update_metadata_manifest_entry,
-    update_service_status,
 )
+from phorest_pipeline.shared.service import Service
 from phorest_pipeline.shared.states import SyncerState
 
 logger = configure_logger(name=__name__, rotate_daily=True, log_filename="syncer.log")
@@ -33,6 +38,19 @@ REMOTE_BACKUP_DIR = Path(REMOTE_ROOT_DIR, BACKUP_DIR.name)
 
 SCRIPT_NAME = "phorest-syncer"
 
+SYNC_EVENT_BATCH_SIZE = 500
+
+IMAGES_SYNCED = metrics.counter(
+    "phorest_images_synced_total", "Images moved to the remote directory"
+)
+SYNC_BYTES = metrics.counter(
+    "phorest_sync_bytes_total", "Image bytes written to the remote directory"
+)
+SYNC_FAILURES = metrics.counter("phorest_sync_failures_total", "Images that could not be synced")
+SYNC_THROUGHPUT = metrics.gauge(
+    "phorest_sync_bytes_per_second", "Image throughput to the remote directory in the last sync"
+)
+
 
 def sync_archived_backups():
     """
@@ -89,78 +107,119 @@ def sync_results_and_manifest():
 
 def sync_processed_images():
     """
-    Finds all processed images in the local storage directory and moves them to the remote directory.
+    Finds all processed (or rejected) images in the local storage directory and moves them to the
+    remote directory.
     """
     logger.info("Syncing processed images to remote directory...")
 
     # 1. Find images to move
     manifest_data = load_metadata_with_lock(Path(DATA_DIR, METADATA_FILENAME))
     images_to_move = []
-    indices_to_update = []
+    frames_to_export = []
+    synced_filenames = []
     for index, entry in enumerate(manifest_data):
         if (
-            entry.get("processing_status") == "processed"
+            entry.get("processing_status") in ("processed", "rejected")
             and not entry.get("image_synced", False)
             and entry.get("camera_data", {}).get("filename")
         ):
-            filepath = Path(DATA_DIR, entry["camera_data"]["filename"])
+            filename = entry["camera_data"]["filename"]
+            if Path(filename).suffix == RING_IMAGE_SUFFIX:
+                # Frames in the frame ring have no file of their own, they are encoded on export
+                frames_to_export.append((index, filename))
+                continue
+            filepath = Path(DATA_DIR, filename)
             if filepath.exists():
-                images_to_move.append(filepath)
-                indices_to_update.append(index)
+                images_to_move.append((index, filepath))
 
-    if not images_to_move:
+    if not images_to_move and not frames_to_export:
         logger.info("No processed images to sync.")
         return
 
-    # 2. Move images
+    # 2. Move images (only successfully moved images are marked as synced)
     REMOTE_DATA_DIR.mkdir(parents=True, exist_ok=True)
-    moved_count = 0
-    for image_path in images_to_move:
+    indices_to_update = []
+    new_filenames = []
+    bytes_synced = 0
+    sync_start = time.monotonic()
+    for index, image_path in images_to_move:
         try:
+            image_size = image_path.stat().st_size
             shutil.move(str(image_path), str(REMOTE_DATA_DIR))
+            bytes_synced += image_size
             logger.debug(f"Moved image: {image_path.name}")
-            moved_count += 1
+            indices_to_update.append(index)
+            new_filenames.append(None)
+            synced_filenames.append(image_path.name)
         except Exception as e:
             logger.error(f"Failed to move image {image_path.name}: {e}")
-            # If moving failed DO NOT mark as synced
-            failed_index = images_to_move.index(image_path)
-            indices_to_update.pop(failed_index)
-
-    # 3. Update manifest
+            SYNC_FAILURES.inc()
+
+    # 3. Export frames held in the frame ring
+    if frames_to_export:
+        frame_ring = get_frame_ring(DATA_DIR)
+        for index, filename in frames_to_export:
+            export_filename = Path(filename).with_suffix(ARCHIVE_IMAGE_SUFFIX).name
+            export_path = Path(REMOTE_DATA_DIR, export_filename)
+            if frame_ring.export(filename, export_path):
+                frame_ring.mark_synced(filename)
+                bytes_synced += export_path.stat().st_size
+                logger.debug(f"Exported frame: {filename} -> {export_filename}")
+                indices_to_update.append(index)
+                new_filenames.append(export_filename)
+                synced_filenames.append(filename)
+            else:
+                logger.error(f"Failed to export frame {filename} from the frame ring.")
+                SYNC_FAILURES.inc()
+
+    sync_seconds = time.monotonic() - sync_start
+    IMAGES_SYNCED.inc(len(indices_to_update))
+    SYNC_BYTES.inc(bytes_synced)
+    if sync_seconds > 0:
+        SYNC_THROUGHPUT.set(bytes_synced / sync_seconds)
+
+    # 4. Update manifest
     if indices_to_update:
         logger.info(f"Updating manifest for {len(indices_to_update)} images.")
         update_metadata_manifest_entry(
             Path(DATA_DIR, METADATA_FILENAME),
             indices_to_update,
             image_synced=True,
+            new_filename=new_filenames,
             new_filepath=REMOTE_DATA_DIR.resolve().as_posix(),
+            latency_stamps={"synced": latency.stamp()},
         )
-
-
-class Syncer:
+        try:
+            record_synced_images(synced_filenames)
+        except OSError as e:
+            logger.error(f"Failed to record synced images in the synced log: {e}")
+        # Names are the local filenames, as known to the collector before the sync.
+        # Large batches are split to keep each message small.
+        for start in range(0, len(indices_to_update), SYNC_EVENT_BATCH_SIZE):
+            publish(
+                EventType.IMAGE_SYNCED,
+                indices=indices_to_update[start : start + SYNC_EVENT_BATCH_SIZE],
+                filenames=synced_filenames[start : start + SYNC_EVENT_BATCH_SIZE],
+            )
+
+
+class Syncer(Service):
     """Encapsulates the state and logic for the file synchroniser."""
 
+    SCRIPT_NAME = SCRIPT_NAME
+    DISPLAY_NAME = "Syncer"
+    FATAL_STATE = SyncerState.FATAL_ERROR
+
     def __init__(self):
-        self.shutdown_requested = False
-        self.current_state = SyncerState.IDLE
+        super().__init__(logger, SyncerState.IDLE)
         self.next_run_time = 0
 
-        # Register the signal handler
-        signal.signal(signal.SIGINT, self._graceful_shutdown)
-        signal.signal(signal.SIGTERM, self._graceful_shutdown)
-
-    def _graceful_shutdown(self, _signum, _frame):
-        """Signal handler to initiate a graceful shutdown"""
-        if not self.shutdown_requested:
-            logger.info("Shutdown signal received. Finishing current cycle before stopping...")
-            self.shutdown_requested = True
-
-    def _perform_sync_cycle(self):
+    async def perform(self):
         """State machin logic for the syncer."""
 
         if settings is None:
             logger.debug("Configuration error. Halting.")
-            time.sleep(POLL_INTERVAL * 5)
+            await self.sleep(POLL_INTERVAL * 5)
             self.current_state = SyncerState.FATAL_ERROR
 
         match self.current_state:
@@ -176,10 +235,7 @@ class Syncer:
                     logger.debug("WAITING_TO_RUN -> SYNCING_FILES")
                     self.current_state = SyncerState.SYNCING_FILES
                 else:
-                    for _ in range(int(POLL_INTERVAL)):
-                        if self.shutdown_requested:
-                            return
-                        time.sleep(1)
+                    await self.sleep(min(POLL_INTERVAL, self.next_run_time - now))
 
             case SyncerState.SYNCING_FILES:
                 logger.info("--- Starting Sync Cycle ---")
@@ -195,34 +251,17 @@ class Syncer:
 
             case SyncerState.FATAL_ERROR:
                 logger.error("[FATAL ERROR] Shutting down syncer.")
-                time.sleep(10)  # Prevent busy-looping in fatal state
-
-    def run(self):
-        """Main loop for the syncer process."""
-        logger.info("--- Starting Syncer Process ---")
-        print("--- Starting Syncer Process ---")
+                await self.sleep(10)  # Prevent busy-looping in fatal state
 
+    def on_start(self) -> bool:
         if settings is None:
             logger.debug("Configuration error. Halting.")
-            return
+            return False
 
         if not ENABLE_SYNCER:
             logger.info("Syncer is disabled in config. Exiting.")
-            return
-
-        try:
-            while not self.shutdown_requested:
-                self._perform_sync_cycle()
-
-                # After a cycle is complete, send a heartbeat.
-                update_service_status(SCRIPT_NAME, heartbeat=True)
-
-                time.sleep(0.1)  # Sleep to avoid busy waiting
-        except Exception as e:
-            logger.critical(f"UNEXPECTED ERROR in main loop: {e}", exc_info=True)
-        finally:
-            logger.info("--- Syncer Stopped ---")
-            print("--- Syncer Stopped ---")
+            return False
+        return True
 
 
 def run_syncer():
@@ -12,6 +12,7 @@ from phorest_pipeline.shared.metadata_manager import (
     initialise_status_file,
     update_service_status,
 )
+from phorest_pipeline.shared.process_info import ProcessTable
 
 # --- Configuration for PID File ---
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
@@ -37,31 +38,16 @@ BACKGROUND_SCRIPTS = [
     {"menu": "\t\t( Start File Backup Process )", "script": "phorest-backup"},
     {"menu": "\t\t( Start Sync to remote direcory Process )", "script": "phorest-syncer"},
     {"menu": "\t\t( Start Health Check Process )", "script": "phorest-health-check"},
+    {"menu": "\t\t( Start Supervisor for all enabled Processes )", "script": "phorest-supervisor"},
     {"menu": "Start Continuous Image Capture", "script": "phorest-continuous-capture"},
     {"menu": "Capture Single Image", "script": "phorest-single-capture"},
 ]
 
 
-def is_pid_active(pid: int | None, expected_name: str) -> bool:
-    """
-    Checks if a given PID is active AND is running the expected command.
-    """
-    if pid is None:
-        return False
-    try:
-        result = subprocess.run(
-            ["ps", "-p", str(pid), "-o", "command="], capture_output=True, text=True, check=False
-        )
-        # Check if the process exists and the command name is in the output
-        return result.returncode == 0 and expected_name in result.stdout
-    except Exception:
-        return False
-
-
 # --- Interactive Function to Check and Manage Running Background Scripts ---
 def check_running_background_scripts_status(stdscr):
     """
-    Loads PIDs from the file, checks their status using 'ps',
+    Loads PIDs from the file, checks their status through /proc,
     and presents an interactive list to manage them.
     Allows sending SIGINT to selected processes.
     """
@@ -83,9 +69,12 @@ def check_running_background_scripts_status(stdscr):
         )
 
         all_statuses = get_pipeline_status()
+        processes = ProcessTable()
         active_processes_to_display = []
         for service, data in all_statuses.items():
-            if data.get("status") == "running" and is_pid_active(data.get("pid"), service):
+            if data.get("status") == "running" and processes.is_active(
+                data.get("pid"), service, data.get("pid_start_time")
+            ):
                 active_processes_to_display.append({"name": service, "pid": data.get("pid")})
 
         results_lines = []
@@ -200,9 +189,12 @@ def stop_all_background_scripts(stdscr):
 
     # Filter for truly active processes to display for interaction
     all_statuses = get_pipeline_status()
+    processes = ProcessTable()
     processes_to_stop = []
     for service, data in all_statuses.items():
-        if data.get("status") == "running" and is_pid_active(data.get("pid"), service):
+        if data.get("status") == "running" and processes.is_active(
+            data.get("pid"), service, data.get("pid_start_time")
+        ):
             processes_to_stop.append({"name": service, "pid": data.get("pid")})
 
     stdscr.clear()
@@ -232,7 +224,9 @@ def is_script_already_running(service):
     if (
         service_status
         and service_status.get("status") == "running"
-        and is_pid_active(service_status.get("pid"), service)
+        and ProcessTable().is_active(
+            service_status.get("pid"), service, service_status.get("pid_start_time")
+        )
     ):
         return service_status.get("pid")
     return None
@@ -250,9 +244,12 @@ def draw_menu(stdscr, selected_row_idx):
 
     # Dynamically count active background processes for display.
     all_statuses = get_pipeline_status()
+    processes = ProcessTable()
     active_count = 0
     for service, data in all_statuses.items():
-        if data.get("status") == "running" and is_pid_active(data.get("pid"), service):
+        if data.get("status") == "running" and processes.is_active(
+            data.get("pid"), service, data.get("pid_start_time")
+        ):
             active_count += 1
     stdscr.addstr(
         3, 0, f"Currently tracked ACTIVE background processes: {active_count}", curses.A_DIM
@@ -549,8 +546,11 @@ def run_tui_app(stdscr):
         elif key == ord("q") or key == ord("Q"):
             active_count = 0
             all_statuses = get_pipeline_status()
+            processes = ProcessTable()
             for service, data in all_statuses.items():
-                if data.get("status") == "running" and is_pid_active(data.get("pid"), service):
+                if data.get("status") == "running" and processes.is_active(
+                    data.get("pid"), service, data.get("pid_start_time")
+                ):
                     active_count += 1
 
             if active_count > 0:
@@ -1,41 +1,97 @@
 # src/phorest_pipeline/tui/textual_main.py
 import os
+import shutil
 import signal
 import subprocess
 from pathlib import Path
 
 # --- Textual Imports ---
+from textual import work
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical, VerticalScroll
 from textual.reactive import reactive
 from textual.screen import Screen
 from textual.widgets import Button, Footer, Header, Markdown, RichLog, Static
 
+from phorest_pipeline.shared.config import DATA_DIR, METADATA_FILENAME
+from phorest_pipeline.shared.manifest_summary import ManifestSummary
 from phorest_pipeline.shared.metadata_manager import (
     get_pipeline_status,
     initialise_status_file,
     update_service_status,
 )
+from phorest_pipeline.shared.metrics import read_metric_totals
+from phorest_pipeline.shared.process_info import ProcessTable
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
 TUI_HELP = Path(Path(__file__).resolve().parent, "TUI_help.md")
 
+PERFORMANCE_REFRESH_INTERVAL = 5  # Seconds between refreshes of the performance panel
 
-# --- Helper functions for PID management ---
-def is_pid_active(pid: int | None, expected_name: str) -> bool:
-    """
-    Checks if a given PID is active AND is running the expected command.
-    """
-    if pid is None:
-        return False
+
+# --- Helper functions for the performance panel ---
+def _format_size(num_bytes: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+def _format_seconds(seconds: float | None) -> str:
+    return "n/a" if seconds is None else f"{seconds:.1f} s"
+
+
+def _data_dir_usage() -> tuple[int, int]:
+    """Returns the number and total size of the files in DATA_DIR (not recursive)."""
+    file_count = 0
+    total_size = 0
+    try:
+        with os.scandir(DATA_DIR) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    file_count += 1
+                    total_size += entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        pass
+    return file_count, total_size
+
+
+def format_performance(summary: dict, processor_metrics: dict) -> str:
+    """Formats the manifest summary and processor metrics as the text of the performance panel."""
+    counts = summary["status_counts"]
+    latency = summary["latency_seconds"]
+    lines = [
+        f"Entries: {summary['total_entries']} | "
+        + " | ".join(
+            f"{status} {counts.get(status, 0)}"
+            for status in ("pending", "processing", "processed", "rejected", "failed")
+        ),
+        f"Processing rate: {summary['processed_per_minute']:.1f} / min",
+        (
+            f"Capture-to-result latency: p50 {_format_seconds(latency['p50'])} | "
+            f"p90 {_format_seconds(latency['p90'])} | p99 {_format_seconds(latency['p99'])}"
+        ),
+        f"Backlogs: compressor {summary['compress_backlog']} | syncer {summary['sync_backlog']}",
+    ]
+
+    processed_count = processor_metrics.get("phorest_image_processing_seconds_count", 0)
+    if processed_count:
+        mean_seconds = processor_metrics["phorest_image_processing_seconds_sum"] / processed_count
+        lines[1] += f" | {mean_seconds:.2f} s per entry"
+
+    file_count, data_size = _data_dir_usage()
+    data_line = f"Data directory: {file_count} files, {_format_size(data_size)}"
     try:
-        result = subprocess.run(
-            ["ps", "-p", str(pid), "-o", "command="], capture_output=True, text=True, check=False
+        disk = shutil.disk_usage(DATA_DIR)
+        data_line += (
+            f" | disk {_format_size(disk.free)} free of {_format_size(disk.total)}"
+            f" ({disk.used / disk.total:.0%} used)"
         )
-        # Check if the process exists and the command name is in the output
-        return result.returncode == 0 and expected_name in result.stdout
-    except Exception:
-        return False
+    except OSError:
+        pass
+    lines.append(data_line)
+    return "\n".join(lines)
 
 
 # --- Data Definitions ---
@@ -64,6 +120,7 @@ BACKGROUND_SCRIPTS = [
     {"menu": "Start Backup", "script": "phorest-backup", "type": "background"},
     {"menu": "Start Syncer", "script": "phorest-syncer", "type": "background"},
     {"menu": "Start Health Check", "script": "phorest-health-check", "type": "background"},
+    {"menu": "Start Supervisor (all enabled services)", "script": "phorest-supervisor", "type": "background"},
     {
         "menu": "Start Continuous Capture",
         "script": "phorest-continuous-capture",
@@ -164,10 +221,14 @@ class PhorestTUI(App):
     ]
 
     def on_mount(self) -> None:
-        """Set up a timer to refresh the status every few seconds."""
+        """Set up timers to refresh the status and the performance panel every few seconds."""
         self.refresh_status()
         self.set_interval(2, self.refresh_status)  # Refresh every 2 seconds
 
+        self.manifest_summary = ManifestSummary(Path(DATA_DIR, METADATA_FILENAME))
+        self.refresh_performance()
+        self.set_interval(PERFORMANCE_REFRESH_INTERVAL, self.refresh_performance)
+
     def compose(self) -> ComposeResult:
         """Create child widgets for the app."""
         yield Header("Phorest Pipeline TUI")
@@ -182,6 +243,9 @@ class PhorestTUI(App):
                     for item in BACKGROUND_SCRIPTS:
                         yield ServiceControl(name=item["menu"], script_id=item["script"])
 
+                yield Static("Pipeline performance", classes="group_header")
+                yield Static("Loading...", id="performance_panel")
+
                 yield Static("Phorest single-use scripts", classes="group_header")
                 with Container(id="foreground_container"):
                     for item in FOREGROUND_SCRIPTS:
@@ -192,13 +256,27 @@ class PhorestTUI(App):
     def refresh_status(self) -> None:
         """Get the latest status and update the UI."""
         all_statuses = get_pipeline_status()
+        processes = ProcessTable()
         for service_control in self.query(ServiceControl):
             status_data = all_statuses.get(service_control.script_id, {})
-            is_running = status_data.get("status") == "running" and is_pid_active(
-                status_data.get("pid"), service_control.script_id
+            is_running = status_data.get("status") == "running" and processes.is_active(
+                status_data.get("pid"),
+                service_control.script_id,
+                status_data.get("pid_start_time"),
             )
             service_control.is_running = is_running
 
+    @work(thread=True, exclusive=True)
+    def refresh_performance(self) -> None:
+        """Reads the manifest summary and metrics in a worker thread, so the UI never waits on it."""
+        text = format_performance(
+            self.manifest_summary.get(), read_metric_totals("phorest-processor")
+        )
+        self.call_from_thread(self._show_performance, text)
+
+    def _show_performance(self, text: str) -> None:
+        self.query_one("#performance_panel", Static).update(text)
+
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Event handler called when a button is pressed."""
         button_id = str(event.button.id or "")
@@ -229,9 +307,11 @@ class PhorestTUI(App):
 
         elif button_id.startswith("stop_"):
             command_id = button_id.replace("stop_", "")
-            all_statuses = get_pipeline_status()
-            pid_to_kill = all_statuses.get(command_id, {}).get("pid")
-            if pid_to_kill and is_pid_active(pid_to_kill, command_id):
+            status_data = get_pipeline_status().get(command_id, {})
+            pid_to_kill = status_data.get("pid")
+            if pid_to_kill and ProcessTable().is_active(
+                pid_to_kill, command_id, status_data.get("pid_start_time")
+            ):
                 try:
                     os.kill(pid_to_kill, signal.SIGINT)
                     update_service_status(command_id, pid=None, status="stopped")